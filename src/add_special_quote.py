@@ -5,6 +5,7 @@ import json
 from dotenv import load_dotenv
 
 from target_helppers.login import start_and_login
+from helppers.chrome_launcher import allow_assets
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from carousel_selector import select_project_in_carousel
@@ -12,7 +13,7 @@ from target_helppers.lote_selector import select_lote
 from fill_payment_table import fill_payment_table
 
 
-def add_special_quote(headless: bool = False, timeout: int = 20) -> None:
+def add_special_quote(headless: bool = False, timeout: int = 20, driver=None, linger: float = 0.0) -> None:
     """Login to target app and navigate to special-quote URL (minimal flow).
 
     Uses environment variables:
@@ -21,37 +22,54 @@ def add_special_quote(headless: bool = False, timeout: int = 20) -> None:
     - TARGET_PASSWORD
     - TARGET_PAGE_ADD_SPECIAL_QUOTE_URL
     After navigation it will try to select a lote and fill amounts then press "Generar".
+
+    `driver`: already logged-in session to reuse (e.g. leased from
+    `target_helppers.login.login_pool`); it is left open at the end.
+    `linger`: seconds to keep a browser started here open before quitting.
     """
     load_dotenv()
-    login_url = os.getenv('TARGET_PAGE_LOGIN_URL')
-    if not login_url:
-        print('TARGET_PAGE_LOGIN_URL not set in .env')
-        return
+    owned = driver is None
+    if owned:
+        login_url = os.getenv('TARGET_PAGE_LOGIN_URL')
+        if not login_url:
+            print('TARGET_PAGE_LOGIN_URL not set in .env')
+            return
 
-    username = os.getenv('TARGET_USERNAME')
-    password = os.getenv('TARGET_PASSWORD')
-    if not username or not password:
-        print('TARGET_USERNAME or TARGET_PASSWORD not set in .env')
-        return
+        username = os.getenv('TARGET_USERNAME')
+        password = os.getenv('TARGET_PASSWORD')
+        if not username or not password:
+            print('TARGET_USERNAME or TARGET_PASSWORD not set in .env')
+            return
 
-    driver, success, info = start_and_login(login_url, username, password, headless=headless, timeout=timeout)
+        # the project carousel is selected through its <img alt>: keep images even with the lean profile
+        driver, success, info = start_and_login(login_url, username, password, headless=headless, timeout=timeout, allow_assets=('images',))
 
-    if driver is None:
-        print('Failed to start driver or navigate:', info)
-        return
+        if driver is None:
+            print('Failed to start driver or navigate:', info)
+            return
 
-    if not success:
-        print('Login may have failed or stayed on page. Current URL/info:', info)
-        time.sleep(2)
-        try:
-            driver.quit()
-        except Exception:
-            pass
-        return
+        if not success:
+            print('Login may have failed or stayed on page. Current URL/info:', info)
+            time.sleep(linger)
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            return
 
-    print('Login successful, current URL:', info)
+        print('Login successful, current URL:', info)
+    else:
+        # shared session: unblock images (carousel) only for this stage
+        with allow_assets(driver, 'images'):
+            return _process_quotes(driver, owned=False)
+    _process_quotes(driver, owned=True, linger=linger)
 
 
+def _process_quotes(driver, owned: bool = True, linger: float = 0.0) -> None:
+    """Create a special quote for every record of output/rows_info.json on a logged-in `driver`.
+
+    The driver is quit at the end (after `linger` seconds) only if `owned`.
+    """
     def _set_input_value_by_id(el_id: str, value) -> None:
         # Try to simulate a real user typing so React picks up changes.
         try:
@@ -271,10 +289,11 @@ def add_special_quote(headless: bool = False, timeout: int = 20) -> None:
       # If file not found or empty, abort with a clear message
       if not data_list:
         print('No input data available: output/rows_info.json not found or empty. Exiting.')
-        try:
-          driver.quit()
-        except Exception:
-          pass
+        if owned:
+          try:
+            driver.quit()
+          except Exception:
+            pass
         return
 
       time.sleep(1)
@@ -293,8 +312,11 @@ def add_special_quote(headless: bool = False, timeout: int = 20) -> None:
     except Exception as e:
       print('Error performing actions on special-quote page:', e)
 
+    if not owned:
+        return
+
     # keep browser open briefly for inspection
-    time.sleep(30)
+    time.sleep(linger)
     try:
         driver.quit()
     except Exception:
@@ -302,4 +324,4 @@ def add_special_quote(headless: bool = False, timeout: int = 20) -> None:
 
 
 if __name__ == '__main__':
-    add_special_quote(headless=False)
+    add_special_quote(headless=False, linger=30)
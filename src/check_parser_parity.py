@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""check_parser_parity.py
+
+Compara, sobre páginas de detalle guardadas, la salida de los extractores Selenium
+(`helppers.extract_credit`, `extract_amortization`, `extract_client`) con la de los
+parsers offline de `helppers.html_parsers`.
+
+Usage:
+  - Revisar todos los .html de un directorio (Chrome headless, file://):
+      python src/check_parser_parity.py output/detail_pages
+
+  - Revisar archivos concretos y guardar el reporte en otra ruta:
+      python src/check_parser_parity.py a.html b.html -o output/parity.json
+
+  - Guardar la salida de Selenium de cada página junto a ella (<página>.expected.json):
+      python src/check_parser_parity.py tests/fixtures/parity --record
+
+  - Comparar solo los parsers offline con esa salida grabada (sin navegador):
+      python src/check_parser_parity.py tests/fixtures/parity --offline-only
+
+Las páginas deben guardarse con el detalle ya cargado (p. ej. `driver.page_source`
+después de `_extract_detail`). Las de `tests/fixtures/parity` y su salida esperada
+se comprueban en `tests/test_parser_parity.py`. El proceso termina con código 1 si
+alguna página difiere.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+from helppers.html_parsers import parse_detail_page
+
+SECTIONS = ("info_credito", "amortizacion", "cliente")
+
+
+def _collect_pages(paths: List[str]) -> List[Path]:
+    out: List[Path] = []
+    for p in paths:
+        path = Path(p)
+        if path.is_dir():
+            out.extend(sorted(x for x in path.rglob("*") if x.suffix.lower() in (".html", ".htm")))
+        elif path.is_file():
+            out.append(path)
+        else:
+            print(f"Warning: {p} not found, skipping", file=sys.stderr)
+    return out
+
+
+def _diff(expected: Any, actual: Any, prefix: str = "") -> List[str]:
+    """Human readable list of differences between two JSON-like values."""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        out: List[str] = []
+        for k in list(expected) + [k for k in actual if k not in expected]:
+            if k not in actual:
+                out.append(f"{prefix}{k}: missing in parser (selenium={expected[k]!r})")
+            elif k not in expected:
+                out.append(f"{prefix}{k}: only in parser ({actual[k]!r})")
+            else:
+                out.extend(_diff(expected[k], actual[k], f"{prefix}{k}."))
+        return out
+    if isinstance(expected, list) and isinstance(actual, list):
+        out = []
+        if len(expected) != len(actual):
+            out.append(f"{prefix}len: selenium={len(expected)} parser={len(actual)}")
+        for i, (e, a) in enumerate(zip(expected, actual)):
+            out.extend(_diff(e, a, f"{prefix}{i}."))
+        return out
+    if expected != actual:
+        return [f"{prefix.rstrip('.')}: selenium={expected!r} parser={actual!r}"]
+    return []
+
+
+def expected_path(page: Path) -> Path:
+    """Recorded Selenium output of `page` (`detalle.html` -> `detalle.expected.json`)."""
+    return page.with_suffix(".expected.json")
+
+
+def section_diffs(expected: Dict[str, Any], parsed: Dict[str, Any]) -> List[str]:
+    """Differences per section; the serialized JSON must match byte for byte."""
+    diffs: List[str] = []
+    for section in SECTIONS:
+        if json.dumps(expected.get(section), ensure_ascii=False) != json.dumps(parsed.get(section), ensure_ascii=False):
+            diffs.extend(f"{section}.{d}" for d in _diff(expected.get(section), parsed.get(section)) or ["key order"])
+    return diffs
+
+
+def parse_offline(page: Path) -> Dict[str, Any]:
+    html = page.read_text(encoding="utf-8", errors="replace")
+    credit, amort, client = parse_detail_page(html)
+    return {"info_credito": credit, "amortizacion": amort, "cliente": client}
+
+
+def _extract_selenium(driver, page: Path) -> Dict[str, Any]:
+    from helppers.extract_credit import extract_credit_info
+    from helppers.extract_amortization import extract_amortization_table
+    from helppers.extract_client import extract_client_info
+
+    driver.get(page.resolve().as_uri())
+    return {
+        "info_credito": extract_credit_info(driver),
+        "amortizacion": extract_amortization_table(driver),
+        "cliente": extract_client_info(driver),
+    }
+
+
+def check_pages(pages: List[Path], offline_only: bool = False, headless: bool = True, record: bool = False) -> Dict[str, Any]:
+    """Run both extraction paths over `pages` and return a report dict.
+
+    offline_only: compare the parsers with the recorded output (`expected_path`)
+    instead of running Selenium; pages without it are only parsed.
+    record: also write the Selenium output of each page to `expected_path`.
+    """
+    driver = None
+    if not offline_only:
+        from selenium import webdriver
+        from extract_source_info import _build_source_options
+
+        driver = webdriver.Chrome(options=_build_source_options(headless))
+
+    report: Dict[str, Any] = {"pages": len(pages), "mismatches": 0, "results": []}
+    try:
+        for page in pages:
+            entry: Dict[str, Any] = {"page": str(page)}
+            try:
+                parsed = parse_offline(page)
+            except Exception as e:
+                entry["error"] = f"parser: {e}"
+                report["mismatches"] += 1
+                report["results"].append(entry)
+                continue
+            if driver is None:
+                recorded = expected_path(page)
+                if not recorded.exists():
+                    entry["parsed"] = parsed
+                    report["results"].append(entry)
+                    continue
+                expected = json.loads(recorded.read_text(encoding="utf-8"))
+            else:
+                try:
+                    expected = _extract_selenium(driver, page)
+                except Exception as e:
+                    entry["error"] = f"selenium: {e}"
+                    report["mismatches"] += 1
+                    report["results"].append(entry)
+                    continue
+                if record:
+                    expected_path(page).write_text(json.dumps(expected, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+            diffs = section_diffs(expected, parsed)
+            entry["ok"] = not diffs
+            if diffs:
+                entry["diffs"] = diffs
+                report["mismatches"] += 1
+            report["results"].append(entry)
+    finally:
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare Selenium extractors with the offline HTML parsers over saved detail pages")
+    parser.add_argument("paths", nargs="+", help="HTML files or directories containing them")
+    parser.add_argument("-o", "--output", default=None, help="Report path (default: output/parser_parity.json)")
+    parser.add_argument("--offline-only", action="store_true", help="Only run the offline parsers (no browser), against the recorded <page>.expected.json when present")
+    parser.add_argument("--record", action="store_true", help="Write the Selenium output of each page to <page>.expected.json")
+    parser.add_argument("--show-browser", action="store_true", help="Run Chrome with a visible window")
+    args = parser.parse_args(argv)
+    if args.record and args.offline_only:
+        parser.error("--record needs the browser; drop --offline-only")
+
+    pages = _collect_pages(args.paths)
+    if not pages:
+        print("No HTML pages found", file=sys.stderr)
+        return 2
+
+    report = check_pages(pages, offline_only=args.offline_only, headless=not args.show_browser, record=args.record)
+
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    out_path = args.output or os.path.join(repo_root, "output", "parser_parity.json")
+    out_dir = os.path.dirname(out_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    for entry in report["results"]:
+        if entry.get("error"):
+            print(f"ERROR {entry['page']}: {entry['error']}")
+        elif entry.get("diffs"):
+            print(f"DIFF  {entry['page']}")
+            for d in entry["diffs"]:
+                print(f"      {d}")
+    print(f"Checked {report['pages']} pages, {report['mismatches']} with differences -> {out_path}")
+    return 1 if report["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
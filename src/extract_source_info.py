@@ -1,17 +1,46 @@
 from __future__ import annotations
+import argparse
+import itertools
+import json
 import os
+import queue
 import sys
 import time
-import json
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Iterable, List, Tuple
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from helppers.extract_credit import extract_credit_info
-from helppers.extract_client import extract_client_info
+from helppers.extract_client import client_pane_state, extract_client_info
 from helppers.extract_amortization import extract_amortization_table
+from helppers.rows_store import RowsStore, record_code
+from helppers.record_writer import RecordWriter
+from helppers.selector_cache import selector_cache
+from helppers.row_budget import RowBudget
+from helppers.fingerprints import FingerprintIndex, row_fingerprint
+from helppers.extraction_cursor import ExtractionCursor
+from helppers.listing_harvester import harvest_listing, click_row_action, resolve_detail_url
+from helppers.http_session import HttpSession
+from helppers.html_parsers import parse_listing, parse_detail_page
+from helppers.browser_profile import resolve_profile_dir, session_authenticated, worker_profile_dir
+from helppers.chrome_launcher import apply_lean_blocking, chrome_options, start_chrome
+from helppers.detail_tabs import extract_in_tabs
+from helppers.driver_pool import DriverPool, count_page
+from helppers.memory_watchdog import MemoryWatchdog, restart_driver
+from helppers.network_capture import NetworkCapture, best_listing, detail_from_responses
+from helppers.snapshot_archive import SnapshotArchive, page_snapshot, strip_snapshot_html
+from helppers.listing_pager import click_page_link, max_visible_page, current_page_size, select_max_page_size
+from helppers.waits import (
+	listing_signature,
+	wait_client_pane,
+	wait_detail_ready,
+	wait_dom_change,
+	wait_listing_ready,
+	wait_new_window,
+	wait_page_change,
+)
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import WebDriverException, TimeoutException, NoSuchElementException
@@ -39,390 +68,850 @@ def _resolve_output_path(path: str) -> str:
 	return os.path.join(repo_root, path.replace('/', os.sep).replace('\\', os.sep))
 
 
-def extract_all_rows_info(driver, out_path: str = "output/rows_info.json", max_rows: int | None = None, max_pages: int | None = None, timeout: int = 30):
+def extract_all_rows_info(driver, out_path: str = "output/rows_info.json", max_rows: int | None = None, max_pages: int | None = None, timeout: int = 30, fsync_every: int = 25, refresh: bool = False, pages: Iterable[int] | None = None, backend: str = "browser", http_workers: int = 4, archive: SnapshotArchive | None = None, delta: bool = False, tabs: int = 1, row_budget: float | None = None, memory_limit_mb: float | None = None, restart: Callable[[Any], Any] | None = None, seed_out_path: str | None = None):
 	"""Itera todas las filas de la tabla principal, abre cada detalle (modal/pestaña)
 	y extrae un paquete completo de datos para cada fila: metadatos de la fila
 	(columnas), `cliente` (información personal) e `info_credito` (información del crédito).
 
 	max_pages: si no es None, limita el número de páginas a recorrer (1 = solo la primera página).
+	fsync_every: cada cuántas filas se hace fsync del journal `rows_info.jsonl`. Al terminar,
+	el journal se compacta de forma atómica a `out_path` (array JSON legado).
+	refresh: si es False (por defecto) se reanuda desde el cursor persistido
+	(`rows_info.cursor.jsonl`) y se omiten las filas cuyo `codigo_venta` ya fue extraído;
+	si es True se empieza en la página 1 y se vuelven a extraer todas las filas.
+	pages: si no es None, recorre sólo esas páginas (números ascendentes, puede ser un
+	iterador infinito acotado por `max_pages` o por el final de la paginación); se usa
+	para repartir páginas disjuntas entre varios navegadores.
+	backend: "browser" (por defecto) abre cada detalle en Chrome; "http" reutiliza las
+	cookies de la sesión para descargar los detalles con `HttpSession` (`http_workers`
+	conexiones en paralelo) y parsearlos con `html_parsers`. Si SOURCE_LISTING_PAGE_URL
+	está definida (p. ej. `https://erp/ventas.php?pagina={page}`) también el listado se
+	descarga por HTTP. Las filas sin URL de detalle, o cuyo detalle no trae los datos
+	en el HTML (pestañas cargadas por JS, sesión expirada), usan el flujo del navegador.
+	"network" navega como "browser" pero lee los datos de las respuestas Document/XHR
+	capturadas con el log de red de Chrome (`helppers.network_capture`; el driver debe
+	crearse con `start_source_session(..., network_log=True)`): columnas del listado
+	desde el JSON/fragmento HTML que lo alimenta y detalle parseado con `html_parsers`
+	en lugar de leer el DOM por WebDriver. Si una respuesta no trae los datos se usa el DOM.
+	archive: `SnapshotArchive` abierto (lo cierra quien lo creó) donde guardar el DOM
+	relevante de cada detalle, indexado por `codigo_venta` y hash de contenido, para
+	volver a extraer sin navegar (`reextract_archive.py`).
+	delta: además de las filas nuevas, re-extraer las ya extraídas cuya huella del listado
+	(Estado, Plan, Fecha Venta, Unidad, Codigo Venta; ver `helppers.fingerprints`) cambió
+	desde la extracción anterior; las filas sin cambios se conservan de `out_path` sin
+	abrir su detalle, y el registro nuevo sustituye al anterior. Las filas extraídas
+	antes de que existiera el índice de huellas cuentan como cambiadas.
+	tabs: con el backend "browser", abrir hasta `tabs` detalles a la vez en pestañas del
+	mismo navegador (`helppers.detail_tabs`) y extraer de la que termine de cargar primero;
+	las filas sin URL de detalle o cuya pestaña falla usan el flujo de una en una.
+	row_budget: segundos máximos por fila en el flujo del navegador (None = sin límite).
+	Las esperas se recortan al tiempo que queda (`RowBudget`) y una fila que lo agota se
+	descarta, se anota en skip_rows_debug.json con sus tiempos por fase y se vuelve al
+	listado; al final se reintentan una vez, con el doble de presupuesto, por URL o (si
+	la fila no la expone) volviendo a su página y clicando 'Ver más'. El presupuesto es
+	cooperativo: además de las esperas, se recortan los timeouts de carga de página y
+	de scripts del driver al tiempo que queda en cada fase (`RowBudget.clip_driver_timeouts`).
+	memory_limit_mb / restart: entre filas, si la memoria del navegador supera
+	`memory_limit_mb` (ver `MemoryWatchdog`), `restart(driver)` lo cierra y devuelve uno
+	nuevo ya autenticado sobre el mismo listado (filtro y tamaño de página); se vuelve a
+	la página en curso y se sigue con la fila siguiente, sin cambios en la salida.
+
+	seed_out_path: otra salida (el rows_info.json principal de un run por shards o por
+	desarrollo) cuyos registros y huellas cuentan como ya extraídos, además de los de
+	`out_path`; sin `refresh` esas filas no se vuelven a abrir.
+
+	Al terminar, cuántos detalles tenían la pestaña 'Cliente' ya visible, cargada pero
+	oculta (leída sin clicar), sin cargar (clicada) o se leyeron de la respuesta de red
+	(backend 'network') se imprime y se guarda en `client_tab_stats.json`, junto a `out_path`.
 	"""
 	# ensure out_path is absolute and points to repo-root/output
 	out_path = _resolve_output_path(out_path)
 
 	rows_info = []
 	seen_codes = set()
-	skipped_rows = []  # collect diagnostics about skipped rows
 
-	# cargar existentes si hay y normalizarlas al nuevo esquema {'row': {...}, 'cliente': {...}}
+	# cargar existentes (en streaming, normalizadas al esquema {'row': {...}, 'cliente': {...}})
+	# y abrir el journal JSONL al que se añade un registro compacto por fila
+	store = RowsStore(out_path, fsync_every=fsync_every)
 	try:
-		if os.path.exists(out_path):
-			with open(out_path, "r", encoding="utf-8") as fh:
-				existing = json.load(fh)
-				for item in existing:
-					# si ya está en nuevo formato, conservar
-					if isinstance(item, dict) and 'row' in item and 'cliente' in item:
-						rows_info.append(item)
-						continue
-					# si es un dict que parece cliente (tiene 'name' o 'id_cliente'), envolver
-					if isinstance(item, dict):
-						if 'name' in item or 'id_cliente' in item or 'codigo_venta' in item:
-							rows_info.append({'row': {}, 'cliente': item, 'info_credito': {}})
-							continue
-					# otherwise, append as-is
-					rows_info.append(item)
+		for item in store.iter_records():
+			rows_info.append(item)
 	except Exception:
 		# ignorar errores de carga
 		pass
+	try:
+		store.open()
+	except Exception as e:
+		print('Warning: could not open rows_info journal:', e)
+
+	# cursor persistido: página/fila en curso y códigos ya completados
+	cursor = ExtractionCursor.for_output(out_path).load()
+	if refresh or cursor.finished:
+		cursor.reset(keep_completed=not refresh)
+	# las posiciones del cursor dependen del tamaño de página del listado
+	if backend != "http" or not os.getenv('SOURCE_LISTING_PAGE_URL'):
+		cursor.set_page_size(current_page_size(driver))
+	if not refresh:
+		for item in rows_info:
+			code = record_code(item)
+			if code:
+				seen_codes.add(code)
+		seen_codes.update(cursor.completed)
+		if seed_out_path:
+			for item in RowsStore(seed_out_path).iter_records():
+				code = record_code(item)
+				if code:
+					seen_codes.add(code)
+
+	# huellas de las filas del listado de las que salió cada registro
+	fingerprints = FingerprintIndex.for_output(out_path).load()
+	seed_fingerprints = FingerprintIndex.for_output(seed_out_path).load() if seed_out_path and delta and not refresh else None
+	replaced_codes = set()  # códigos ya guardados que se re-extraen en esta ejecución (delta)
+	delta_stats = {"new": 0, "changed": 0, "unchanged": 0}
+	# cómo se leyó la pestaña 'Cliente' de cada detalle (ver `_extract_detail`)
+	client_tab = {"visible": 0, "present": 0, "lazy": 0, "fallback": 0, "network": 0}
+
+	def _is_current(code: str, fp: str) -> bool:
+		# fila ya extraída y (en modo delta) sin cambios en el listado
+		if not code or code not in seen_codes:
+			return False
+		if delta and seed_fingerprints is not None and fingerprints.get(code) is None:
+			# extraída en la salida principal, no en esta
+			return seed_fingerprints.unchanged(code, fp)
+		return not delta or fingerprints.unchanged(code, fp)
+
+	def _detail_jobs(listing, count: int, resume_row: int, listing_url: str):
+		# filas de la página cuyo detalle hay que abrir y que exponen su URL: (índice, url)
+		for i in range(count):
+			entry = listing[i]
+			code_i = entry['codigo_venta']
+			if entry['action'] is None:
+				continue
+			if not refresh and (_is_current(code_i, row_fingerprint(entry['row'], code_i)) or (not code_i and i < resume_row)):
+				continue
+			url_i = resolve_detail_url(entry['action'], listing_url)
+			if url_i:
+				yield i, url_i
+
+	def _keep_record(page_index: int, i: int, entry, fp: str, credit_info, amortizacion, client, snapshot, snapshot_url: str, advance_cursor: bool = True, error=None) -> bool:
+		code = client.get('codigo_venta') or client.get('codigo') or ''
+		code_from_row = entry['codigo_venta']
+		col_map = entry['row']
+		if error is not None or not any(client.values()):
+			# extracción fallida: no se guarda ni se marca como completada, así la
+			# próxima ejecución (sin --refresh) vuelve a intentarla
+			writer.skip({
+				"row_index": i, "page_index": page_index,
+				"reason": "extraction_exception" if error is not None else "empty_client",
+				"error": str(error) if error is not None else "", "codigo_venta": code_from_row,
+				"row_html": entry['html'],
+			})
+			return False
+		# always append the extracted client (allow duplicates) including credit info and amortization
+		rows_info.append({'row': col_map or {}, 'cliente': client, 'info_credito': credit_info, 'amortizacion': amortizacion})
+		if code:
+			if delta and code in seen_codes:
+				# el registro nuevo sustituye al anterior al compactar
+				replaced_codes.add(code)
+			seen_codes.add(code)
+		# escribir incrementalmente (una línea JSON por fila) desde el hilo de escritura
+		writer.write_record(
+			rows_info[-1], (page_index, i), code or code_from_row, fp,
+			snapshot=(snapshot, {"url": snapshot_url, "row": col_map}) if snapshot else None,
+			fp_code=code_from_row or code, advance_cursor=advance_cursor,
+		)
+		return True
+
+	def _open_detail_tab(url: str) -> None:
+		# pestaña reutilizada para abrir detalles por URL (se crea al primer uso)
+		nonlocal listing_handle, detail_handle
+		if detail_handle is None:
+			listing_handle = driver.current_window_handle
+			driver.switch_to.new_window('tab')
+			detail_handle = driver.current_window_handle
+			apply_lean_blocking(driver)
+		else:
+			driver.switch_to.window(detail_handle)
+		driver.get(url)
+		wait_detail_ready(driver, timeout)
+
+	def _click_detail(i: int, code: str):
+		"""Clica 'Ver más' de la fila `i` del listado abierto y pasa a la ventana del detalle.
+
+		Retorna `(abrió_ventana_nueva, handle_del_listado)` o None si no se pudo clicar.
+		"""
+		prev_handles = driver.window_handles
+		if not click_row_action(driver, i, code):
+			return None
+		# esperar (máx. 0.5 s) a que se abra una ventana nueva o empiece la navegación
+		new_handles = wait_new_window(driver, prev_handles, 0.5)
+		if len(new_handles) <= len(prev_handles):
+			return False, None
+		# una nueva ventana/pestaña se abrió: elegir el handle nuevo
+		new_handle = [h for h in new_handles if h not in prev_handles][0]
+		try:
+			original_handle = driver.current_window_handle
+		except Exception:
+			original_handle = prev_handles[0] if prev_handles else None
+		try:
+			driver.switch_to.window(new_handle)
+		except Exception:
+			# si no es posible, continuar con la ventana actual
+			return False, original_handle
+		return True, original_handle
+
+	def _reopen_by_click(page: int, i: int, code: str):
+		"""Vuelve a la página `page` del listado y clica la fila `i` (ver `_click_detail`)."""
+		nonlocal browser_page
+		if listing_handle is not None:
+			driver.switch_to.window(listing_handle)
+		if (_get_active_page_number(driver) or 1) != page:
+			if not go_to_page(driver, page, timeout=timeout):
+				return None
+		browser_page = page
+		return _click_detail(i, code)
+
+	def _back_to_listing(via_url: bool, opened_new_window: bool, original_handle) -> None:
+		# cerrar ventana nueva si abrimos una y volver a la original
+		try:
+			if via_url:
+				# el listado sigue intacto en su pestaña
+				driver.switch_to.window(listing_handle)
+			elif opened_new_window and original_handle:
+				try:
+					# cerrar la ventana actual (detalle)
+					driver.close()
+				except Exception:
+					pass
+				try:
+					driver.switch_to.window(original_handle)
+				except Exception:
+					# fallback: recargar la página fuente
+					try:
+						url = os.getenv('SOURCE_PAGE_URL')
+						if url:
+							driver.get(url)
+							wait_listing_ready(driver, 5)
+					except Exception:
+						pass
+			else:
+				# navegación en la misma pestaña: intentar back
+				try:
+					driver.back()
+					if not wait_listing_ready(driver, 5):
+						raise TimeoutException("listing not restored after back()")
+				except Exception:
+					try:
+						url = os.getenv('SOURCE_PAGE_URL')
+						if url:
+							driver.get(url)
+							wait_listing_ready(driver, 5)
+					except Exception:
+						pass
+		except Exception:
+			# en caso de cualquier fallo no bloquear la iteración
+			try:
+				url = os.getenv('SOURCE_PAGE_URL')
+				if url:
+					driver.get(url)
+					wait_listing_ready(driver, 5)
+			except Exception:
+				pass
+
+	def _restart_browser() -> None:
+		# navegador nuevo (ya autenticado) y vuelta a la página del listado en curso
+		nonlocal driver, listing_handle, detail_handle, capture, browser_page
+		driver = restart(driver)
+		listing_handle = detail_handle = None
+		if capture is not None:
+			capture = NetworkCapture(driver)
+		if row_budget:
+			_set_page_load_timeout(driver, min(timeout, row_budget))
+		browser_page = _get_active_page_number(driver) or 1
+		if not listing_template and browser_page != page_index:
+			if not go_to_page(driver, page_index, timeout=timeout):
+				raise RuntimeError(f"could not return to page {page_index} after restarting the browser")
+			browser_page = page_index
+		print(f"Browser restarted; continuing on page {page_index}")
+
+	def _extract_tab(d):
+		credit, amort, client, error = _extract_detail(d, client_tab)
+		return credit, amort, client, error, (page_snapshot(d) if archive is not None else None)
 
 	# localizar tabla
 	table = detect_main_table(driver)
 	if table is None:
 		print("No se encontró tabla para iterar filas")
+		store.close()
+		cursor.close()
+		fingerprints.close()
 		return rows_info
 
-	processed = 0
-	page_index = 1
-	# loop over pages until no next page
-	while True:
-		try:
-			rows = driver.find_elements(By.XPATH, "//table//tr[td]")
-		except Exception:
-			rows = []
-
-		total_in_page = len(rows)
-		# compute remaining allowed if max_rows provided
-		remaining = None if max_rows is None else max(0, max_rows - processed)
-		to_process = total_in_page if remaining is None else min(total_in_page, remaining)
+	# serialización, journal, cursor, huellas, snapshots y diagnóstico de filas saltadas
+	# en un hilo aparte: el navegador sigue con la fila siguiente mientras se escribe
+	writer = RecordWriter(store=store, cursor=cursor, fingerprints=fingerprints, archive=archive, debug_path=os.path.join(os.path.dirname(out_path) or 'output', 'skip_rows_debug.json'))
 
-		print(f"Found {total_in_page} data rows on page {page_index}; extracting up to {to_process} this page")
-
-		for i in range(to_process):
-			try:
-				# re-evaluar filas cada iteración para evitar StaleElementReference
-				rows = driver.find_elements(By.XPATH, "//table//tr[td]")
-				if i >= len(rows):
+	processed = 0
+	# pestaña reutilizada para abrir detalles por URL (se crea al primer uso)
+	listing_handle = None
+	detail_handle = None
+	# filas que agotaron su presupuesto: (página, fila, entrada del listado, huella, url)
+	timed_out_rows = []
+	# ninguna carga de página ni script puede exceder el presupuesto de una fila
+	# (ver `RowBudget.clip_driver_timeouts`)
+	budget_limit = min(timeout, row_budget) if row_budget else timeout
+	if row_budget:
+		_set_page_load_timeout(driver, budget_limit)
+	page_index = _get_active_page_number(driver) or 1
+	# página en la que está el listado del navegador (en modo http puede diferir de page_index)
+	browser_page = page_index
+
+	# modo http: el navegador sólo aporta la sesión; listado (opcional) y detalles se
+	# descargan con un cliente HTTP con pool de conexiones y se parsean sin navegador
+	session = None
+	executor = None
+	listing_template = ""
+	if backend == "http":
+		session = HttpSession.from_driver(driver, pool_size=http_workers, timeout=timeout)
+		executor = ThreadPoolExecutor(max_workers=max(1, http_workers))
+		listing_template = os.getenv('SOURCE_LISTING_PAGE_URL') or ""
+	capture = NetworkCapture(driver) if backend == "network" else None
+	watchdog = MemoryWatchdog(memory_limit_mb) if memory_limit_mb and restart is not None else None
+	resume_row = 0
+	# plan de páginas: todas en orden (por defecto) o el subconjunto ascendente `pages`
+	page_plan = iter(pages) if pages is not None else itertools.count(1)
+	target = next(page_plan, None)
+	# reanudar: saltar directamente a la última página sin terminar del cursor
+	while target is not None and target < cursor.page_index:
+		target = next(page_plan, None)
+	if target is not None and target > 1 and target == cursor.page_index:
+		print(f"Resuming extraction at page {cursor.page_index}, row {cursor.row_index}")
+	try:
+		# loop over pages until the plan is exhausted or there is no next page
+		while target is not None:
+			if max_pages is not None and target > max_pages:
+				break
+			if listing_template:
+				# listado descargado por HTTP (SOURCE_LISTING_PAGE_URL con '{page}')
+				page_index = target
+				listing_url = listing_template.format(page=target)
+				try:
+					resp = session.get(listing_url)
+					listing = parse_listing(resp.text) if resp.status < 400 and not resp.looks_like_login() else []
+				except Exception as e:
+					print(f"Warning: could not fetch listing page {target} over HTTP: {e}")
+					listing = []
+				if not listing:
+					print(f"No rows on listing page {target}; stopping")
 					break
-				row = rows[i]
-			except Exception as e:
-				# si no podemos acceder a las filas, saltar esta iteración
-				print(f"Warning: no se pudo acceder a la fila {i} en la página {page_index}: {e}")
-				continue
+			else:
+				if target != page_index:
+					if not go_to_page(driver, target, timeout=timeout):
+						print(f"Could not navigate to page {target}; stopping")
+						break
+					page_index = browser_page = target
+				# una sola llamada por página: columnas, codigo_venta y acción de cada fila
+				listing = harvest_listing(driver)
+				if capture is not None:
+					listing = _merge_network_listing(listing, best_listing(capture, capture.drain()))
+				try:
+					listing_url = driver.current_url
+				except Exception:
+					listing_url = os.getenv('SOURCE_PAGE_URL') or ''
+			resume_row = cursor.row_index if page_index == cursor.page_index else 0
+
+			total_in_page = len(listing)
+			# compute remaining allowed if max_rows provided
+			remaining = None if max_rows is None else max(0, max_rows - processed)
+			to_process = total_in_page if remaining is None else min(total_in_page, remaining)
+
+			print(f"Found {total_in_page} data rows on page {page_index}; extracting up to {to_process} this page")
+			writer.enter_page(page_index)
+			count_page(driver)
+
+			# modo http: descargar y parsear en paralelo los detalles de la página
+			prefetched = {}
+			if executor is not None:
+				for i, url_i in _detail_jobs(listing, to_process, resume_row, listing_url):
+					prefetched[i] = executor.submit(_fetch_detail_http, session, url_i, archive is not None)
+
+			# modo pestañas: hasta `tabs` detalles cargando a la vez en el mismo navegador
+			in_tabs = {}
+			if tabs > 1 and executor is None:
+				jobs = list(_detail_jobs(listing, to_process, resume_row, listing_url))
+				if jobs:
+					for i, result, err in extract_in_tabs(driver, jobs, _extract_tab, tabs=tabs, timeout=timeout):
+						if err is None and result is not None:
+							in_tabs[i] = result
+						else:
+							print(f"Warning: tab extraction failed for row {i} ({err}); falling back to one-by-one")
+
+			for i in range(to_process):
+				if watchdog is not None and watchdog.check(driver):
+					_restart_browser()
+					watchdog.reset()
+				entry = listing[i]
+				# mapeo de columnas (orden canónico) y codigo_venta leídos del snapshot del listado
+				col_map = entry['row']
+				code_from_row = entry['codigo_venta']
+				row_html = entry['html'] or "<unable to get row html>"
+				fp = row_fingerprint(col_map, code_from_row)
+
+				# omitir filas ya extraídas (por código; en modo delta sólo si su huella no cambió)
+				# salvo que se pida refresh; las filas sin código se omiten por posición al
+				# reanudar la página del cursor
+				if not refresh:
+					if _is_current(code_from_row, fp):
+						delta_stats["unchanged"] += 1
+						writer.mark_row(page_index, i, code_from_row)
+						continue
+					if not code_from_row and i < resume_row:
+						continue
+				changed = bool(code_from_row) and code_from_row in seen_codes
+				delta_stats["changed" if changed else "new"] += 1
+
+				if entry['action'] is None:
+					# nada para clicar en esta fila
+					# still, if code_from_row exists and not seen, add a placeholder client with only code
+					if code_from_row and code_from_row not in seen_codes:
+						client = {k: "" for k in ("name","birth_date","rfc","curp","sexo","estado_civil","telefono_local","telefono_celular","email","id_cliente","codigo_venta")}
+						client['codigo_venta'] = code_from_row
+						# append as wrapped object with row info
+						rows_info.append({'row': col_map or {'html': row_html}, 'cliente': client, 'info_credito': {}})
+						seen_codes.add(code_from_row)
+						writer.write_record(rows_info[-1], (page_index, i), code_from_row, fp)
+						# record this event for diagnostics
+						writer.skip({
+							"row_index": i,
+							"reason": "no_clickable_element_but_code_placeholder_created",
+							"codigo_venta": code_from_row,
+							"row_html": row_html,
+						})
+						continue
+					if changed:
+						# fila modificada sin detalle que abrir: se conserva el registro anterior
+						writer.skip({"row_index": i, "reason": "changed_but_no_clickable_element", "codigo_venta": code_from_row, "row_html": row_html})
+						continue
+					# no code and no clickable element -> log and continue
+					writer.skip({"row_index": i, "reason": "no_clickable_element_no_code", "row_html": row_html})
+					print(f"Row {i} skipped: no clickable element and no code found")
+					continue
 
-			# construir mapeo de columnas para esta fila (usaremos el orden canónico)
-			col_map = {}
-			try:
-				canonical = [
-					"Temp.", "Sucursal", "Asesor", "Cliente", "Desarrollo", "Unidad",
-					"Fecha Venta", "Estado", "Plan", "Acciones", "Codigo Venta",
-				]
-				def _norm_key(s: str) -> str:
-					return re.sub(r"[^0-9a-z]+", "_", (s or '').strip().lower()).strip('_')
-				keys = [_norm_key(x) for x in canonical]
-				cells = row.find_elements(By.XPATH, "./td")
-				for idx, cell in enumerate(cells, start=1):
+				# modo http / pestañas: el detalle ya se descargó y parseó (o extrajo) en paralelo
+				http_result = None
+				snapshot = None
+				snapshot_url = ""
+				if i in prefetched:
 					try:
-						val = cell.text.strip()
-					except Exception:
-						val = ""
-					if idx-1 < len(keys):
-						k = keys[idx-1]
+						http_result = prefetched[i].result()
+					except Exception as e:
+						print(f"Warning: HTTP fetch failed for row {i} ({e}); falling back to the browser")
+				elif i in in_tabs:
+					http_result = in_tabs[i]
+				row_timed_out = False
+				if http_result is not None:
+					credit_info, amortizacion, client, error, snapshot = http_result
+					snapshot_url = resolve_detail_url(entry['action'], listing_url)
+				else:
+					opened_new_window = False
+					original_handle = None
+					via_url = False
+					# presupuesto de la fila: recorta todas las esperas hasta volver al listado
+					budget = RowBudget(driver, row_budget).begin()
+					budget.clip_driver_timeouts(budget_limit)
+					if capture is not None:
+						# descartar lo capturado hasta ahora: lo siguiente es de este detalle
+						capture.drain()
+					# si la acción expone la URL del detalle, abrirla directamente en la pestaña
+					# de detalle: el listado no se toca (sin back, re-render ni re-detección)
+					detail_url = resolve_detail_url(entry['action'], listing_url)
+					if detail_url:
+						try:
+							_open_detail_tab(detail_url)
+							via_url = True
+						except Exception as e:
+							print(f"Warning: could not open detail URL for row {i} ({e}); falling back to click")
+							try:
+								if listing_handle:
+									driver.switch_to.window(listing_handle)
+							except Exception:
+								pass
+
+					if not via_url:
+						if browser_page != page_index:
+							# modo http con listado por HTTP: llevar el navegador a la página sólo si hace falta clicar
+							if not go_to_page(driver, page_index, timeout=timeout):
+								budget.end()
+								writer.skip({"row_index": i, "reason": "click_failed", "row_html": row_html})
+								continue
+							browser_page = page_index
+						# click (único acceso al DOM de la fila) y manejar si abre en nueva ventana/pestaña
+						opened = _click_detail(i, code_from_row)
+						if opened is None:
+							print(f"No se pudo clickear Ver más en fila {i}")
+							budget.end()
+							writer.skip({"row_index": i, "reason": "click_failed", "row_html": row_html})
+							continue
+						opened_new_window, original_handle = opened
+
+					# esperar el detalle (misma pestaña o ventana nueva): termina en cuanto aparece la tarjeta
+					if not via_url:
+						wait_detail_ready(driver, timeout)
+					budget.mark('open')
+					budget.clip_driver_timeouts(budget_limit)
+
+					from_network = detail_from_responses(capture, capture.drain()) if capture is not None else None
+					if from_network is not None:
+						credit_info, amortizacion, client, net_html = from_network
+						error = None
+						# la pestaña 'Cliente' no se tocó: el detalle salió del payload
+						client_tab["network"] += 1
+						if archive is not None:
+							snapshot = strip_snapshot_html(net_html)
 					else:
-						k = f"col_{idx}"
-					col_map[k] = val
-			except Exception:
-				col_map = {}
-			# localizar la última celda y tratar de obtener codigo_venta desde la fila
+						credit_info, amortizacion, client, error = _extract_detail(driver, client_tab)
+						if archive is not None and not budget.expired():
+							# DOM tras activar la pestaña 'Cliente' (lo que leyeron los extractores)
+							snapshot = page_snapshot(driver)
+					if snapshot:
+						try:
+							snapshot_url = driver.current_url
+						except Exception:
+							snapshot_url = detail_url
+					budget.mark('extract')
+					budget.end()
+					row_timed_out = budget.expired()
+				if row_timed_out:
+					# datos posiblemente incompletos: descartar, anotar y reintentar al final
+					print(f"Row {i} on page {page_index} exceeded its {row_budget}s budget ({budget.elapsed()}s); skipping")
+					writer.skip({"row_index": i, "page_index": page_index, "reason": "row_timeout", "codigo_venta": code_from_row, "elapsed": budget.elapsed(), "timings": dict(budget.timings), "row_html": row_html})
+					timed_out_rows.append((page_index, i, entry, fp, detail_url))
+				else:
+					if error is not None:
+						print(f"Error extrayendo cliente en fila {i}: {error}")
+					if not _keep_record(page_index, i, entry, fp, credit_info, amortizacion, client, snapshot, snapshot_url, error=error):
+						print(f"Row {i} on page {page_index} not saved (extraction failed); it will be retried on the next run")
+
+				if http_result is None:
+					_back_to_listing(via_url, opened_new_window, original_handle)
+
+
+	        # finished rows on this page (or reached max_rows)
+			processed = len(rows_info)
+			# if max_rows limit reached, stop pagination
+			if max_rows is not None and processed >= max_rows:
+				break
+
+			# siguiente página del plan (go_to_page navega y espera a que cargue)
+			target = next(page_plan, None)
+
+		# reintentar una vez, con el doble de presupuesto, las filas que lo agotaron: por URL
+		# o, si la fila no la expone, volviendo a su página del listado y clicando 'Ver más'
+		retry_limit = min(timeout, 2 * row_budget) if row_budget else timeout
+		if timed_out_rows:
+			print(f"Retrying {len(timed_out_rows)} rows that exceeded the {row_budget}s budget")
+			_set_page_load_timeout(driver, retry_limit)
+		for page_r, i, entry, fp, detail_url in timed_out_rows:
+			budget = RowBudget(driver, 2 * row_budget).begin()
+			budget.clip_driver_timeouts(retry_limit)
+			snapshot = None
+			opened = None
 			try:
-				last_td = row.find_element(By.XPATH, "./td[last()]")
-			except Exception:
+				if detail_url:
+					_open_detail_tab(detail_url)
+				else:
+					opened = _reopen_by_click(page_r, i, entry['codigo_venta'])
+					if opened is None:
+						raise RuntimeError(f"could not click the row's action on page {page_r}")
+					wait_detail_ready(driver, timeout)
+				budget.mark('open')
+				budget.clip_driver_timeouts(retry_limit)
+				credit_info, amortizacion, client, error = _extract_detail(driver, client_tab)
+				snapshot_url = detail_url or driver.current_url
+				if archive is not None and not budget.expired():
+					snapshot = page_snapshot(driver)
+				budget.mark('extract')
+			except Exception as e:
+				print(f"Warning: retry of row {i} on page {page_r} failed: {e}")
+				writer.skip({"row_index": i, "page_index": page_r, "reason": "row_timeout_retry_failed", "error": str(e), "codigo_venta": entry['codigo_venta'], "row_html": entry['html']})
+				continue
+			finally:
+				budget.end()
+				if opened is not None:
+					_back_to_listing(False, *opened)
+			if budget.expired():
+				writer.skip({"row_index": i, "page_index": page_r, "reason": "row_timeout_retry", "codigo_venta": entry['codigo_venta'], "elapsed": budget.elapsed(), "timings": dict(budget.timings), "row_html": entry['html']})
 				continue
+			if _keep_record(page_r, i, entry, fp, credit_info, amortizacion, client, snapshot, snapshot_url, advance_cursor=False, error=error):
+				print(f"Row {i} on page {page_r} extracted on retry ({budget.elapsed()}s)")
+	finally:
+		# vaciar la cola de escritura (también escribe skip_rows_debug.json),
+		# también si la extracción se interrumpe
+		writer.close()
+		if row_budget:
+			_set_page_load_timeout(driver, timeout)
 
-			# intentar leer codigo_venta directamente desde inputs en la fila (evita navegar cuando ya visto)
-			code_from_row = ""
-			try:
-				# buscar input hidden dentro de la última celda o en la fila
-				try:
-					inp = last_td.find_element(By.XPATH, ".//input[@name='codigo_venta']")
-					code_from_row = (inp.get_attribute('value') or "").strip()
-				except Exception:
-					# buscar en la fila entero
-					try:
-						inp = row.find_element(By.XPATH, ".//input[@name='codigo_venta']")
-						code_from_row = (inp.get_attribute('value') or "").strip()
-					except Exception:
-						# fallback: buscar cualquier hidden input with 'codigo' in name
-						try:
-							inp = row.find_element(By.XPATH, ".//input[contains(translate(@name,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'codigo')]")
-							code_from_row = (inp.get_attribute('value') or "").strip()
-						except Exception:
-							code_from_row = ""
-			except Exception:
-				code_from_row = ""
+	print(f"Extraction finished: {len(rows_info)} rows (including pre-existing)")
+	if executor is not None:
+		executor.shutdown(wait=True)
+	if session is not None:
+		session.close()
+	if detail_handle is not None:
+		try:
+			driver.switch_to.window(detail_handle)
+			driver.close()
+			driver.switch_to.window(listing_handle)
+		except Exception:
+			pass
+	cursor.mark_finished()
+	cursor.close()
+	if delta:
+		print(f"Delta: {delta_stats['new']} new, {delta_stats['changed']} changed, {delta_stats['unchanged']} unchanged rows")
+	if any(client_tab.values()):
+		print(f"Cliente tab: {client_tab['visible']} already shown, {client_tab['present']} read from the hidden pane, {client_tab['lazy']} clicked, {client_tab['fallback']} clicked after an empty hidden pane, {client_tab['network']} parsed from network responses")
+		_write_client_tab_stats(os.path.join(os.path.dirname(out_path) or 'output', 'client_tab_stats.json'), client_tab)
+	try:
+		fingerprints.compact()
+	except Exception as e:
+		print('Warning: could not compact fingerprint index:', e)
+	# cerrar el journal y compactarlo al formato de array legado (rows_info.json)
+	try:
+		store.close()
+		if replaced_codes:
+			# una sola versión por código: la nueva, en el lugar de la anterior
+			store.collapse(replaced_codes)
+			rows_info = list(store.iter_records())
+		store.compact()
+	except Exception as e:
+		print('Warning: could not compact rows_info file:', e)
+	return rows_info
 
-			# do not skip rows based on previously seen codes; allow duplicates
-			# (we still attempt to read code_from_row for diagnostics)
+def inventory_rows(driver, out_path: str = "output/rows_inventory.json", max_pages: int | None = None, timeout: int = 30, pages: Iterable[int] | None = None, backend: str = "browser"):
+	"""Recorre la paginación y guarda sólo las filas del listado, sin abrir ningún detalle.
 
-			el = None
-			try:
-				el = last_td.find_element(By.XPATH, ".//button[contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'ver m') or contains(.,'Ver m')]")
-			except Exception:
-				try:
-					candidates = last_td.find_elements(By.XPATH, ".//a | .//button | .//input[@type='button'] | .//input[@type='submit']")
-					if candidates:
-						el = candidates[0]
-				except Exception:
-					el = None
+	Cada fila se escribe como registro esqueleto `{'row': {...}, 'cliente': {'codigo_venta': ...}}`
+	(mismo esquema que `rows_info.json`, sin `info_credito` ni `amortizacion`) en un archivo
+	aparte, para no marcar como extraídas las ventas en la salida completa. Cada ejecución
+	reemplaza el inventario anterior. Con backend "http" y SOURCE_LISTING_PAGE_URL definida
+	las páginas se descargan por HTTP; con "network" las columnas salen de la respuesta
+	capturada que alimenta el listado.
 
-			if el is None:
-				# nada para clicar en esta fila
-				row_html = ""
+	max_pages / pages: como en `extract_all_rows_info`.
+	Retorna la lista de registros.
+	"""
+	out_path = _resolve_output_path(out_path)
+	store = RowsStore(out_path)
+	store.rewrite([])
+	store.open()
+
+	session = None
+	listing_template = (os.getenv('SOURCE_LISTING_PAGE_URL') or "") if backend == "http" else ""
+	if listing_template:
+		session = HttpSession.from_driver(driver, pool_size=1, timeout=timeout)
+	capture = NetworkCapture(driver) if backend == "network" else None
+	records = []
+	page_index = _get_active_page_number(driver) or 1
+	page_plan = iter(pages) if pages is not None else itertools.count(1)
+	target = next(page_plan, None)
+	try:
+		while target is not None:
+			if max_pages is not None and target > max_pages:
+				break
+			if session is not None:
 				try:
-					row_html = row.get_attribute('outerHTML')[:2000]
-				except Exception:
-					row_html = "<unable to get row html>"
-				# still, if code_from_row exists and not seen, add a placeholder client with only code
-				if code_from_row and code_from_row not in seen_codes:
-					client = {k: "" for k in ("name","birth_date","rfc","curp","sexo","estado_civil","telefono_local","telefono_celular","email","id_cliente","codigo_venta")}
-					client['codigo_venta'] = code_from_row
-					# append as wrapped object with row info
-					rows_info.append({'row': col_map or {'html': row_html}, 'cliente': client, 'info_credito': {}})
-					seen_codes.add(code_from_row)
-					try:
-						dirname = os.path.dirname(out_path)
-						if dirname and not os.path.exists(dirname):
-							os.makedirs(dirname, exist_ok=True)
-						with open(out_path, 'w', encoding='utf-8') as fh:
-							json.dump(rows_info, fh, ensure_ascii=False, indent=2)
-					except Exception:
-						print('Warning: could not write placeholder client to file')
-					# record this event for diagnostics
-					skipped_rows.append({
-						"row_index": i,
-						"reason": "no_clickable_element_but_code_placeholder_created",
-						"codigo_venta": code_from_row,
-						"row_html": row_html,
-					})
-					continue
-				# no code and no clickable element -> log and continue
-				skipped_rows.append({"row_index": i, "reason": "no_clickable_element_no_code", "row_html": row_html})
-				print(f"Row {i} skipped: no clickable element and no code found")
-				continue
-
-			# click y manejar si abre en nueva ventana/pestaña
-			prev_handles = driver.window_handles
-			try:
-				driver.execute_script('arguments[0].scrollIntoView(true);', el)
-				driver.execute_script('arguments[0].click();', el)
-			except Exception:
+					resp = session.get(listing_template.format(page=target))
+					listing = parse_listing(resp.text) if resp.status < 400 and not resp.looks_like_login() else []
+				except Exception as e:
+					print(f"Warning: could not fetch listing page {target} over HTTP: {e}")
+					listing = []
+			else:
+				if target != page_index:
+					if not go_to_page(driver, target, timeout=timeout):
+						break
+				listing = harvest_listing(driver)
+				if capture is not None:
+					listing = _merge_network_listing(listing, best_listing(capture, capture.drain()))
+			page_index = target
+			if not listing:
+				break
+			count_page(driver)
+			for i, entry in enumerate(listing):
+				record = {'row': entry['row'], 'cliente': {'codigo_venta': entry['codigo_venta'] or entry['row'].get('codigo_venta') or ''}}
+				records.append(record)
 				try:
-					el.click()
-				except Exception:
-					print(f"No se pudo clickear Ver más en fila {i}")
-					try:
-						row_html = row.get_attribute('outerHTML')[:2000]
-					except Exception:
-						row_html = "<unable to get row html>"
-					skipped_rows.append({"row_index": i, "reason": "click_failed", "row_html": row_html})
-					continue
+					store.append(record, pos=(page_index, i))
+				except Exception as e:
+					print('Warning: could not write inventory file:', e)
+			print(f"Inventory: page {page_index}, {len(listing)} rows ({len(records)} total)")
+			target = next(page_plan, None)
+	finally:
+		if session is not None:
+			session.close()
+		try:
+			store.close()
+			store.compact()
+		except Exception as e:
+			print('Warning: could not compact inventory file:', e)
 
-			# esperar breve para que cambie readyState o se abra nueva ventana
-			time.sleep(0.5)
-			new_handles = driver.window_handles
-
-			opened_new_window = False
-			original_handle = None
-			if len(new_handles) > len(prev_handles):
-				# una nueva ventana/pestaña se abrió
-				opened_new_window = True
-				# elegir el handle nuevo
-				new_handle = [h for h in new_handles if h not in prev_handles][0]
-				try:
-					original_handle = driver.current_window_handle
-				except Exception:
-					original_handle = prev_handles[0] if prev_handles else None
-				try:
-					driver.switch_to.window(new_handle)
-				except Exception:
-					# si no es posible, continuar con la ventana actual
-					opened_new_window = False
+	por_estado = {}
+	for r in records:
+		estado = r['row'].get('estado') or '(sin estado)'
+		por_estado[estado] = por_estado.get(estado, 0) + 1
+	print(f"Inventory finished: {len(records)} rows -> {out_path}")
+	for estado, n in sorted(por_estado.items(), key=lambda kv: -kv[1]):
+		print(f"  {estado}: {n}")
+	return records
 
-			# si no se abrió nueva ventana, esperar la carga en la misma pestaña
-			if not opened_new_window:
-				try:
-					WebDriverWait(driver, timeout).until(lambda d: d.execute_script("return document.readyState") == "complete")
-				except Exception:
-					time.sleep(0.8)
 
-			# intentar cerrar modales rápidos (misma heurística que antes)
-			try:
-				close_xpaths = [
-					"//button[contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'cerrar')]",
-					"//button[contains(@class,'close')]",
-					"//a[contains(@class,'close')]",
-					"//button[@aria-label='Close' or @aria-label='close']",
-				]
-				for xp in close_xpaths:
-					btns = driver.find_elements(By.XPATH, xp)
-					if btns:
-						try:
-							driver.execute_script('arguments[0].click();', btns[0])
-							time.sleep(0.2)
-							break
-						except Exception:
-							continue
-			except Exception:
-				pass
+def _merge_network_listing(listing: List[Dict[str, Any]], captured: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+	"""Columnas del listado desde la respuesta capturada, acciones desde el DOM.
 
-			# intentar activar la pestaña 'Cliente'
-			# extraer la sección 'Información del Crédito' antes de cambiar a la pestaña Cliente
-			credit_info = {}
-			try:
-				credit_info = extract_credit_info(driver)
-			except Exception:
-				credit_info = {}
+	Sólo se combinan si ambas listas tienen las mismas filas; si el DOM no tiene filas
+	se usan las capturadas (sin acción que clicar).
+	"""
+	if not captured:
+		return listing
+	if not listing:
+		return captured
+	if len(captured) != len(listing):
+		return listing
+	merged = []
+	for dom, net in zip(listing, captured):
+		entry = dict(dom)
+		entry['row'] = {**dom['row'], **{k: v for k, v in net['row'].items() if v}}
+		entry['codigo_venta'] = dom['codigo_venta'] or net['codigo_venta']
+		merged.append(entry)
+	return merged
+
+
+def _set_page_load_timeout(driver, seconds: float) -> None:
+	try:
+		driver.set_page_load_timeout(max(1, seconds))
+	except Exception as e:
+		print('Warning: could not set page load timeout:', e)
 
-			# extraer la Tabla de Amortización (si existe) antes de pasar a la pestaña Cliente
-			amortizacion = []
-			try:
-				amortizacion = extract_amortization_table(driver)
-			except Exception:
-				amortizacion = []
 
-			# intentar activar la pestaña 'Cliente'
-			try:
-				tab_xpaths = [
-					"//a[normalize-space(.)='Cliente']",
-					"//button[normalize-space(.)='Cliente']",
-					"//*[@role='tab' and contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'cliente')]",
-					"//ul[contains(@class,'nav') or contains(@class,'tabs')]//a[contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'cliente')]",
-				]
-				clicked_tab = False
-				for xp in tab_xpaths:
-					els = driver.find_elements(By.XPATH, xp)
-					if not els:
-						continue
-					for el_tab in els:
-						try:
-							driver.execute_script('arguments[0].scrollIntoView({block:"center",inline:"nearest"});', el_tab)
-							driver.execute_script('arguments[0].click();', el_tab)
-							clicked_tab = True
-							time.sleep(0.2)
-							break
-						except Exception:
-							continue
-					if clicked_tab:
-						break
-			except Exception:
-				pass
+def _fetch_detail_http(session, url: str, keep_html: bool = False):
+	"""Descarga y parsea una página de detalle por HTTP.
 
-			# extraer cliente
-			try:
-				client = extract_client_info(driver)
-			except Exception as e:
-				print(f"Error extrayendo cliente en fila {i}: {e}")
-				client = {}
-				try:
-					row_html = row.get_attribute('outerHTML')[:2000]
-				except Exception:
-					row_html = "<unable to get row html>"
-				skipped_rows.append({"row_index": i, "reason": "extraction_exception", "error": str(e), "row_html": row_html})
+	Retorna `(info_credito, amortizacion, cliente, error, html)` (como `_extract_detail`
+	más el HTML recortado si `keep_html`, si no None), o None si la respuesta no sirve
+	(login, error HTTP o cliente sin datos en el HTML) y la fila debe extraerse con el
+	navegador.
+	"""
+	resp = session.get(url)
+	if resp.status >= 400 or resp.looks_like_login():
+		return None
+	html = resp.text
+	credit_info, amortizacion, client = parse_detail_page(html)
+	if not any(client.values()):
+		return None
+	return credit_info, amortizacion, client, None, (strip_snapshot_html(html) if keep_html else None)
 
-			code = client.get('codigo_venta') or client.get('codigo') or ''
-			# always append the extracted client (allow duplicates) including credit info and amortization
-			rows_info.append({'row': col_map or {}, 'cliente': client, 'info_credito': credit_info, 'amortizacion': amortizacion})
-			if code:
-				seen_codes.add(code)
-			# escribir incrementalmente
-			try:
-				dirname = os.path.dirname(out_path)
-				if dirname and not os.path.exists(dirname):
-					os.makedirs(dirname, exist_ok=True)
-				with open(out_path, 'w', encoding='utf-8') as fh:
-					json.dump(rows_info, fh, ensure_ascii=False, indent=2)
-			except Exception as e:
-				print('Warning: could not write rows_info file:', e)
 
-			# cerrar ventana nueva si abrimos una y volver a la original
-			try:
-				if opened_new_window and original_handle:
-					try:
-						# cerrar la ventana actual (detalle)
-						driver.close()
-					except Exception:
-						pass
-					try:
-						driver.switch_to.window(original_handle)
-					except Exception:
-						# fallback: recargar la página fuente
-						try:
-							url = os.getenv('SOURCE_PAGE_URL')
-							if url:
-								driver.get(url)
-								WebDriverWait(driver, 5).until(lambda d: detect_main_table(d) is not None)
-								time.sleep(0.6)
-						except Exception:
-							pass
-				else:
-					# navegación en la misma pestaña: intentar back
-					try:
-						driver.back()
-						WebDriverWait(driver, 5).until(lambda d: detect_main_table(d) is not None)
-						time.sleep(0.4)
-					except Exception:
-						try:
-							url = os.getenv('SOURCE_PAGE_URL')
-							if url:
-								driver.get(url)
-								WebDriverWait(driver, 5).until(lambda d: detect_main_table(d) is not None)
-								time.sleep(0.6)
-						except Exception:
-							pass
-			except Exception:
-				# en caso de cualquier fallo no bloquear la iteración
+def _write_client_tab_stats(path: str, counts: Dict[str, int]) -> None:
+	"""Guarda en `path` los contadores de la pestaña 'Cliente' de esta ejecución."""
+	try:
+		with open(path, "w", encoding="utf-8") as fh:
+			json.dump({"finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"), **counts}, fh, indent=1)
+	except Exception as e:
+		print('Warning: could not write Cliente tab stats:', e)
+
+
+def _click_cliente_tab(driver) -> None:
+	"""Activa la pestaña 'Cliente' (primer selector que funcione, ver `SelectorCache`)."""
+	try:
+		tab_xpaths = [
+			"//a[normalize-space(.)='Cliente']",
+			"//button[normalize-space(.)='Cliente']",
+			"//*[@role='tab' and contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'cliente')]",
+			"//ul[contains(@class,'nav') or contains(@class,'tabs')]//a[contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'cliente')]",
+		]
+		def _click_tab(xp):
+			for el_tab in driver.find_elements(By.XPATH, xp):
 				try:
-					url = os.getenv('SOURCE_PAGE_URL')
-					if url:
-						driver.get(url)
-						WebDriverWait(driver, 5).until(lambda d: detect_main_table(d) is not None)
-						time.sleep(0.6)
+					driver.execute_script('arguments[0].scrollIntoView({block:"center",inline:"nearest"});', el_tab)
+					driver.execute_script('arguments[0].click();', el_tab)
+					wait_client_pane(driver, 0.2)
+					return True
 				except Exception:
-					pass
-
-				except Exception as e:
-					print(f"Warning: fila {i} fallo: {e}")
 					continue
+			return False
 
+		selector_cache().first_match("detail_cliente_tab", tab_xpaths, _click_tab)
+	except Exception:
+		pass
 
-        # finished rows on this page (or reached max_rows)
-		processed = len(rows_info)
-		# if max_rows limit reached, stop pagination
-		if max_rows is not None and processed >= max_rows:
-			break
 
-		# if max_pages limit reached, stop pagination
-		if max_pages is not None and page_index >= max_pages:
-			break
+def _extract_detail(driver, client_tab: Dict[str, int] | None = None):
+	"""Extrae los datos de la página de detalle abierta en la ventana actual.
 
-		# intentar navegar a la siguiente página
-		moved = go_to_next_page(driver, timeout=timeout)
-		if not moved:
-			break
-		# permitir que la nueva página cargue
-		time.sleep(0.6)
-		page_index += 1
+	Cierra modales rápidos, lee 'Información del Crédito' y la 'Tabla de Amortización',
+	activa la pestaña 'Cliente' si su panel no está ya en el DOM (`client_pane_state`)
+	y extrae el cliente. Retorna `(info_credito, amortizacion, cliente, error)`;
+	`error` es la excepción de la extracción del cliente o None.
 
-	print(f"Extraction finished: {len(rows_info)} rows (including pre-existing)")
-	# escribir diagnóstico de filas saltadas para inspección
+	client_tab: contador por caso ('visible', 'present', 'lazy' = se clicó la pestaña,
+	'fallback' = el panel oculto estaba vacío y se clicó) que se incrementa.
+	"""
+	# intentar cerrar modales rápidos (misma heurística que antes)
+	try:
+		close_xpaths = [
+			"//button[contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'cerrar')]",
+			"//button[contains(@class,'close')]",
+			"//a[contains(@class,'close')]",
+			"//button[@aria-label='Close' or @aria-label='close']",
+		]
+		def _click_close(xp):
+			btns = driver.find_elements(By.XPATH, xp)
+			if not btns:
+				return False
+			driver.execute_script('arguments[0].click();', btns[0])
+			wait_dom_change(driver, 0.2)
+			return True
+
+		selector_cache().first_match("detail_close_modal", close_xpaths, _click_close, interchangeable=True)
+	except Exception:
+		pass
+
+	# intentar activar la pestaña 'Cliente'
+	# extraer la sección 'Información del Crédito' antes de cambiar a la pestaña Cliente
+	credit_info = {}
+	try:
+		credit_info = extract_credit_info(driver)
+	except Exception:
+		credit_info = {}
+
+	# extraer la Tabla de Amortización (si existe) antes de pasar a la pestaña Cliente
+	amortizacion = []
+	try:
+		amortizacion = extract_amortization_table(driver)
+	except Exception:
+		amortizacion = []
+
+	# la pestaña 'Cliente' sólo se clica si su panel no está ya en el DOM (cargado y
+	# oculto, estilo Bootstrap) o mostrándose
+	state = client_pane_state(driver)
+	if state == "lazy":
+		_click_cliente_tab(driver)
+
+	# extraer cliente
+	error = None
 	try:
-		dirname = os.path.dirname(out_path) or 'output'
-		if dirname and not os.path.exists(dirname):
-			os.makedirs(dirname, exist_ok=True)
-		with open(os.path.join(dirname, 'skip_rows_debug.json'), 'w', encoding='utf-8') as fh:
-			json.dump(skipped_rows, fh, ensure_ascii=False, indent=2)
-		print(f"Wrote skip_rows_debug.json with {len(skipped_rows)} records for diagnosis")
+		client = extract_client_info(driver, include_hidden=state == "present")
+		if state == "present" and not client.get('name'):
+			# el panel oculto no traía los datos: activar la pestaña y volver a leer
+			state = "fallback"
+			_click_cliente_tab(driver)
+			client = extract_client_info(driver)
 	except Exception as e:
-		print('Warning: could not write skip_rows_debug.json:', e)
-	return rows_info
+		client = {}
+		error = e
+	if client_tab is not None:
+		client_tab[state] = client_tab.get(state, 0) + 1
+
+	return credit_info, amortizacion, client, error
+
 
 def detect_main_table(driver):
 	"""Intenta localizar la tabla principal de ventas en la página.
@@ -463,6 +952,8 @@ def go_to_next_page(driver, timeout: int = 8) -> bool:
 	"""
 	try:
 		prev = _get_active_page_number(driver)
+		# filas actuales: la espera termina cuando cambian el número activo y la tabla
+		prev_sig = listing_signature(driver)
 		# prefer clicking the next numeric page (current + 1)
 		if prev is not None:
 			target = prev + 1
@@ -475,7 +966,8 @@ def go_to_next_page(driver, timeout: int = 8) -> bool:
 					raise Exception('page link disabled')
 				driver.execute_script('arguments[0].scrollIntoView(true);', el)
 				driver.execute_script('arguments[0].click();', el)
-				WebDriverWait(driver, timeout).until(lambda d: _get_active_page_number(d) != prev)
+				if not wait_page_change(driver, prev, timeout, prev_sig):
+					raise TimeoutException('page did not change')
 				print(f"Navigated to page {target}")
 				return True
 			except Exception:
@@ -490,55 +982,107 @@ def go_to_next_page(driver, timeout: int = 8) -> bool:
 				return False
 			driver.execute_script('arguments[0].scrollIntoView(true);', next_btn)
 			driver.execute_script('arguments[0].click();', next_btn)
-			WebDriverWait(driver, timeout).until(lambda d: _get_active_page_number(d) != prev)
+			if not wait_page_change(driver, prev, timeout, prev_sig):
+				raise TimeoutException('page did not change')
 			print("Clicked 'siguiente' pagination control")
 			return True
 		except Exception:
 			pass
 
 		# try jump-control to next block (a10sig)
-		try:
-			a10 = driver.find_element(By.XPATH, "//a[contains(@class,'page-link') and @data-accion='a10sig']")
-			cls = (a10.get_attribute('class') or '')
-			if 'cursor-cancel' in cls:
-				return False
-			driver.execute_script('arguments[0].scrollIntoView(true);', a10)
-			driver.execute_script('arguments[0].click();', a10)
-			WebDriverWait(driver, timeout).until(lambda d: _get_active_page_number(d) != prev)
-			print("Clicked 'a10sig' pagination control (next block)")
-			return True
-		except Exception:
-			pass
-
-		return False
+		return _jump_next_block(driver, prev, prev_sig, timeout)
 	except Exception:
 		return False
 
 
-def fetch_source_page(headless: bool = False, timeout: int = 30) -> Dict[str, Any]:
-	"""Carga SOURCE_PAGE_URL desde .env y la abre con Selenium.
+def _jump_next_block(driver, prev, prev_sig: str, timeout: int = 8) -> bool:
+	"""Click the 'a10sig' control (next block of 10 pages). Returns True if the page changed."""
+	try:
+		a10 = driver.find_element(By.XPATH, "//a[contains(@class,'page-link') and @data-accion='a10sig']")
+		cls = (a10.get_attribute('class') or '')
+		if 'cursor-cancel' in cls:
+			return False
+		driver.execute_script('arguments[0].scrollIntoView(true);', a10)
+		driver.execute_script('arguments[0].click();', a10)
+		if not wait_page_change(driver, prev, timeout, prev_sig):
+			return False
+		print("Clicked 'a10sig' pagination control (next block)")
+		return True
+	except Exception:
+		return False
 
-	Nota: por defecto abre el navegador en modo visible (headless=False) para
-	facilitar la verificación manual.
 
-	Retorna un dict con keys: url, title, html (str, truncated a 10000 chars), error (si aplica).
+def go_to_page(driver, target: int, timeout: int = 8) -> bool:
+	"""Navigate the table pagination so that the active page is `target`.
+
+	Tries, cheapest first:
+	  1. direct jump: click `a.Pagina[data-valor=target]`, synthesizing the link when
+	     the target is outside the rendered block (works forward and backward);
+	  2. request parameter: load SOURCE_LISTING_PAGE_URL (with '{page}') if defined;
+	  3. stepping forward: 'a10sig' block jumps while the target is beyond the
+	     rendered block, then `go_to_next_page`.
+	Returns True if the active page ends up being `target`.
 	"""
-	load_dotenv()
-	url = os.getenv("SOURCE_PAGE_URL")
-	if not url:
-		return {"error": "SOURCE_PAGE_URL no encontrada en .env"}
+	current = _get_active_page_number(driver) or 1
+	if current == target:
+		return True
+
+	# 1. enlace data-valor (real o sintético); si el sintético no funciona en este ERP
+	# no se vuelve a intentar con este driver
+	if getattr(driver, '_mig_direct_jump', True):
+		prev_sig = listing_signature(driver)
+		how = click_page_link(driver, target)
+		if how and wait_page_change(driver, current, timeout, prev_sig):
+			new = _get_active_page_number(driver)
+			if new == target:
+				print(f"Jumped to page {target} ({how} link)")
+				return True
+		elif how == 'synthetic':
+			try:
+				driver._mig_direct_jump = False
+			except Exception:
+				pass
+		current = _get_active_page_number(driver) or current
+		if current == target:
+			return True
 
-	options = Options()
-	# Usar el nuevo modo headless de Chrome si está disponible
-	if headless:
+	# 2. parámetro de la petición
+	template = os.getenv('SOURCE_LISTING_PAGE_URL') or ''
+	if '{page}' in template:
 		try:
-			options.add_argument("--headless=new")
-		except Exception:
-			options.add_argument("--headless")
-
-	# Opciones útiles para entornos sin UI
-	options.add_argument("--no-sandbox")
-	options.add_argument("--disable-dev-shm-usage")
+			driver.get(template.format(page=target))
+			wait_listing_ready(driver, timeout)
+			if _get_active_page_number(driver) == target:
+				print(f"Loaded page {target} from SOURCE_LISTING_PAGE_URL")
+				return True
+		except Exception as e:
+			print(f"Warning: could not load listing page {target} by URL: {e}")
+		current = _get_active_page_number(driver) or current
+
+	# 3. avanzar por bloques y página a página
+	while current != target:
+		if current > target:
+			# sin salto directo la paginación sólo se recorre hacia adelante
+			return False
+		top = max_visible_page(driver)
+		moved = False
+		if top is not None and target > top:
+			moved = _jump_next_block(driver, current, listing_signature(driver), timeout)
+		if not moved and not go_to_next_page(driver, timeout=timeout):
+			return False
+		new = _get_active_page_number(driver)
+		if new is None or new == current:
+			return False
+		current = new
+	return True
+
+
+def _build_source_options(headless: bool = False, network_log: bool = False, profile_dir: str | None = None, lean: bool = False, renderer_limit: int = 4) -> Options:
+	"""Opciones de Chrome usadas para el ERP origen (`network_log`: log de red para el backend "network";
+	`profile_dir`: perfil persistente, ver `helppers.browser_profile`; `lean`: perfil ligero, ver
+	`helppers.chrome_launcher`)."""
+	# headless, no-sandbox y /dev/shm (entornos sin UI) son comunes con el destino
+	options = chrome_options(headless=headless, lean=lean, renderer_limit=renderer_limit, network_log=network_log, profile_dir=profile_dir)
 	options.add_argument("--disable-gpu")
 	options.add_argument("--window-size=1200,900")
 	# Un user-agent básico
@@ -546,139 +1090,158 @@ def fetch_source_page(headless: bool = False, timeout: int = 30) -> Dict[str, An
 		"user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
 		"AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36"
 	)
+	return options
 
-	driver = None
+
+def _attempt_login_if_needed(driver, timeout: int = 30) -> bool:
+	"""Si la página actual muestra un formulario de login, lo rellena con
+	HOST_USERNAME/HOST_PASSWORD y lo envía. Retorna True si se envió el formulario."""
 	try:
-		driver = webdriver.Chrome(options=options)
-		driver.set_page_load_timeout(timeout)
-		driver.get(url)
+		pwd_inputs = driver.find_elements(By.XPATH, "//input[@type='password']")
+	except Exception:
+		pwd_inputs = []
 
-		# Si la página redirige a un formulario de login, intentaremos autenticarnos
-		def _attempt_login_if_needed() -> bool:
-			try:
-				pwd_inputs = driver.find_elements(By.XPATH, "//input[@type='password']")
-			except Exception:
-				pwd_inputs = []
+	if not pwd_inputs:
+		return False
 
-			if not pwd_inputs:
-				return False
+	# necesitaremos credenciales en env
+	username = os.getenv("HOST_USERNAME")
+	password = os.getenv("HOST_PASSWORD")
+	if not username or not password:
+		raise RuntimeError("LOGIN_REQUIRED: falta HOST_USERNAME o HOST_PASSWORD en .env")
 
-			# necesitaremos credenciales en env
-			username = os.getenv("HOST_USERNAME")
-			password = os.getenv("HOST_PASSWORD")
-			if not username or not password:
-				raise RuntimeError("LOGIN_REQUIRED: falta HOST_USERNAME o HOST_PASSWORD en .env")
+	# heurísticas para localizar el campo de usuario
+	username_candidate = None
+	# primero intentar buscar dentro del mismo form que el campo password
+	try:
+		form = pwd_inputs[0].find_element(By.XPATH, "./ancestor::form")
+	except Exception:
+		form = None
+
+	search_xpaths = []
+	if form is not None:
+		# buscar inputs relevantes dentro del form
+		search_xpaths = [
+			".//input[@type='text']",
+			".//input[@type='email']",
+			".//input[contains(translate(@name,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'user')]",
+			".//input[contains(translate(@name,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'username')]",
+			".//input[contains(translate(@id,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'user')]",
+			".//input[contains(translate(@id,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'username')]",
+		]
+		username_candidate = selector_cache().first_match(
+			"login_user_field_in_form", search_xpaths,
+			lambda xp: next(iter(form.find_elements(By.XPATH, xp)), None),
+		)
+
+	# si no encontramos en el form, buscar globalmente
+	if username_candidate is None:
+		global_xps = [
+			"//input[@type='text']",
+			"//input[@type='email']",
+			"//input[contains(translate(@name,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'user')]",
+			"//input[contains(translate(@name,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'username')]",
+			"//input[contains(translate(@id,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'user')]",
+			"//input[contains(translate(@id,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'username')]",
+			"//input[contains(translate(@name,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'email')]",
+		]
+		# elegir el primero de la XPath que acierte
+		username_candidate = selector_cache().first_match(
+			"login_user_field", global_xps,
+			lambda xp: next(iter(driver.find_elements(By.XPATH, xp)), None),
+		)
+
+	if username_candidate is None:
+		raise RuntimeError("LOGIN_REQUIRED: no se encontró campo de usuario automáticamente")
+
+	# escribir credenciales
+	try:
+		username_candidate.clear()
+		username_candidate.send_keys(username)
+	except Exception:
+		pass
 
-			# heurísticas para localizar el campo de usuario
-			username_candidate = None
-			# primero intentar buscar dentro del mismo form que el campo password
-			try:
-				form = pwd_inputs[0].find_element(By.XPATH, "./ancestor::form")
-			except Exception:
-				form = None
-
-			search_xpaths = []
-			if form is not None:
-				# buscar inputs relevantes dentro del form
-				search_xpaths = [
-					".//input[@type='text']",
-					".//input[@type='email']",
-					".//input[contains(translate(@name,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'user')]",
-					".//input[contains(translate(@name,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'username')]",
-					".//input[contains(translate(@id,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'user')]",
-					".//input[contains(translate(@id,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'username')]",
-				]
-				for xp in search_xpaths:
-					try:
-						el = form.find_elements(By.XPATH, xp)
-						if el:
-							username_candidate = el[0]
-							break
-					except Exception:
-						continue
+	try:
+		pwd = pwd_inputs[0]
+		pwd.clear()
+		pwd.send_keys(password)
+	except Exception:
+		raise RuntimeError("LOGIN_FAILED: no se pudo escribir la contraseña")
 
-			# si no encontramos en el form, buscar globalmente
-			if username_candidate is None:
-				global_xps = [
-					"//input[@type='text']",
-					"//input[@type='email']",
-					"//input[contains(translate(@name,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'user')]",
-					"//input[contains(translate(@name,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'username')]",
-					"//input[contains(translate(@id,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'user')]",
-					"//input[contains(translate(@id,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'username')]",
-					"//input[contains(translate(@name,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'email')]",
-				]
-				for xp in global_xps:
-					try:
-						el = driver.find_elements(By.XPATH, xp)
-						if el:
-							# elegir el primero visible/enable
-							username_candidate = el[0]
-							break
-					except Exception:
-						continue
+	# intentar submit: buscar botón dentro del form, si existe
+	submitted = False
+	try:
+		if form is not None:
+			btns = form.find_elements(By.XPATH, ".//button[@type='submit'] | .//input[@type='submit']")
+			if btns:
+				try:
+					btns[0].click()
+					submitted = True
+				except Exception:
+					pass
+	except Exception:
+		pass
 
-			if username_candidate is None:
-				raise RuntimeError("LOGIN_REQUIRED: no se encontró campo de usuario automáticamente")
+	if not submitted:
+		# fallback: enviar ENTER en el campo password
+		try:
+			pwd_inputs[0].send_keys(Keys.ENTER)
+			submitted = True
+		except Exception:
+			pass
 
-			# escribir credenciales
-			try:
-				username_candidate.clear()
-				username_candidate.send_keys(username)
-			except Exception:
-				pass
+	# esperar a cambio de URL o readyState
+	try:
+		original_url = driver.current_url
+		WebDriverWait(driver, min(timeout, 20)).until(
+			lambda d: d.current_url != original_url or d.execute_script("return document.readyState") == "complete"
+		)
+	except Exception:
+		# tolerar tiempo de espera; continuamos
+		pass
 
-			try:
-				pwd = pwd_inputs[0]
-				pwd.clear()
-				pwd.send_keys(password)
-			except Exception:
-				raise RuntimeError("LOGIN_FAILED: no se pudo escribir la contraseña")
+	return submitted
 
-			# intentar submit: buscar botón dentro del form, si existe
-			submitted = False
-			try:
-				if form is not None:
-					btns = form.find_elements(By.XPATH, ".//button[@type='submit'] | .//input[@type='submit']")
-					if btns:
-						try:
-							btns[0].click()
-							submitted = True
-						except Exception:
-							pass
-			except Exception:
-				pass
 
-			if not submitted:
-				# fallback: enviar ENTER en el campo password
-				try:
-					pwd_inputs[0].send_keys(Keys.ENTER)
-					submitted = True
-				except Exception:
-					pass
+def _open_source_url(driver, url: str, timeout: int = 30, reuse_session: bool = False) -> None:
+	"""Navega a `url`, autenticándose si aparece un formulario de login.
+
+	reuse_session: el navegador usa un perfil persistente; si la sesión guardada sigue
+	autenticada (la página no pide contraseña) se omiten las heurísticas de login.
+	Lanza RuntimeError (LOGIN_REQUIRED / LOGIN_FAILED) si el login no es posible.
+	"""
+	driver.get(url)
 
-			# esperar a cambio de URL o readyState
+	if reuse_session and session_authenticated(driver):
+		print("Stored browser session is still authenticated; skipping login")
+		wait_listing_ready(driver, 1)
+		return
+
+	# Si la página redirige a un formulario de login, intentaremos autenticarnos
+	login_submitted = _attempt_login_if_needed(driver, timeout)
+
+	# Si tras el login la URL actual no es la que queremos, navegar explícitamente
+	try:
+		if driver.current_url.rstrip('/') != url.rstrip('/') or login_submitted:
+			# navegar al recurso objetivo
+			driver.get(url)
 			try:
-				original_url = driver.current_url
 				WebDriverWait(driver, min(timeout, 20)).until(
-					lambda d: d.current_url != original_url or d.execute_script("return document.readyState") == "complete"
+					lambda d: d.execute_script("return document.readyState") == "complete"
 				)
 			except Exception:
-				# tolerar tiempo de espera; continuamos
 				pass
 
-			return submitted
-
-		# intentar login si detectamos formulario de password
+		# Si tras navegar seguimos encontrando un formulario de login, intentar login una vez más
 		try:
-			login_submitted = _attempt_login_if_needed()
-		except Exception as e:
-			return {"error": str(e)}
+			pwd_inputs_now = driver.find_elements(By.XPATH, "//input[@type='password']")
+		except Exception:
+			pwd_inputs_now = []
 
-		# Si tras el login la URL actual no es la que queremos, navegar explícitamente
-		try:
-			if driver.current_url.rstrip('/') != url.rstrip('/') or login_submitted:
-				# navegar al recurso objetivo
+		if pwd_inputs_now:
+			second_submitted = _attempt_login_if_needed(driver, timeout)
+
+			if second_submitted:
 				driver.get(url)
 				try:
 					WebDriverWait(driver, min(timeout, 20)).until(
@@ -686,83 +1249,199 @@ def fetch_source_page(headless: bool = False, timeout: int = 30) -> Dict[str, An
 					)
 				except Exception:
 					pass
+	except RuntimeError:
+		raise
+	except Exception:
+		# no crítico, continuamos con la página actual (posiblemente la home)
+		pass
 
-			# Si tras navegar seguimos encontrando un formulario de login, intentar login una vez más
-			try:
-				pwd_inputs_now = driver.find_elements(By.XPATH, "//input[@type='password']")
-			except Exception:
-				pwd_inputs_now = []
+	# Esperar hasta que document.readyState sea 'complete' o hasta timeout
+	try:
+		WebDriverWait(driver, min(timeout, 20)).until(
+			lambda d: d.execute_script("return document.readyState") == "complete"
+		)
+	except TimeoutException:
+		# tolerar, seguiremos y tomaremos el HTML parcial
+		pass
 
-			if pwd_inputs_now:
-				try:
-					second_submitted = _attempt_login_if_needed()
-				except Exception as e:
-					return {"error": str(e)}
+	# JS adicional: continuar en cuanto la tabla tenga filas (máx. 1 s, la antigua espera fija)
+	wait_listing_ready(driver, 1)
 
-				if second_submitted:
-						driver.get(url)
-						try:
-							WebDriverWait(driver, min(timeout, 20)).until(
-								lambda d: d.execute_script("return document.readyState") == "complete"
-							)
-						except Exception:
-							pass
-		except Exception:
-			# no crítico, continuamos y devolveremos el html actual (posiblemente de la home)
-			pass
 
-		# Esperar hasta que document.readyState sea 'complete' o hasta timeout
+# desarrollo por defecto (el único que se migraba antes del modo multi-desarrollo)
+DEFAULT_DESARROLLO = ("6", "UKUUN")
+
+
+def list_desarrollo_options(driver) -> List[Tuple[str, str]]:
+	"""Opciones del filtro 'Desarrollo' (`#desarrollots`) como `(value, texto)`, sin la opción vacía/'Todos'."""
+	try:
+		opts = driver.execute_script(
+			"var s = document.getElementById('desarrollots');"
+			"return s ? Array.from(s.options).map(function (o) { return [o.value, (o.textContent || '').trim()]; }) : [];"
+		) or []
+	except Exception:
+		return []
+	out = []
+	for value, text in opts:
+		value = (value or '').strip()
+		if not value or value in ('0', '-1') or not text or text.lower().startswith(('todos', 'seleccion', '--')):
+			continue
+		out.append((value, text))
+	return out
+
+
+def _select_desarrollo_filter(driver, value: str = DEFAULT_DESARROLLO[0], text: str = DEFAULT_DESARROLLO[1]) -> bool:
+	"""Selecciona la opción `text` (o `value`) del filtro 'Desarrollo' y espera a que la tabla se recargue.
+
+	Retorna True si el filtro quedó aplicado.
+	"""
+	try:
+		prev_sig = listing_signature(driver)
+		# primero intentar con el <select> real
+		sel_el = driver.find_element(By.ID, "desarrollots")
+		already = (sel_el.get_attribute('value') or '') == value
+		# intentar seleccionar por texto visible
 		try:
-			WebDriverWait(driver, min(timeout, 20)).until(
-				lambda d: d.execute_script("return document.readyState") == "complete"
-			)
-		except TimeoutException:
-			# tolerar, seguiremos y tomaremos el HTML parcial
+			Select(sel_el).select_by_visible_text(text)
+		except Exception:
+			# fallback a seleccionar por value
+			try:
+				Select(sel_el).select_by_value(value)
+			except Exception:
+				# como último recurso, establecer value y disparar change via JS
+				driver.execute_script("arguments[0].value = arguments[1]; arguments[0].dispatchEvent(new Event('change'));", sel_el, value)
+		# también intentar actualizar el contenedor select2 si está presente
+		try:
+			driver.execute_script("var c=document.getElementById('select2-desarrollots-container'); if(c){c.textContent=arguments[0]; c.setAttribute('title', arguments[0]);}", text)
+		except Exception:
 			pass
+		# esperar a que la tabla se recargue con las filas filtradas (máx. 5 s)
+		if not already:
+			wait_listing_ready(driver, 5, prev_sig)
+		print(f"Selected '{text}' in Desarrollo filter")
+		return True
+	except Exception as e:
+		print(f"Warning: could not set Desarrollo filter to {text}:", e)
+		return False
 
-		# pequeña espera para permitir JS adicional (ajustable)
-		time.sleep(1)
-		title = driver.title
 
-		# Intentar seleccionar el filtro 'Desarrollo' a la opción 'UKUUN'
+def _maximize_page_size(driver, timeout: int = 30) -> None:
+	"""Selecciona el mayor tamaño de página del listado (si tiene control de longitud) y espera la recarga."""
+	prev_sig = listing_signature(driver)
+	size, changed = select_max_page_size(driver)
+	if size is None:
+		return
+	if changed:
+		wait_listing_ready(driver, timeout, prev_sig)
+		print(f"Listing page size set to {size}")
+
+
+def start_source_session(headless: bool = False, timeout: int = 30, max_page_size: bool = True, desarrollo: Tuple[str, str] | None = DEFAULT_DESARROLLO, network_log: bool = False, profile_dir: str | None = None, lean: bool = False, renderer_limit: int = 4):
+	"""Abre Chrome, se autentica en SOURCE_PAGE_URL y aplica el filtro 'Desarrollo'.
+
+	max_page_size: si el listado tiene un control "mostrar N registros", elegir el mayor
+	tamaño para recorrer menos páginas.
+	desarrollo: opción `(value, texto)` del filtro (por defecto UKUUN); None deja el
+	listado sin filtrar.
+	network_log: activar el log de red de Chrome (necesario para el backend "network").
+	profile_dir: directorio de perfil de Chrome persistente (cookies y caché entre
+	ejecuciones); con un perfil cuya sesión sigue activa no se repite el login.
+	lean: no descargar imágenes, fuentes, multimedia ni scripts de terceros y limitar
+	los procesos de render a `renderer_limit` (ver `helppers.chrome_launcher`).
+
+	Retorna el WebDriver posicionado sobre la tabla de ventas. Lanza RuntimeError
+	si falta la configuración o el login falla (el navegador se cierra en ese caso).
+	"""
+	load_dotenv()
+	url = os.getenv("SOURCE_PAGE_URL")
+	if not url:
+		raise RuntimeError("SOURCE_PAGE_URL no encontrada en .env")
+
+	driver = start_chrome(_build_source_options(headless, network_log=network_log, profile_dir=profile_dir, lean=lean, renderer_limit=renderer_limit), lean=lean)
+	try:
+		driver.set_page_load_timeout(timeout)
+		_open_source_url(driver, url, timeout, reuse_session=bool(profile_dir))
+		if desarrollo is not None:
+			_select_desarrollo_filter(driver, *desarrollo)
+		if max_page_size:
+			_maximize_page_size(driver, timeout)
+	except Exception:
 		try:
-			# primero intentar con el <select> real
-			try:
-				sel_el = driver.find_element(By.ID, "desarrollots")
-				# intentar seleccionar por texto visible
-				try:
-					Select(sel_el).select_by_visible_text("UKUUN")
-				except Exception:
-					# fallback a seleccionar por value (6 según el HTML suministrado)
-					try:
-						Select(sel_el).select_by_value("6")
-					except Exception:
-						# como último recurso, establecer value y disparar change via JS
-						driver.execute_script("arguments[0].value = arguments[1]; arguments[0].dispatchEvent(new Event('change'));", sel_el, "6")
-				# también intentar actualizar el contenedor select2 si está presente
-				try:
-					driver.execute_script("var c=document.getElementById('select2-desarrollots-container'); if(c){c.textContent=arguments[0]; c.setAttribute('title', arguments[0]);}", "UKUUN")
-				except Exception:
-					pass
-				# esperar un poco a que la tabla se recargue
-				try:
-					WebDriverWait(driver, 5).until(lambda d: detect_main_table(d) is not None)
-					time.sleep(0.8)
-				except Exception:
-					time.sleep(1)
-				print("Selected 'UKUUN' in Desarrollo filter")
-			except Exception as e:
-				print("Warning: could not set Desarrollo filter to UKUUN:", e)
+			driver.quit()
 		except Exception:
 			pass
+		raise
+	return driver
+
+
+def _open_archive(archive_dir: str | None, codec: str = "gzip") -> SnapshotArchive | None:
+	"""Abre el archivo de snapshots en `archive_dir` (relativo a output/), o None si no se pidió."""
+	if not archive_dir:
+		return None
+	try:
+		return SnapshotArchive(_resolve_output_path(archive_dir), codec=codec).open()
+	except Exception as e:
+		print('Warning: could not open snapshot archive:', e)
+		return None
+
+
+def fetch_source_page(headless: bool = False, timeout: int = 30, refresh: bool = False, max_pages: int | None = 2, backend: str = "browser", archive_dir: str | None = None, archive_codec: str = "gzip", max_page_size: bool = True, delta: bool = False, tabs: int = 1, row_budget: float | None = None, inventory: bool = False, profile: str | None = None, lean: bool = False, memory_limit_mb: float | None = None) -> Dict[str, Any]:
+	"""Carga SOURCE_PAGE_URL desde .env y la abre con Selenium.
+
+	Nota: por defecto abre el navegador en modo visible (headless=False) para
+	facilitar la verificación manual.
+
+	refresh: se pasa a `extract_all_rows_info` para forzar la re-extracción de filas ya vistas.
+	max_pages: número máximo de páginas a recorrer (None = todas).
+	backend: "browser", "http" o "network" (ver `extract_all_rows_info`).
+	archive_dir / archive_codec: si se indica, guarda los snapshots de los detalles
+	(ver `SnapshotArchive`).
+	max_page_size: ver `start_source_session`.
+	delta / tabs / row_budget: ver `extract_all_rows_info`.
+	inventory: sólo recorrer el listado (`inventory_rows`, a output/rows_inventory.json).
+	profile: perfil de Chrome persistente (nombre bajo .chrome_profiles/ o ruta; por
+	defecto SOURCE_CHROME_PROFILE del .env, sin perfil si no está definida).
+	lean: perfil de Chrome ligero (ver `start_source_session`).
+	memory_limit_mb: reiniciar el navegador (nueva sesión, misma página) cuando su
+	memoria supere este valor (ver `extract_all_rows_info`).
+
+	Retorna un dict con keys: url, title, html (str, truncated a 10000 chars), error (si aplica).
+	"""
+	load_dotenv()
+	url = os.getenv("SOURCE_PAGE_URL")
+	if not url:
+		return {"error": "SOURCE_PAGE_URL no encontrada en .env"}
+
+	driver = None
+	archive = _open_archive(archive_dir, archive_codec)
+	try:
+		def _start():
+			return start_source_session(headless=headless, timeout=timeout, max_page_size=max_page_size, network_log=backend == "network", profile_dir=worker_profile_dir(resolve_profile_dir(profile, "SOURCE_CHROME_PROFILE"), 0), lean=lean, renderer_limit=max(4, tabs + 1))
+
+		def _restart(old):
+			nonlocal driver
+			driver = None
+			driver = restart_driver(old, _start)
+			return driver
 
-		# Extraer clientes para todas las filas de la tabla
 		try:
-			# final run: limit pages to 21 (full run)
-			rows_info = extract_all_rows_info(driver, out_path="output/rows_info.json", max_rows=None, max_pages=2, timeout=timeout)
-			print(f"Extracted {len(rows_info)} rows (saved to output/rows_info.json)")
-		except Exception as e:
-			print("Warning: could not extract all the info from the rows:", e)
+			driver = _start()
+		except RuntimeError as e:
+			return {"error": str(e)}
+		title = driver.title
+
+		if inventory:
+			try:
+				inventory_rows(driver, max_pages=max_pages, timeout=timeout, backend=backend)
+			except Exception as e:
+				print("Warning: could not build the listing inventory:", e)
+		else:
+			# Extraer clientes para todas las filas de la tabla
+			try:
+				rows_info = extract_all_rows_info(driver, out_path="output/rows_info.json", max_rows=None, max_pages=max_pages, timeout=timeout, refresh=refresh, backend=backend, archive=archive, delta=delta, tabs=tabs, row_budget=row_budget, memory_limit_mb=memory_limit_mb, restart=_restart)
+				print(f"Extracted {len(rows_info)} rows (saved to output/rows_info.json)")
+			except Exception as e:
+				print("Warning: could not extract all the info from the rows:", e)
 
 		html = driver.page_source
 
@@ -778,11 +1457,268 @@ def fetch_source_page(headless: bool = False, timeout: int = 30) -> Dict[str, An
 				driver.quit()
 			except Exception:
 				pass
+		if archive is not None:
+			archive.close()
 
 
-def _main() -> int:
-	# Fuerza abrir el navegador visible
-	out = fetch_source_page(headless=False)
+def _shard_out_path(out_path: str, worker: int) -> str:
+	"""Ruta de salida del worker `worker` (0-based): <dir>/shards/worker<N>/<archivo>."""
+	return os.path.join(os.path.dirname(out_path), "shards", f"worker{worker + 1}", os.path.basename(out_path))
+
+
+def merge_shard_outputs(shard_paths: List[str], out_path: str) -> List[Any]:
+	"""Fusiona las salidas de los workers en `out_path` sin perder lo que ya tenía.
+
+	Los registros de los shards se ordenan por (página, fila) (los que no tienen
+	posición, p. ej. cargados de un rows_info legado, primero) y se integran con
+	`RowsStore.merge`: por `codigo_venta` el más reciente sustituye al anterior y el
+	resto de `out_path` (ejecuciones anteriores, sin shards o reanudadas) se conserva.
+	Las huellas de los shards pasan también al índice de `out_path`.
+	"""
+	entries = []
+	for k, shard_path in enumerate(shard_paths):
+		for seq, (pos, item) in enumerate(RowsStore(shard_path).iter_records(with_pos=True)):
+			key = pos if pos is not None else (0, seq)
+			entries.append((key, k, seq, item))
+	entries.sort(key=lambda e: (e[0], e[1], e[2]))
+	store = RowsStore(out_path)
+	store.merge(e[3] for e in entries)
+	_merge_fingerprints(shard_paths, out_path)
+	return list(store.iter_records())
+
+
+def _merge_fingerprints(part_paths: Iterable[str], out_path: str) -> None:
+	"""Copia al índice de huellas de `out_path` las de cada partición (las de la partición ganan)."""
+	index = FingerprintIndex.for_output(out_path).load()
+	for path in part_paths:
+		for code, fp in FingerprintIndex.for_output(path).load().fingerprints.items():
+			index.record(code, fp)
+	index.compact()
+
+
+def extract_rows_info_sharded(workers: int = 2, headless: bool = False, timeout: int = 30, out_path: str = "output/rows_info.json", max_pages: int | None = None, refresh: bool = False, stagger: float = 2.0, backend: str = "browser", archive_dir: str | None = None, archive_codec: str = "gzip", max_page_size: bool = True, delta: bool = False, tabs: int = 1, row_budget: float | None = None, inventory: bool = False, profile: str | None = None, lean: bool = False, memory_limit_mb: float | None = None) -> List[Any]:
+	"""Extrae la tabla de ventas con `workers` navegadores en paralelo.
+
+	Las sesiones autenticadas (`start_source_session`) se crean en paralelo en un
+	`DriverPool` antes de empezar; cada worker toma una y recorre un subconjunto
+	disjunto de páginas: el worker k procesa las páginas k+1, k+1+N,
+	k+1+2N, ... hasta `max_pages` o el final de la paginación. Cada uno escribe en su
+	propia partición (`output/shards/worker<k>/rows_info.json`, con su cursor para
+	reanudar); las filas que ya están en `out_path` cuentan como extraídas
+	(`seed_out_path`) y al terminar las particiones se fusionan en `out_path` en el
+	orden del listado, conservando sus registros anteriores (`merge_shard_outputs`).
+
+	stagger: segundos entre el arranque de cada worker, para no lanzar todos los
+	logins contra el ERP al mismo tiempo.
+	archive_dir / archive_codec: archivo de snapshots compartido por todos los workers.
+	inventory: cada worker sólo recorre el listado (`inventory_rows`).
+	profile: perfil persistente (ver `fetch_source_page`); cada worker usa su propio
+	subdirectorio `worker<k>`.
+	lean: perfil de Chrome ligero (ver `start_source_session`).
+	memory_limit_mb: ver `fetch_source_page`; el navegador nuevo sale del mismo slot del pool.
+	"""
+	out_path = _resolve_output_path(out_path)
+	profile_dir = resolve_profile_dir(profile, "SOURCE_CHROME_PROFILE")
+	workers = max(1, int(workers))
+	shard_paths = [_shard_out_path(out_path, k) for k in range(workers)]
+	archive = _open_archive(archive_dir, archive_codec)
+
+	pool = DriverPool(
+		lambda k: start_source_session(headless=headless, timeout=timeout, max_page_size=max_page_size, network_log=backend == "network", profile_dir=worker_profile_dir(profile_dir, k), lean=lean, renderer_limit=max(4, tabs + 1)),
+		size=workers, stagger=stagger,
+	)
+
+	def _worker(k: int) -> int:
+		with pool.lease() as driver:
+			pages = itertools.count(k + 1, workers)
+			if inventory:
+				return len(inventory_rows(driver, out_path=shard_paths[k], max_pages=max_pages, timeout=timeout, pages=pages, backend=backend))
+			rows = extract_all_rows_info(driver, out_path=shard_paths[k], max_pages=max_pages, timeout=timeout, refresh=refresh, pages=pages, backend=backend, archive=archive, delta=delta, tabs=tabs, row_budget=row_budget, memory_limit_mb=memory_limit_mb, restart=pool.restart, seed_out_path=out_path)
+			return len(rows)
+
+	with pool, ThreadPoolExecutor(max_workers=workers) as executor:
+		futures = {executor.submit(_worker, k): k for k in range(workers)}
+		for fut in as_completed(futures):
+			k = futures[fut]
+			try:
+				print(f"Worker {k + 1}/{workers} finished with {fut.result()} rows")
+			except Exception as e:
+				print(f"Warning: worker {k + 1}/{workers} failed: {e}")
+	if archive is not None:
+		archive.close()
+
+	merged = merge_shard_outputs(shard_paths, out_path)
+	print(f"Merged the rows of {workers} workers into {out_path} ({len(merged)} rows)")
+	return merged
+
+
+def _desarrollo_out_path(out_path: str, value: str, text: str) -> str:
+	"""Ruta de salida del desarrollo `(value, text)`: <dir>/desarrollos/<value>_<slug>/<archivo>."""
+	slug = re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_').lower() or 'desarrollo'
+	return os.path.join(os.path.dirname(out_path), "desarrollos", f"{value}_{slug}", os.path.basename(out_path))
+
+
+def _match_desarrollos(options: List[Tuple[str, str]], only: Iterable[str] | None) -> List[Tuple[str, str]]:
+	"""Filtra `options` por value o texto (sin distinguir mayúsculas); None = todas."""
+	if not only:
+		return list(options)
+	wanted = {w.strip().lower() for w in only if w and w.strip()}
+	selected = [o for o in options if o[0].lower() in wanted or o[1].lower() in wanted]
+	missing = wanted - {o[0].lower() for o in selected} - {o[1].lower() for o in selected}
+	if missing:
+		print(f"Warning: Desarrollo options not found: {', '.join(sorted(missing))}")
+	return selected
+
+
+def extract_all_developments(workers: int = 1, headless: bool = False, timeout: int = 30, out_path: str = "output/rows_info.json", max_pages: int | None = None, refresh: bool = False, stagger: float = 2.0, backend: str = "browser", archive_dir: str | None = None, archive_codec: str = "gzip", max_page_size: bool = True, delta: bool = False, only: Iterable[str] | None = None, tabs: int = 1, row_budget: float | None = None, inventory: bool = False, profile: str | None = None, lean: bool = False, recycle_after: int | None = None, memory_limit_mb: float | None = None) -> List[Any]:
+	"""Extrae las ventas de cada opción del filtro 'Desarrollo', con `workers` navegadores.
+
+	Las `workers` sesiones autenticadas se crean en paralelo en un `DriverPool`; una
+	de ellas enumera las opciones de `#desarrollots` (o las de `only`, por value o
+	texto) y se reparten como una cola de trabajos: por cada desarrollo un worker toma
+	un navegador del pool (comprobando que siga respondiendo), vuelve al listado,
+	aplica el filtro y recorre sus páginas con `extract_all_rows_info`. Cada desarrollo escribe en su propia partición
+	(`output/desarrollos/<value>_<nombre>/rows_info.json`, con su cursor para
+	reanudar); las filas que ya están en `out_path` cuentan como extraídas
+	(`seed_out_path`). Al terminar, las particiones de los desarrollos recorridos se
+	integran en `out_path` en el orden de las opciones del filtro (`RowsStore.merge`):
+	sus registros sustituyen a los anteriores del mismo `codigo_venta` y el resto de
+	`out_path` (otros desarrollos, ejecuciones anteriores) se conserva, también con
+	`only`.
+
+	stagger: segundos entre el arranque de cada worker (ver `extract_rows_info_sharded`).
+	inventory: sólo recorrer el listado de cada desarrollo (`inventory_rows`).
+	profile: perfil persistente por worker (ver `extract_rows_info_sharded`).
+	lean: perfil de Chrome ligero (ver `start_source_session`).
+	recycle_after: reiniciar un navegador del pool al devolverlo si ya recorrió este
+	número de páginas (None = nunca), para acotar la memoria de sesiones largas.
+	memory_limit_mb: ver `fetch_source_page`; el navegador nuevo vuelve al listado
+	con el filtro del desarrollo en curso.
+	"""
+	load_dotenv()
+	url = os.getenv("SOURCE_PAGE_URL")
+	if not url:
+		raise RuntimeError("SOURCE_PAGE_URL no encontrada en .env")
+	out_path = _resolve_output_path(out_path)
+	workers = max(1, int(workers))
+	profile_dir = resolve_profile_dir(profile, "SOURCE_CHROME_PROFILE")
+
+	pool = DriverPool(
+		lambda k: start_source_session(headless=headless, timeout=timeout, max_page_size=False, desarrollo=None, network_log=backend == "network", profile_dir=worker_profile_dir(profile_dir, k), lean=lean, renderer_limit=max(4, tabs + 1)),
+		size=workers, recycle_after=recycle_after, stagger=stagger,
+	)
+	with pool:
+		with pool.lease() as driver:
+			options = _match_desarrollos(list_desarrollo_options(driver), only)
+		if not options:
+			raise RuntimeError("no se encontraron opciones en el filtro 'Desarrollo'")
+		print(f"Found {len(options)} Desarrollo options: {', '.join(t for _, t in options)}")
+
+		part_paths = {o: _desarrollo_out_path(out_path, *o) for o in options}
+		jobs: "queue.Queue[Tuple[str, str]]" = queue.Queue()
+		for o in options:
+			jobs.put(o)
+		archive = _open_archive(archive_dir, archive_codec)
+
+		def _worker(k: int) -> int:
+			total = 0
+			while True:
+				try:
+					value, text = jobs.get_nowait()
+				except queue.Empty:
+					return total
+				try:
+					# un navegador del pool por desarrollo: sano y reciclado tras `recycle_after` páginas
+					with pool.lease() as driver:
+						# volver a la primera página del listado antes de cambiar el filtro
+						_open_source_url(driver, url, timeout, reuse_session=True)
+						if not _select_desarrollo_filter(driver, value, text):
+							continue
+						if max_page_size:
+							_maximize_page_size(driver, timeout)
+						if inventory:
+							rows = inventory_rows(driver, out_path=part_paths[(value, text)], max_pages=max_pages, timeout=timeout, backend=backend)
+						else:
+							def _restart(old, value=value, text=text):
+								new = pool.restart(old)
+								_open_source_url(new, url, timeout, reuse_session=True)
+								if not _select_desarrollo_filter(new, value, text):
+									raise RuntimeError(f"could not select Desarrollo {text} after restarting the browser")
+								if max_page_size:
+									_maximize_page_size(new, timeout)
+								return new
+
+							rows = extract_all_rows_info(driver, out_path=part_paths[(value, text)], max_pages=max_pages, timeout=timeout, refresh=refresh, backend=backend, archive=archive, delta=delta, tabs=tabs, row_budget=row_budget, memory_limit_mb=memory_limit_mb, restart=_restart, seed_out_path=out_path)
+					total += len(rows)
+					print(f"Desarrollo {text}: {len(rows)} rows")
+				except Exception as e:
+					print(f"Warning: Desarrollo {text} failed: {e}")
+
+		n = min(workers, len(options))
+		with ThreadPoolExecutor(max_workers=n) as executor:
+			futures = {executor.submit(_worker, k): k for k in range(n)}
+			for fut in as_completed(futures):
+				k = futures[fut]
+				try:
+					print(f"Worker {k + 1}/{n} finished with {fut.result()} rows")
+				except Exception as e:
+					print(f"Warning: worker {k + 1}/{n} failed: {e}")
+		if archive is not None:
+			archive.close()
+
+	store = RowsStore(out_path)
+	store.merge(item for o in options for item in RowsStore(part_paths[o]).iter_records())
+	_merge_fingerprints([part_paths[o] for o in options], out_path)
+	merged = list(store.iter_records())
+	print(f"Merged the rows of {len(options)} Desarrollo options into {out_path} ({len(merged)} rows)")
+	return merged
+
+
+def _main(argv=None) -> int:
+	parser = argparse.ArgumentParser(description="Extrae las ventas del ERP origen a output/rows_info.json")
+	parser.add_argument("--refresh", action="store_true", help="re-extraer filas ya extraídas e ignorar el cursor de reanudación")
+	parser.add_argument("--max-pages", type=int, default=None, help="número máximo de páginas a recorrer (0 = todas; por defecto 2, o todas con --inventory)")
+	parser.add_argument("--workers", type=int, default=1, help="número de navegadores en paralelo (cada uno recorre páginas disjuntas)")
+	parser.add_argument("--headless", action="store_true", help="ejecutar Chrome sin ventana")
+	parser.add_argument("--backend", choices=("browser", "http", "network"), default="browser", help="'http': sólo el login en Chrome; los detalles se descargan y parsean sin navegador. 'network': navegar con Chrome pero leer los datos de las respuestas capturadas (log de red)")
+	parser.add_argument("--archive-dir", default=None, help="guardar el DOM de cada detalle en este archivo de snapshots (p. ej. output/snapshots)")
+	parser.add_argument("--archive-codec", choices=("gzip", "zstd"), default="gzip", help="compresión de los snapshots ('zstd' requiere el paquete zstandard)")
+	parser.add_argument("--delta", action="store_true", help="re-extraer también las filas ya extraídas cuyo Estado/Plan/Fecha Venta/Unidad cambió en el listado")
+	parser.add_argument("--keep-page-size", action="store_true", help="no cambiar el tamaño de página del listado (por defecto se elige el mayor disponible)")
+	parser.add_argument("--all-desarrollos", action="store_true", help="recorrer cada opción del filtro 'Desarrollo' (--workers = navegadores en paralelo, uno por desarrollo)")
+	parser.add_argument("--desarrollo", action="append", default=None, metavar="NOMBRE", help="recorrer sólo esta opción del filtro 'Desarrollo' (value o texto; repetible, implica --all-desarrollos)")
+	parser.add_argument("--tabs", type=int, default=1, help="detalles cargando a la vez en pestañas de cada navegador (backend 'browser')")
+	parser.add_argument("--row-budget", type=float, default=0, help="segundos máximos por fila (p. ej. 90); las filas que lo agotan se anotan y se reintentan al final (por defecto 0 = sin límite)")
+	parser.add_argument("--inventory", action="store_true", help="sólo recorrer el listado (sin abrir detalles) y guardar registros esqueleto en output/rows_inventory.json")
+	parser.add_argument("--profile", default=None, help="perfil de Chrome persistente (nombre bajo .chrome_profiles/ o ruta); evita repetir el login mientras la sesión siga activa. Por defecto SOURCE_CHROME_PROFILE")
+	parser.add_argument("--lean", action="store_true", help="perfil de Chrome ligero: sin imágenes, fuentes, multimedia ni scripts de analítica, con menos procesos de render")
+	parser.add_argument("--memory-limit", type=float, default=0, help="reiniciar el navegador entre filas (nueva sesión, misma página) si su memoria supera estos MB (0 = nunca)")
+	parser.add_argument("--recycle-after", type=int, default=0, help="con --all-desarrollos: reiniciar el navegador de un worker tras este número de páginas (0 = nunca)")
+	args = parser.parse_args(argv)
+	if args.max_pages is None:
+		args.max_pages = 0 if args.inventory else 2
+	max_pages = args.max_pages or None
+	row_budget = args.row_budget or None
+	out_path = os.path.join("output", "rows_inventory.json" if args.inventory else "rows_info.json")
+
+	if args.all_desarrollos or args.desarrollo:
+		try:
+			extract_all_developments(workers=args.workers, headless=args.headless, max_pages=max_pages, refresh=args.refresh, backend=args.backend, archive_dir=args.archive_dir, archive_codec=args.archive_codec, max_page_size=not args.keep_page_size, delta=args.delta, only=args.desarrollo, tabs=args.tabs, row_budget=row_budget, inventory=args.inventory, profile=args.profile, lean=args.lean, recycle_after=args.recycle_after or None, memory_limit_mb=args.memory_limit or None, out_path=out_path)
+		except Exception as e:
+			print("ERROR:", e)
+			return 1
+		return 0
+
+	if args.workers > 1:
+		try:
+			extract_rows_info_sharded(workers=args.workers, out_path=out_path, inventory=args.inventory, profile=args.profile, lean=args.lean, memory_limit_mb=args.memory_limit or None, headless=args.headless, max_pages=max_pages, refresh=args.refresh, backend=args.backend, archive_dir=args.archive_dir, archive_codec=args.archive_codec, max_page_size=not args.keep_page_size, delta=args.delta, tabs=args.tabs, row_budget=row_budget)
+		except Exception as e:
+			print("ERROR:", e)
+			return 1
+		return 0
+
+	# Por defecto abre el navegador visible
+	out = fetch_source_page(headless=args.headless, refresh=args.refresh, max_pages=max_pages, backend=args.backend, archive_dir=args.archive_dir, archive_codec=args.archive_codec, max_page_size=not args.keep_page_size, delta=args.delta, tabs=args.tabs, row_budget=row_budget, inventory=args.inventory, profile=args.profile, lean=args.lean, memory_limit_mb=args.memory_limit or None)
 	if "error" in out:
 		print("ERROR:", out["error"])
 		return 1
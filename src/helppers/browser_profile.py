@@ -0,0 +1,54 @@
+from __future__ import annotations
+import os
+from typing import Optional
+
+
+# perfiles relativos se guardan aquí (contienen cookies de sesión: no versionar)
+PROFILES_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".chrome_profiles"))
+
+# sesión válida: ninguna caja de contraseña visible en la página cargada
+_JS_AUTHENTICATED = r"""
+var pwd = Array.from(document.querySelectorAll("input[type='password']")).filter(function (el) {
+  return el.offsetParent !== null || el.getClientRects().length > 0;
+});
+return document.readyState !== 'loading' && pwd.length === 0;
+"""
+
+
+def resolve_profile_dir(profile: Optional[str] = None, env_var: Optional[str] = None) -> Optional[str]:
+    """Absolute Chrome user-data directory for `profile` (or the `env_var` setting).
+
+    A bare name (e.g. 'source') is placed under `<repo>/.chrome_profiles/`.
+    Returns None when no profile was requested (fresh throwaway profile).
+    """
+    value = profile or (os.getenv(env_var) if env_var else None)
+    if not value:
+        return None
+    value = os.path.expanduser(value)
+    if not os.path.isabs(value):
+        value = os.path.join(PROFILES_ROOT, value)
+    return value
+
+
+def worker_profile_dir(profile_dir: Optional[str], worker: int) -> Optional[str]:
+    """Per-worker profile (Chrome locks a user-data dir to one browser at a time)."""
+    if not profile_dir:
+        return None
+    return os.path.join(profile_dir, f"worker{worker + 1}")
+
+
+def apply_profile(options, profile_dir: Optional[str]) -> None:
+    """Point Chrome `options` at the persistent `profile_dir` (created if missing)."""
+    if not profile_dir:
+        return
+    os.makedirs(profile_dir, exist_ok=True)
+    options.add_argument(f"--user-data-dir={profile_dir}")
+    options.add_argument("--profile-directory=Default")
+
+
+def session_authenticated(driver) -> bool:
+    """True if the page loaded in `driver` is not asking for a login (no visible password field)."""
+    try:
+        return bool(driver.execute_script(_JS_AUTHENTICATED))
+    except Exception:
+        return False
@@ -0,0 +1,127 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional
+
+from selenium.webdriver.chrome.options import Options
+
+from helppers.browser_profile import apply_profile
+from helppers.network_capture import enable_network_log
+
+
+# Recursos que el perfil "lean" bloquea (patrones de `Network.setBlockedURLs`), por categoría
+# para poder permitir una categoría entera en una página que la necesite.
+BLOCK_CATEGORIES = {
+    "images": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp", "*.avif"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*fonts.googleapis.com*", "*fonts.gstatic.com*"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav"],
+    "third_party": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*facebook.net*",
+        "*facebook.com/tr*", "*hotjar.com*", "*clarity.ms*", "*hs-analytics.net*", "*newrelic.com*",
+        "*nr-data.net*", "*sentry.io*", "*intercom.io*", "*tawk.to*", "*zopim.com*",
+    ],
+}
+
+# flags del perfil lean: menos procesos y sin ralentizar pestañas/timers en segundo plano
+LEAN_ARGS = [
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-extensions",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-features=Translate,MediaRouter,OptimizationHints",
+    "--no-first-run",
+    "--mute-audio",
+]
+
+LEAN_PREFS = {
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+    "profile.default_content_setting_values.media_stream": 2,
+    "profile.default_content_setting_values.automatic_downloads": 2,
+    "credentials_enable_service": False,
+    "profile.password_manager_enabled": False,
+}
+
+
+def chrome_options(headless: bool = False, lean: bool = False, renderer_limit: int = 4, network_log: bool = False, profile_dir: Optional[str] = None) -> Options:
+    """Base Chrome options shared by the source and target launchers.
+
+    lean: add `LEAN_ARGS`/`LEAN_PREFS` and cap renderer processes at `renderer_limit`;
+    asset blocking itself is per tab, see `set_lean_blocking`.
+    """
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    if lean:
+        for arg in LEAN_ARGS:
+            options.add_argument(arg)
+        if renderer_limit:
+            options.add_argument(f"--renderer-process-limit={max(1, int(renderer_limit))}")
+        options.add_experimental_option("prefs", dict(LEAN_PREFS))
+    if network_log:
+        enable_network_log(options)
+    apply_profile(options, profile_dir)
+    return options
+
+
+def _blocked_patterns(allow: Iterable[str] = ()) -> List[str]:
+    allowed = set(allow)
+    return [p for cat, patterns in BLOCK_CATEGORIES.items() if cat not in allowed for p in patterns]
+
+
+def set_lean_blocking(driver, allow: Iterable[str] = ()) -> List[str]:
+    """Block the `BLOCK_CATEGORIES` assets (except the `allow` categories) in the current tab.
+
+    The pattern list is remembered on the driver so `apply_lean_blocking` can repeat
+    it in tabs opened later (CDP blocking does not carry over to new tabs).
+    """
+    patterns = _blocked_patterns(allow)
+    try:
+        driver._mig_blocked_urls = patterns
+    except Exception:
+        pass
+    apply_lean_blocking(driver)
+    return patterns
+
+
+def apply_lean_blocking(driver) -> None:
+    """Apply the driver's lean block list to the current tab (no-op if lean is off)."""
+    patterns = getattr(driver, "_mig_blocked_urls", None)
+    if patterns is None:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        print("Warning: could not set blocked URLs:", e)
+
+
+@contextmanager
+def allow_assets(driver, *categories: str) -> Iterator[None]:
+    """Temporarily unblock whole `categories` (e.g. 'images') in the current tab."""
+    previous = getattr(driver, "_mig_blocked_urls", None)
+    if previous is None:
+        yield
+        return
+    allowed = {p for cat in categories for p in BLOCK_CATEGORIES.get(cat, [])}
+    try:
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": [p for p in previous if p not in allowed]})
+    except Exception:
+        pass
+    try:
+        yield
+    finally:
+        apply_lean_blocking(driver)
+
+
+def start_chrome(options: Options, lean: bool = False, allow: Iterable[str] = ()):
+    """Start Chrome with `options`; with `lean`, block assets in the first tab (see `set_lean_blocking`)."""
+    from selenium import webdriver
+
+    driver = webdriver.Chrome(options=options)
+    if lean:
+        set_lean_blocking(driver, allow)
+    return driver
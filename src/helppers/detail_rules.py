@@ -0,0 +1,242 @@
+"""Reglas de interpretación de la página de detalle, sin dependencias de Selenium.
+
+Las usan tanto los extractores sobre WebDriver (`extract_credit`, `extract_client`,
+`extract_amortization`) como los parsers offline (`html_parsers`), de modo que
+ambos caminos producen exactamente la misma salida a partir de los mismos textos.
+"""
+from __future__ import annotations
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+
+def first_number_token(s: str) -> str:
+    """Return the first numeric token (digits, commas, dots) found in s, or empty string."""
+    if not s:
+        return ""
+    m = re.findall(r"[\d.,]+", s)
+    return m[0] if m else ""
+
+
+# -- Información del Crédito -------------------------------------------------
+
+CREDIT_KEYS = [
+    "desarrollo",
+    "unidad",
+    "etapa",
+    "superficie",
+    "precio_m2",
+    "precio_lista",
+    "plan_de_pago",
+    "cuota_de_apertura",
+    "descuento_%",
+    "descuento_m2",
+    "moneda_del_contrato",
+    "precio_venta",
+    "enganche_%",
+    "enganche",
+    "financiamiento_%",
+    "financiamiento",
+    "costo_escritura",
+]
+
+
+def empty_credit_info() -> Dict[str, str]:
+    return {k: "" for k in CREDIT_KEYS}
+
+
+def apply_credit_row(info: Dict[str, str], texts: List[str], verbose: bool = False) -> None:
+    """Interpret one `div.row` of the credit block (texts of its child divs) into `info`.
+
+    Some rows have 2 columns (label, value), others 3 (label, %, amount); empty
+    leading columns are skipped to find the label.
+    """
+    # If all columns empty, skip (nothing to parse)
+    if not any(texts):
+        if verbose:
+            print("Skipping empty row (no column text):", texts)
+        return
+
+    # Find first non-empty column to use as label anchor (handles leading empty divs)
+    label_idx = 0
+    while label_idx < len(texts) and not texts[label_idx]:
+        label_idx += 1
+    if label_idx >= len(texts):
+        if verbose:
+            print("Skipping row, no label found:", texts)
+        return
+
+    label = re.sub(r"\s+", " ", texts[label_idx]).strip().lower()
+
+    # Helper to safely get nth text relative to label index
+    def t(n: int) -> str:
+        idx = label_idx + n
+        return texts[idx] if idx < len(texts) else ""
+
+    # Match common labels (lenient contains checks)
+    if "desarrollo" in label:
+        info["desarrollo"] = t(1)
+    elif "no. unidad" in label or "no unidad" in label or label == "unidad":
+        # sometimes there is a 'Cambiar' button as third column
+        info["unidad"] = t(1)
+    elif "etapa" in label:
+        info["etapa"] = t(1)
+    elif "superficie" in label:
+        info["superficie"] = first_number_token(t(1))
+    elif "precio x m" in label or "precio por m" in label or "precio x" in label and "m" in label:
+        info["precio_m2"] = first_number_token(t(1))
+    elif "precio de lista" in label or "precio lista" in label:
+        info["precio_lista"] = first_number_token(t(1))
+    elif "plan de pago" in label:
+        info["plan_de_pago"] = t(1)
+    elif "cuota de apertura" in label:
+        info["cuota_de_apertura"] = first_number_token(t(1))
+    elif "descuento" in label and "%" in " ".join(texts):
+        # row with discount: [label, percent, amount]
+        info["descuento_%"] = first_number_token(t(1))
+        info["descuento_m2"] = first_number_token(t(2))
+    elif "moneda del contrato" in label or "moneda" == label:
+        info["moneda_del_contrato"] = t(1)
+    elif "precio venta" in label or "precio de venta" in label:
+        info["precio_venta"] = first_number_token(t(1))
+    elif label.startswith("enganche"):
+        # [label, percent, amount]
+        info["enganche_%"] = first_number_token(t(1))
+        info["enganche"] = first_number_token(t(2))
+    elif "financiamiento" in label:
+        info["financiamiento_%"] = first_number_token(t(1))
+        info["financiamiento"] = first_number_token(t(2))
+    elif "costo escritura" in label or "costo de escritura" in label:
+        info["costo_escritura"] = first_number_token(t(1))
+    else:
+        # fallback: try to detect if label contains any of the keywords
+        if "precio" in label and "venta" in label and not info["precio_venta"]:
+            info["precio_venta"] = first_number_token(t(1))
+        # otherwise ignore unknown labels
+
+
+# -- Tabla de Amortización ---------------------------------------------------
+
+def amortization_entry(cells: List[str], pago_id: str = "", anchor_text: Optional[str] = None) -> Optional[Dict[str, str]]:
+    """Build one amortization row from its cell texts ([No., Monto, Fecha, Tipo, ...]).
+
+    `anchor_text` is the text of the anchor in the fecha column (it wins over the
+    cell text when non-empty). Returns None for rows without cells.
+    """
+    if not cells:
+        return None
+    no = cells[0] if len(cells) > 0 else ""
+    monto = cells[1] if len(cells) > 1 else ""
+    fecha = cells[2] if len(cells) > 2 else ""
+    tipo = cells[3] if len(cells) > 3 else ""
+    if anchor_text and anchor_text.strip():
+        fecha = anchor_text.strip()
+    return {
+        'no': no,
+        'monto': first_number_token(monto),
+        'monto_raw': monto,
+        'fecha': fecha,
+        'tipo': tipo.strip(),
+        'pago_id': pago_id or '',
+    }
+
+
+# -- Cliente -----------------------------------------------------------------
+
+# Mapear labels (en minúsculas) a claves de salida
+CLIENT_FIELDS = {
+    "nombre": "name",
+    "fecha nacimiento": "birth_date",
+    "lugar de nacimiento": "lugar_nacimiento",
+    "edad": "edad",
+    "rfc": "rfc",
+    "curp": "curp",
+    "sexo": "sexo",
+    "estado civil": "estado_civil",
+    # DIRECCIÓN
+    "calle": "calle",
+    "num. interior": "num_interior",
+    "num interior": "num_interior",
+    "num. exterior": "num_exterior",
+    "num exterior": "num_exterior",
+    "nacionalidad": "nacionalidad",
+    "país": "pais",
+    "pais": "pais",
+    "estado": "estado",
+    "localidad": "localidad",
+    "codigo postal": "codigo_postal",
+    "colonia": "colonia",
+    # CONTACTO
+    "numero de telefono local": "telefono_local",
+    "numero de telefono celular": "telefono_celular",
+    "correo electronico": "email",
+    # DATOS COMPLEMENTARIOS
+    "ocupacion": "ocupacion",
+    "actividad economica": "actividad_economica",
+    "tipo de identificacion": "tipo_identificacion",
+    "numero de identificacion": "numero_identificacion",
+    "tipo de persona": "tipo_persona",
+    # hidden / href-sourced
+    "id_cliente": "id_cliente",
+    "codigo_venta": "codigo_venta",
+}
+
+# inputs ocultos leídos antes que las etiquetas visibles
+CLIENT_HIDDEN_INPUTS = ("id_cliente", "codigo_venta", "codigoVenta", "idCliente")
+
+
+def empty_client_info() -> Dict[str, str]:
+    return {v: "" for v in CLIENT_FIELDS.values()}
+
+
+def apply_hidden_input(result: Dict[str, str], name: str, value: str) -> None:
+    """Store the value of hidden input `name` (id_cliente / codigo_venta variants) in `result`."""
+    if not value:
+        return
+    if 'id_cliente' in name or name == 'idCliente':
+        result['id_cliente'] = value
+    elif 'codigo' in name.lower():
+        result['codigo_venta'] = value
+
+
+def apply_formulario_href(result: Dict[str, str], href: str) -> bool:
+    """Fill missing id_cliente/codigo_venta from a 'Formulario_Cliente' link.
+
+    Returns True once both values are known.
+    """
+    if not href:
+        return False
+    qs = parse_qs(urlparse(href).query)
+    idc = qs.get('id_cliente') or qs.get('idCliente') or qs.get('id')
+    cod = qs.get('codigo_venta') or qs.get('codigoVenta') or qs.get('codigo')
+    if idc and not result.get('id_cliente'):
+        result['id_cliente'] = idc[0]
+    if cod and not result.get('codigo_venta'):
+        result['codigo_venta'] = cod[0]
+    return bool(result.get('id_cliente') and result.get('codigo_venta'))
+
+
+def client_info_from_index(index: Dict[str, object]) -> Dict[str, str]:
+    """Map the label→value index of the 'Cliente' tab onto the client schema.
+
+    `index` is what `extract_client._JS_CLIENT_INDEX` returns: `labels` (label of
+    `CLIENT_FIELDS` -> text), `nombre` (fallback for the name), `hidden` (hidden
+    input name -> value) and `hrefs` ('Formulario_Cliente' links). Same precedence
+    as the per-label extractor: hidden inputs, then links, then visible labels.
+    """
+    result = empty_client_info()
+    hidden = index.get('hidden') or {}
+    for name in CLIENT_HIDDEN_INPUTS:
+        apply_hidden_input(result, name, hidden.get(name) or "")
+    if not result.get('id_cliente') or not result.get('codigo_venta'):
+        for href in index.get('hrefs') or []:
+            if href and apply_formulario_href(result, href):
+                break
+    labels = index.get('labels') or {}
+    for label, key in CLIENT_FIELDS.items():
+        if key in ("id_cliente", "codigo_venta"):
+            continue
+        result[key] = labels.get(label) or ""
+    if not result.get('name'):
+        result['name'] = index.get('nombre') or ""
+    return result
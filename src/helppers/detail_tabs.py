@@ -0,0 +1,101 @@
+from __future__ import annotations
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from helppers.chrome_launcher import apply_lean_blocking
+from helppers.waits import DETAIL_READY
+
+
+# Estado de una pestaña sin bloquear: 'ready' (tarjeta de detalle visible),
+# 'loaded' (documento completo sin tarjeta) o 'loading'. `__migStale` marca el
+# documento anterior de una pestaña reutilizada hasta que la navegación lo reemplaza.
+_JS_TAB_STATE = (
+    "if (window.__migStale) return 'loading';"
+    "if ((" + DETAIL_READY + ")(null, {mutations: 0})) return 'ready';"
+    "return document.readyState === 'complete' ? 'loaded' : 'loading';"
+)
+
+_JS_NAVIGATE = "window.__migStale = true; window.location.href = arguments[0];"
+
+
+def _tab_state(driver) -> str:
+    try:
+        return driver.execute_script(_JS_TAB_STATE) or "loading"
+    except Exception:
+        # documento a medio reemplazar
+        return "loading"
+
+
+def extract_in_tabs(driver, jobs: Iterable[Tuple[Any, str]], extract: Callable[[Any], Any], tabs: int = 4, timeout: float = 30, marker_grace: float = 2.0, poll: float = 0.05) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+    """Load up to `tabs` detail pages at once in tabs of `driver` and extract each as it finishes.
+
+    `jobs` are `(key, url)` pairs. Every tab starts its navigation with a
+    non-blocking `location.href` assignment, so the pages load in parallel; the
+    pool then visits the tabs and runs `extract(driver)` on whichever already
+    shows the detail card (or finished loading `marker_grace` seconds ago without
+    one), and reuses that tab for the next URL. A tab that hits `timeout` is not
+    extracted (its page may be incomplete): it yields a `TimeoutError` instead.
+
+    Yields `(key, result, error)` in completion order. The tabs are closed and the
+    window that was current on entry is restored when the generator finishes.
+    """
+    home = driver.current_window_handle
+    pending = deque(jobs)
+    active: Dict[str, Tuple[Any, float, Optional[float]]] = {}  # handle -> (key, started, loaded_at)
+    free: List[str] = []
+    try:
+        while pending or active:
+            while pending and len(active) < max(1, tabs):
+                key, url = pending.popleft()
+                if free:
+                    handle = free.pop()
+                    driver.switch_to.window(handle)
+                else:
+                    driver.switch_to.new_window("tab")
+                    handle = driver.current_window_handle
+                    apply_lean_blocking(driver)
+                try:
+                    driver.execute_script(_JS_NAVIGATE, url)
+                except Exception as e:
+                    free.append(handle)
+                    yield key, None, e
+                    continue
+                active[handle] = (key, time.monotonic(), None)
+
+            progressed = False
+            for handle, (key, started, loaded_at) in list(active.items()):
+                driver.switch_to.window(handle)
+                now = time.monotonic()
+                state = _tab_state(driver)
+                if state == "loaded" and loaded_at is None:
+                    active[handle] = (key, started, now)
+                    loaded_at = now
+                done = state == "ready" or (loaded_at is not None and now - loaded_at >= marker_grace)
+                timed_out = not done and now - started >= timeout
+                if not done and not timed_out:
+                    continue
+                if timed_out:
+                    result, error = None, TimeoutError(f"detail page not ready after {timeout}s")
+                else:
+                    try:
+                        result, error = extract(driver), None
+                    except Exception as e:
+                        result, error = None, e
+                del active[handle]
+                free.append(handle)
+                progressed = True
+                yield key, result, error
+            if not progressed and active:
+                time.sleep(poll)
+    finally:
+        for handle in free + list(active):
+            try:
+                driver.switch_to.window(handle)
+                driver.close()
+            except Exception:
+                pass
+        try:
+            driver.switch_to.window(home)
+        except Exception:
+            pass
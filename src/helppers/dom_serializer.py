@@ -0,0 +1,58 @@
+from __future__ import annotations
+from typing import Any, List, Optional, Sequence
+
+
+# Serializa en una sola llamada las filas/celdas de un contenedor. Todas las rutas son
+# XPath (relativas al contenedor / a la fila), con la misma semántica que las
+# `find_element(s)` que reemplaza. El texto de un elemento es el de `WebElement.text`
+# (texto renderizado; vacío si no se muestra) o, si está vacío, su textContent.
+_JS_SERIALIZE = r"""
+var containers = arguments[0], rowXp = arguments[1], cellXp = arguments[2], anchorXps = arguments[3] || [];
+function first(xp, ctx) {
+  return document.evaluate(xp, ctx, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+function every(xp, ctx) {
+  var r = document.evaluate(xp, ctx, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null), out = [];
+  for (var i = 0; i < r.snapshotLength; i++) out.push(r.snapshotItem(i));
+  return out;
+}
+function shown(el) {
+  return el.getClientRects().length ? (el.innerText || '').trim() : '';
+}
+function text(el) {
+  return shown(el) || (el.textContent || '').trim();
+}
+var box = null;
+for (var i = 0; i < containers.length && !box; i++) {
+  try { box = first(containers[i], document); } catch (e) {}
+}
+if (!box) return null;
+return every(rowXp, box).map(function (row) {
+  var anchor = null;
+  for (var k = 0; k < anchorXps.length && !anchor; k++) {
+    var a = first(anchorXps[k], row);
+    if (a) anchor = [a.getAttribute('id') || '', shown(a), k];
+  }
+  return [text(row), every(cellXp, row).map(text), anchor];
+});
+"""
+
+
+def serialize_rows(driver, containers: Sequence[str], rows: str, cells: str, anchors: Sequence[str] = ()) -> Optional[List[List[Any]]]:
+    """Texts of the rows and cells of a container, read with one `execute_script` call.
+
+    containers: XPaths tried in order; the first node found is the container.
+    rows: XPath of the rows, relative to the container (e.g. `.//table//tbody//tr`).
+    cells: XPath of the cells, relative to each row (e.g. `./th|./td`).
+    anchors: XPaths (relative to the row) tried in order for the row's anchor.
+
+    Returns a list with one `[row_text, [cell_text, ...], anchor]` per row, where
+    `anchor` is `[id, text, index of the matching XPath]` or None; or None if no
+    container was found (or the script failed).
+    """
+    try:
+        data = driver.execute_script(_JS_SERIALIZE, list(containers), rows, cells, list(anchors))
+    except Exception as e:
+        print("Warning: could not serialize rows:", e)
+        return None
+    return data if isinstance(data, list) else None
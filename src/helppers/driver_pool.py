@@ -0,0 +1,154 @@
+from __future__ import annotations
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+def pages_visited(driver) -> int:
+    """Listing pages walked by `driver` since it was created (see `count_page`)."""
+    return int(getattr(driver, "_mig_pages", 0) or 0)
+
+
+def count_page(driver, n: int = 1) -> None:
+    """Count `n` listing pages walked by `driver` (used by the pool to recycle it)."""
+    try:
+        driver._mig_pages = pages_visited(driver) + n
+    except Exception:
+        pass
+
+
+def is_healthy(driver) -> bool:
+    """True if the browser still answers: the session exists and a window is scriptable."""
+    try:
+        if not driver.window_handles:
+            return False
+        driver.execute_script("return 1")
+        return True
+    except Exception:
+        return False
+
+
+def _quit(driver) -> None:
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class DriverPool:
+    """Fixed set of `size` WebDriver slots shared by the workers of a run.
+
+    `factory(slot)` creates the driver of a slot (an authenticated session, with the
+    slot's own profile directory if any). `start()` pre-warms every slot in parallel,
+    `stagger` seconds apart so the logins do not hit the ERP at once. `lease()` hands
+    out an idle driver after a health check (a dead browser is replaced); on release a
+    driver that walked `recycle_after` pages or more is quit and its slot is rebuilt on
+    the next lease. `close()` quits every idle driver; drivers still leased are quit
+    when they come back.
+    """
+
+    def __init__(self, factory: Callable[[int], Any], size: int = 1, recycle_after: Optional[int] = None, stagger: float = 0.0):
+        self.factory = factory
+        self.size = max(1, int(size))
+        self.recycle_after = recycle_after or None
+        self.stagger = stagger
+        # (slot, driver | None): None = slot pendiente de (re)crear
+        self._idle: "queue.Queue[tuple]" = queue.Queue()
+        # slot -> driver prestado (lo que se devuelve al salir de `lease`)
+        self._leased: Dict[int, Any] = {}
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _create(self, slot: int):
+        driver = self.factory(slot)
+        count_page(driver, 0)
+        return driver
+
+    def start(self) -> "DriverPool":
+        """Create every slot's driver in parallel; slots that fail are retried on lease."""
+        def _warm(slot: int):
+            time.sleep(slot * self.stagger)
+            try:
+                return slot, self._create(slot)
+            except Exception as e:
+                print(f"Warning: could not start browser for pool slot {slot + 1}: {e}")
+                return slot, None
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            for slot, driver in executor.map(_warm, range(self.size)):
+                self._idle.put((slot, driver))
+        return self
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Borrow a healthy driver for the duration of the `with` block."""
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+        slot, driver = self._idle.get(timeout=timeout)
+        try:
+            if driver is not None and not is_healthy(driver):
+                print(f"Pool slot {slot + 1}: browser not responding; starting a new one")
+                _quit(driver)
+                driver = None
+            if driver is None:
+                driver = self._create(slot)
+        except Exception:
+            self._idle.put((slot, None))
+            raise
+        self._leased[slot] = driver
+        try:
+            yield driver
+        finally:
+            self._release(slot, self._leased.pop(slot, driver))
+
+    def restart(self, driver):
+        """Quit a leased `driver` and return a fresh one for the same slot (same lease).
+
+        Used to replace a browser in the middle of a lease (e.g. by the memory
+        watchdog); the new driver is the one given back when the lease ends.
+        """
+        slot = next((s for s, d in self._leased.items() if d is driver), None)
+        if slot is None:
+            raise ValueError("driver is not leased from this pool")
+        _quit(driver)
+        self._leased[slot] = None
+        new = self._create(slot)
+        self._leased[slot] = new
+        return new
+
+    def _release(self, slot: int, driver) -> None:
+        if driver is None:
+            self._idle.put((slot, None))
+            return
+        if self._closed:
+            _quit(driver)
+            return
+        if self.recycle_after and pages_visited(driver) >= self.recycle_after:
+            print(f"Pool slot {slot + 1}: recycling browser after {pages_visited(driver)} pages")
+            _quit(driver)
+            driver = None
+        self._idle.put((slot, driver))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        drained: List[Any] = []
+        while True:
+            try:
+                drained.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for _, driver in drained:
+            if driver is not None:
+                _quit(driver)
+
+    def __enter__(self) -> "DriverPool":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
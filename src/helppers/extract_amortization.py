@@ -1,15 +1,10 @@
 from __future__ import annotations
 import re
-import time
 from typing import List, Dict
-from selenium.webdriver.common.by import By
 
-
-def _first_number_token(s: str) -> str:
-    if not s:
-        return ""
-    m = re.findall(r"[\d.,]+", s)
-    return m[0] if m else ""
+from helppers.detail_rules import amortization_entry
+from helppers.dom_serializer import serialize_rows
+from helppers.waits import wait_dom_change
 
 
 def extract_amortization_table(driver) -> List[Dict[str, str]]:
@@ -25,91 +20,53 @@ def extract_amortization_table(driver) -> List[Dict[str, str]]:
     The function uses small retries and text-content fallbacks to tolerate
     slight DOM differences and late JS population.
     """
-    try:
-        # try to locate the card that contains the Tabla de Amortización
-        xp = "//div[contains(normalize-space(.), 'Tabla de Amortización')]/ancestor::div[contains(@class,'card')][1]"
-        card = driver.find_element(By.XPATH, xp)
-    except Exception:
+    containers = [
+        # the card that contains the Tabla de Amortización
+        "//div[contains(normalize-space(.), 'Tabla de Amortización')]/ancestor::div[contains(@class,'card')][1]",
         # fallback: search anywhere for a table header with that exact text
-        try:
-            card = driver.find_element(By.XPATH, "//table[.//th[contains(., 'Monto')] and .//tbody]//ancestor::div[contains(@class,'card')][1]")
-        except Exception:
-            return []
+        "//table[.//th[contains(., 'Monto')] and .//tbody]//ancestor::div[contains(@class,'card')][1]",
+    ]
+    # anchor id inside the fecha cell; otherwise any anchor in the row (its text is not the fecha)
+    anchors = ["./td[3]//a | ./th[3]//a", ".//a"]
 
     rows = []
-    # retry reading rows a few times to tolerate late rendering
+    # retry reading rows a few times to tolerate late rendering; each read is a
+    # single call returning every row, cell and anchor (serialize_rows)
     for attempt in range(3):
-        try:
-            tr_elems = card.find_elements(By.XPATH, ".//table//tbody//tr")
-        except Exception:
-            tr_elems = []
+        tr_rows = serialize_rows(driver, containers, ".//table//tbody//tr", "./th|./td", anchors)
+        if tr_rows is None:
+            return []
 
-        if tr_elems:
+        if tr_rows:
             # quick content check: accept if any row contains a date-like token or amount
             ok = False
-            for tr in tr_elems:
-                try:
-                    txt = (tr.text or "").strip()
-                    if not txt:
-                        continue
-                    if re.search(r"\d{4}-\d{2}-\d{2}", txt) or "$" in txt or re.search(r"\d+[.,]\d{2}", txt):
-                        ok = True
-                        break
-                except Exception:
+            for txt, _, _ in tr_rows:
+                txt = (txt or "").strip()
+                if not txt:
                     continue
+                if re.search(r"\d{4}-\d{2}-\d{2}", txt) or "$" in txt or re.search(r"\d+[.,]\d{2}", txt):
+                    ok = True
+                    break
             if ok or attempt == 2:
-                rows = tr_elems
+                rows = tr_rows
                 break
-        time.sleep(0.35)
+        # re-leer en cuanto el DOM cambie (máx. 0.35 s)
+        wait_dom_change(driver, 0.35)
 
     result: List[Dict[str, str]] = []
-    for tr in rows:
-        try:
-            # select both th and td children (No. may be in a th)
-            cols = tr.find_elements(By.XPATH, "./th|./td")
-            cells = []
-            for c in cols:
-                try:
-                    txt = (c.text or c.get_attribute('textContent') or c.get_attribute('innerText') or '').strip()
-                except Exception:
-                    txt = ''
-                cells.append(txt)
-
-            if not cells:
-                continue
-
-            # expected columns: [No., Monto, Fecha (anchor), Tipo, ...]
-            no = cells[0] if len(cells) > 0 else ""
-            monto = cells[1] if len(cells) > 1 else ""
-            fecha = cells[2] if len(cells) > 2 else ""
-            tipo = cells[3] if len(cells) > 3 else ""
-
-            # attempt to grab anchor id inside fecha cell
-            pago_id = ""
-            try:
-                a = tr.find_element(By.XPATH, "./td[3]//a | ./th[3]//a")
-                pago_id = a.get_attribute('id') or ''
-                # anchor text may be the fecha
-                if a.text and a.text.strip():
-                    fecha = a.text.strip()
-            except Exception:
-                # try alternative: any anchor in the row
-                try:
-                    a = tr.find_element(By.XPATH, ".//a")
-                    pago_id = a.get_attribute('id') or ''
-                except Exception:
-                    pago_id = ''
-
-            result.append({
-                'no': no,
-                'monto': _first_number_token(monto),
-                'monto_raw': monto,
-                'fecha': fecha,
-                'tipo': tipo.strip(),
-                'pago_id': pago_id,
-            })
-        except Exception:
-            # ignore malformed rows but continue
+    for _, cells, anchor in rows:
+        if not cells:
             continue
+        pago_id = ""
+        anchor_text = None
+        if anchor:
+            pago_id = anchor[0] or ""
+            if anchor[2] == 0:
+                # anchor text may be the fecha
+                anchor_text = anchor[1]
+        # expected columns: [No., Monto, Fecha (anchor), Tipo, ...]
+        entry = amortization_entry(cells, pago_id, anchor_text)
+        if entry is not None:
+            result.append(entry)
 
     return result
@@ -1,54 +1,183 @@
 from __future__ import annotations
 from typing import Dict
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
 
+from helppers.selector_cache import selector_cache
+from helppers.detail_rules import CLIENT_FIELDS, CLIENT_HIDDEN_INPUTS, empty_client_info, apply_hidden_input, apply_formulario_href, client_info_from_index
 
-def extract_client_info(driver) -> Dict[str, str]:
+
+# Panel de la pestaña 'Cliente' (estilo Bootstrap): el elemento al que apunta el
+# enlace/botón de la pestaña (aria-controls, data-(bs-)target o href '#id'), o null.
+_JS_CLIENT_PANE = r"""
+function migClientPane() {
+  function low(el) {
+    return (el.textContent || '').replace(/[ \t\r\n]+/g, ' ').trim()
+      .replace(/[A-Z]/g, function (c) { return c.toLowerCase(); });
+  }
+  var tabs = document.querySelectorAll('a, button, [role=tab]');
+  for (var i = 0; i < tabs.length; i++) {
+    var t = tabs[i], txt = low(t);
+    if (txt !== 'cliente' && !(t.getAttribute('role') === 'tab' && txt.indexOf('cliente') >= 0)) continue;
+    var id = t.getAttribute('aria-controls') || t.getAttribute('data-target') || t.getAttribute('data-bs-target') || t.getAttribute('href') || '';
+    id = id.replace(/^#/, '');
+    var el = id && /^[A-Za-z][\w:.-]*$/.test(id) ? document.getElementById(id) : null;
+    if (el) return el;
+  }
+  return null;
+}
+"""
+
+# 'visible': el panel ya se muestra; 'present': está en el DOM con sus datos pero
+# oculto (basta leerlo); 'lazy': no hay panel identificable o aún está vacío (hay que
+# clicar la pestaña para que se cargue).
+_JS_CLIENT_PANE_STATE = _JS_CLIENT_PANE + r"""
+var pane = migClientPane();
+if (!pane) return 'lazy';
+var filled = Array.prototype.some.call(pane.querySelectorAll('label'), function (l) {
+  return /nombre/i.test(l.textContent || '');
+}) && Array.prototype.some.call(pane.querySelectorAll('p'), function (p) {
+  return (p.textContent || '').trim() !== '';
+});
+if (!filled) return 'lazy';
+return pane.getClientRects().length ? 'visible' : 'present';
+"""
+
+
+# Índice etiqueta→valor de la pestaña 'Cliente' en una sola llamada. Reproduce la
+# cadena de XPaths de `_extract_client_info_xpath` (label = l, label contiene l,
+# dt = l → dd, div = l, cualquier elemento = l; cada una con `following::p[1]` y
+# translate/normalize-space) recorriendo una sola vez los elementos del panel de la
+# pestaña (o del documento si no se encuentra); `following` se resuelve sobre todo
+# el documento, como en XPath. Devuelve {labels, nombre, hidden, hrefs}.
+_JS_CLIENT_INDEX = _JS_CLIENT_PANE + r"""
+var labels = arguments[0], hiddenNames = arguments[1], includeHidden = !!arguments[2];
+var all = document.getElementsByTagName('*'), n = all.length;
+var idx = new Map();
+for (var k = 0; k < n; k++) idx.set(all[k], k);
+function norm(el) {
+  return (el.textContent || '').replace(/[ \t\r\n]+/g, ' ').replace(/^ | $/g, '')
+    .replace(/[A-Z]/g, function (c) { return c.toLowerCase(); });
+}
+// siguiente <tag> en orden de documento a partir de cada posición
+function nextOf(tag) {
+  var out = new Int32Array(n + 1); out[n] = -1;
+  for (var k = n - 1; k >= 0; k--) out[k] = all[k].tagName === tag ? k : out[k + 1];
+  return out;
+}
+var nextP = nextOf('P'), nextDD = nextOf('DD');
+// following::tag[1] de un ancla: primer tag tras el subárbol del ancla
+function following(k, next) {
+  var j = k + all[k].getElementsByTagName('*').length + 1;
+  return j <= n ? next[j] : -1;
+}
+function text(j) {
+  if (j < 0) return '';
+  var el = all[j];
+  // panel oculto ya cargado (pestaña sin activar): leer su textContent
+  if (!el.getClientRects().length) return includeHidden ? (el.textContent || '').replace(/\s+/g, ' ').trim() : '';
+  return (el.innerText || '').trim();
+}
+var maxLen = 0;
+for (var i = 0; i < labels.length; i++) maxLen = Math.max(maxLen, labels[i].length);
+function scan(root) {
+  var start = root === document.documentElement ? 0 : idx.get(root);
+  var end = start + root.getElementsByTagName('*').length;
+  // anclas por (candidata, etiqueta): primera posición siguiente en orden de documento
+  var best = {};
+  function hit(cand, label, j) {
+    var key = cand + '|' + label;
+    if (j >= 0 && (!(key in best) || j < best[key])) best[key] = j;
+  }
+  var labelNodes = [];
+  for (var k = start; k <= end && k < n; k++) {
+    var el = all[k], tag = el.tagName;
+    var t = norm(el);
+    // fuera de <label> solo hay igualdades: un texto normalizado más largo no puede coincidir
+    if (tag !== 'LABEL' && t.length > maxLen) continue;
+    if (tag === 'LABEL') labelNodes.push([k, t]);
+    for (var i = 0; i < labels.length; i++) {
+      var l = labels[i];
+      if (t === l) {
+        if (tag === 'LABEL') hit(0, l, following(k, nextP));
+        if (tag === 'DT') hit(2, l, following(k, nextDD));
+        if (tag === 'DIV') hit(3, l, following(k, nextP));
+        hit(4, l, following(k, nextP));
+      }
+    }
+  }
+  for (var m = 0; m < labelNodes.length; m++) {
+    for (var i = 0; i < labels.length; i++) {
+      if (labelNodes[m][1].indexOf(labels[i]) >= 0) hit(1, labels[i], following(labelNodes[m][0], nextP));
+    }
+  }
+  var values = {}, found = 0;
+  for (var i = 0; i < labels.length; i++) {
+    var v = '';
+    for (var c = 0; c < 5 && !v; c++) {
+      var key = c + '|' + labels[i];
+      if (key in best) v = text(best[key]);
+    }
+    values[labels[i]] = v;
+    if (v) found++;
+  }
+  // //label[contains(translate(., ...), 'nombre')]/following::p[1]: el primero en orden de documento
+  var first = -1;
+  for (var m = 0; m < labelNodes.length; m++) {
+    var lower = (all[labelNodes[m][0]].textContent || '').replace(/[A-Z]/g, function (c) { return c.toLowerCase(); });
+    if (lower.indexOf('nombre') < 0) continue;
+    var j = following(labelNodes[m][0], nextP);
+    if (j >= 0 && (first < 0 || j < first)) first = j;
+  }
+  var nombre = text(first);
+  return {labels: values, nombre: nombre, found: found};
+}
+var root = migClientPane();
+var res = root ? scan(root) : null;
+if (!res || !res.found) res = scan(document.documentElement);
+var hidden = {};
+for (var i = 0; i < hiddenNames.length; i++) {
+  var inp = document.querySelector('input[name="' + hiddenNames[i] + '"]');
+  if (inp) hidden[hiddenNames[i]] = inp.getAttribute('value') || '';
+}
+var hrefs = [];
+var anchors = document.querySelectorAll('a[href*="Formulario_Cliente"]');
+for (var i = 0; i < anchors.length; i++) hrefs.push(anchors[i].href || anchors[i].getAttribute('data-href') || '');
+return {labels: res.labels, nombre: res.nombre, hidden: hidden, hrefs: hrefs};
+"""
+
+
+def client_pane_state(driver) -> str:
+    """'visible', 'present' (cargado pero oculto) o 'lazy' (hay que clicar la pestaña 'Cliente')."""
+    try:
+        state = driver.execute_script(_JS_CLIENT_PANE_STATE)
+    except Exception:
+        return "lazy"
+    return state if state in ("visible", "present") else "lazy"
+
+
+def extract_client_info(driver, include_hidden: bool = False) -> Dict[str, str]:
     """Extrae la información del cliente desde la pestaña 'Cliente' en la página de detalle.
 
     Devuelve un diccionario con campos comunes (name, birth_date, rfc, curp, sexo, estado_civil,
     telefono_local, telefono_celular, email, id_cliente, codigo_venta). Los valores ausentes son cadenas vacías.
+
+    Lee la pestaña con un solo script (`_JS_CLIENT_INDEX`) en lugar de una búsqueda XPath
+    por etiqueta; si el script falla se usa `_extract_client_info_xpath`.
+    include_hidden: leer también los valores no renderizados (panel de la pestaña en el
+    DOM pero sin activar, ver `client_pane_state`).
     """
-    # Mapear labels (en minúsculas) a claves de salida
-    fields = {
-        "nombre": "name",
-        "fecha nacimiento": "birth_date",
-        "lugar de nacimiento": "lugar_nacimiento",
-        "edad": "edad",
-        "rfc": "rfc",
-        "curp": "curp",
-        "sexo": "sexo",
-        "estado civil": "estado_civil",
-        # DIRECCIÓN
-        "calle": "calle",
-        "num. interior": "num_interior",
-        "num interior": "num_interior",
-        "num. exterior": "num_exterior",
-        "num exterior": "num_exterior",
-        "nacionalidad": "nacionalidad",
-        "país": "pais",
-        "pais": "pais",
-        "estado": "estado",
-        "localidad": "localidad",
-        "codigo postal": "codigo_postal",
-        "colonia": "colonia",
-        # CONTACTO
-        "numero de telefono local": "telefono_local",
-        "numero de telefono celular": "telefono_celular",
-        "correo electronico": "email",
-        # DATOS COMPLEMENTARIOS
-        "ocupacion": "ocupacion",
-        "actividad economica": "actividad_economica",
-        "tipo de identificacion": "tipo_identificacion",
-        "numero de identificacion": "numero_identificacion",
-        "tipo de persona": "tipo_persona",
-        # hidden / href-sourced
-        "id_cliente": "id_cliente",
-        "codigo_venta": "codigo_venta",
-    }
+    labels = [label for label, key in CLIENT_FIELDS.items() if key not in ("id_cliente", "codigo_venta")]
+    try:
+        index = driver.execute_script(_JS_CLIENT_INDEX, labels, list(CLIENT_HIDDEN_INPUTS), include_hidden)
+    except Exception:
+        index = None
+    if isinstance(index, dict):
+        return client_info_from_index(index)
+    return _extract_client_info_xpath(driver)
 
 
+def _extract_client_info_xpath(driver) -> Dict[str, str]:
+    """Versión por XPath de `extract_client_info`: una búsqueda por etiqueta (más lenta)."""
     def find_by_label_text(label_text: str) -> str:
         # probar varias XPaths robustas
         xp_candidates = [
@@ -58,30 +187,20 @@ def extract_client_info(driver) -> Dict[str, str]:
             f"//div[translate(normalize-space(.), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz') = '{label_text}']/following::p[1]",
             f"//*[translate(normalize-space(.), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz') = '{label_text}']/following::p[1]",
         ]
-        for xp in xp_candidates:
-            try:
-                el = driver.find_element(By.XPATH, xp)
-                txt = el.text.strip()
-                if txt:
-                    return txt
-            except NoSuchElementException:
-                continue
-            except Exception:
-                continue
-        return ""
-
-    result = {v: "" for v in fields.values()}
+        # en el orden declarado (la coincidencia exacta gana a `contains`); SelectorCache solo
+        # relega las XPath que nunca aciertan para esta etiqueta
+        return selector_cache().first_match(
+            f"client_label:{label_text}", xp_candidates,
+            lambda xp: driver.find_element(By.XPATH, xp).text.strip(),
+        ) or ""
+
+    result = empty_client_info()
 
     # Extraer inputs ocultos id_cliente y codigo_venta primero
-    for hidden_name in ("id_cliente", "codigo_venta", "codigoVenta", "idCliente"):
+    for hidden_name in CLIENT_HIDDEN_INPUTS:
         try:
             el = driver.find_element(By.XPATH, f"//input[@name='{hidden_name}']")
-            val = el.get_attribute('value') or ""
-            if val:
-                if 'id_cliente' in hidden_name or hidden_name == 'idCliente':
-                    result['id_cliente'] = val
-                elif 'codigo' in hidden_name.lower():
-                    result['codigo_venta'] = val
+            apply_hidden_input(result, hidden_name, el.get_attribute('value') or "")
         except Exception:
             pass
 
@@ -94,18 +213,7 @@ def extract_client_info(driver) -> Dict[str, str]:
                     href = a.get_attribute('href') or a.get_attribute('data-href') or ''
                     if not href:
                         continue
-                    # parse query params
-                    from urllib.parse import urlparse, parse_qs
-
-                    parsed = urlparse(href)
-                    qs = parse_qs(parsed.query)
-                    idc = qs.get('id_cliente') or qs.get('idCliente') or qs.get('id')
-                    cod = qs.get('codigo_venta') or qs.get('codigoVenta') or qs.get('codigo')
-                    if idc and not result.get('id_cliente'):
-                        result['id_cliente'] = idc[0]
-                    if cod and not result.get('codigo_venta'):
-                        result['codigo_venta'] = cod[0]
-                    if result.get('id_cliente') and result.get('codigo_venta'):
+                    if apply_formulario_href(result, href):
                         break
                 except Exception:
                     continue
@@ -113,7 +221,7 @@ def extract_client_info(driver) -> Dict[str, str]:
             pass
 
     # Extraer campos visibles por etiqueta
-    for label, key in fields.items():
+    for label, key in CLIENT_FIELDS.items():
         if key in ("id_cliente", "codigo_venta"):
             # ya manejados
             continue
@@ -0,0 +1,161 @@
+from __future__ import annotations
+import json
+import os
+from typing import Optional, Set
+
+
+def _cursor_path_for(out_path: str) -> str:
+    """Return the cursor path that goes with `out_path` (rows_info.json -> rows_info.cursor.jsonl)."""
+    root, ext = os.path.splitext(out_path)
+    if ext.lower() != ".json":
+        root = out_path
+    return root + ".cursor.jsonl"
+
+
+class ExtractionCursor:
+    """Persisted position of `extract_all_rows_info` so a restarted run can resume.
+
+    The cursor keeps the current page index, the next row index inside that
+    page and the set of `codigo_venta` already completed. It is stored as an
+    append-only JSONL event log next to the output file (one small line per
+    finished row / page change), so persisting it costs O(1) per row:
+
+        {"page_size": 100}                        -> listing shows 100 rows per page
+        {"page": 3}                               -> moved to page 3
+        {"page": 3, "row": 7, "code": "V-123"}    -> row 7 of page 3 completed
+        {"finished": true}                        -> the run reached the end
+
+    Replaying the log yields the last position. A cursor whose run finished
+    starts again from page 1 (completed codes are still honoured). Positions
+    only make sense for the page size they were recorded with (see
+    `set_page_size`).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.page_index = 1
+        self.row_index = 0
+        self.finished = False
+        self.page_size: Optional[int] = None
+        self.completed: Set[str] = set()
+        self._fh = None
+
+    @classmethod
+    def for_output(cls, out_path: str) -> "ExtractionCursor":
+        return cls(_cursor_path_for(out_path))
+
+    def load(self) -> "ExtractionCursor":
+        """Replay the event log (ignores a truncated last line)."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        ev = json.loads(line)
+                    except ValueError:
+                        continue
+                    if not isinstance(ev, dict):
+                        continue
+                    if ev.get("page_size"):
+                        self.page_size = int(ev["page_size"])
+                        continue
+                    if ev.get("finished"):
+                        self.finished = True
+                        continue
+                    if "page" in ev:
+                        self.finished = False
+                        page = int(ev["page"])
+                        if "row" in ev:
+                            self.page_index = page
+                            self.row_index = int(ev["row"]) + 1
+                        elif page != self.page_index:
+                            self.page_index = page
+                            self.row_index = 0
+                    code = ev.get("code")
+                    if code:
+                        self.completed.add(str(code))
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # cursor corrupto: empezar de cero
+            self.page_index, self.row_index, self.finished = 1, 0, False
+        return self
+
+    def reset(self, keep_completed: bool = True) -> None:
+        """Start a new run from page 1, truncating the log (codes are re-logged if kept)."""
+        self.close()
+        self.page_index, self.row_index, self.finished = 1, 0, False
+        if not keep_completed:
+            self.completed = set()
+        dirname = os.path.dirname(self.path)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            if self.page_size:
+                fh.write(json.dumps({"page_size": self.page_size}) + "\n")
+            for code in sorted(self.completed):
+                fh.write(json.dumps({"code": code}, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.path)
+
+    def set_page_size(self, page_size: Optional[int]) -> None:
+        """Record the listing page size; a different size than the logged one restarts at page 1."""
+        if not page_size or page_size == self.page_size:
+            return
+        if self.page_index > 1 or self.row_index > 0:
+            # posición registrada con otro tamaño (o uno desconocido): no corresponde a las mismas filas
+            print(f"Page size changed ({self.page_size or 'unknown'} -> {page_size}); resuming from page 1 (completed rows are still skipped)")
+            self.page_size = page_size
+            self.reset(keep_completed=True)
+            return
+        self.page_size = page_size
+        self._write({"page_size": page_size})
+
+    def _write(self, ev: dict) -> None:
+        try:
+            if self._fh is None:
+                dirname = os.path.dirname(self.path)
+                if dirname and not os.path.exists(dirname):
+                    os.makedirs(dirname, exist_ok=True)
+                self._fh = open(self.path, "a", encoding="utf-8")
+            self._fh.write(json.dumps(ev, ensure_ascii=False, separators=(",", ":")) + "\n")
+            self._fh.flush()
+        except Exception as e:
+            print("Warning: could not write extraction cursor:", e)
+
+    def enter_page(self, page_index: int) -> None:
+        if page_index != self.page_index:
+            self.page_index = page_index
+            self.row_index = 0
+        self._write({"page": page_index})
+
+    def mark_row(self, page_index: int, row_index: int, code: str = "") -> None:
+        """Record that row `row_index` of `page_index` is done (optionally with its code)."""
+        self.page_index = page_index
+        self.row_index = row_index + 1
+        ev = {"page": page_index, "row": row_index}
+        if code:
+            self.completed.add(code)
+            ev["code"] = code
+        self._write(ev)
+
+    def mark_code(self, code: str) -> None:
+        """Record `code` as completed without moving the position (out-of-order retries)."""
+        if not code:
+            return
+        self.completed.add(code)
+        self._write({"code": code})
+
+    def mark_finished(self) -> None:
+        self.finished = True
+        self._write({"finished": True})
+
+    def close(self) -> None:
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except Exception:
+                pass
+            self._fh = None
@@ -0,0 +1,108 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+
+# columnas canónicas del listado que cambian cuando cambia la venta
+FINGERPRINT_COLUMNS = ("estado", "plan", "fecha_venta", "unidad", "codigo_venta")
+
+
+def _fingerprints_path_for(out_path: str) -> str:
+    """Return the fingerprint index path for `out_path` (rows_info.json -> rows_info.fingerprints.jsonl)."""
+    root, ext = os.path.splitext(out_path)
+    if ext.lower() != ".json":
+        root = out_path
+    return root + ".fingerprints.jsonl"
+
+
+def row_fingerprint(row: Dict[str, Any], codigo_venta: str = "") -> str:
+    """Hash of the listing row's Estado, Plan, Fecha Venta, Unidad and Codigo Venta columns.
+
+    `codigo_venta` (the row's hidden input) is used when the column is empty.
+    """
+    values = []
+    for key in FINGERPRINT_COLUMNS:
+        val = (row or {}).get(key) or ""
+        if key == "codigo_venta" and not val:
+            val = codigo_venta or ""
+        values.append(" ".join(str(val).split()))
+    return hashlib.sha1(json.dumps(values, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class FingerprintIndex:
+    """`codigo_venta` -> fingerprint of the listing row the record was extracted from.
+
+    Stored next to the output as an append-only JSONL log (`{"code": ..., "fp": ...}`,
+    last line wins) so an interrupted run keeps what it already recorded; `compact`
+    rewrites it with one line per code.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fingerprints: Dict[str, str] = {}
+        self._fh = None
+
+    @classmethod
+    def for_output(cls, out_path: str) -> "FingerprintIndex":
+        return cls(_fingerprints_path_for(out_path))
+
+    def load(self) -> "FingerprintIndex":
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        ev = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(ev, dict) and ev.get("code"):
+                        self.fingerprints[str(ev["code"])] = str(ev.get("fp") or "")
+        except FileNotFoundError:
+            pass
+        return self
+
+    def get(self, code: str) -> Optional[str]:
+        return self.fingerprints.get(code)
+
+    def unchanged(self, code: str, fp: str) -> bool:
+        """True if `code` was extracted before from a row with the same fingerprint."""
+        return bool(code) and self.fingerprints.get(code) == fp
+
+    def record(self, code: str, fp: str) -> None:
+        if not code or self.fingerprints.get(code) == fp:
+            return
+        self.fingerprints[code] = fp
+        try:
+            if self._fh is None:
+                dirname = os.path.dirname(self.path)
+                if dirname and not os.path.exists(dirname):
+                    os.makedirs(dirname, exist_ok=True)
+                self._fh = open(self.path, "a", encoding="utf-8")
+            self._fh.write(json.dumps({"code": code, "fp": fp}, ensure_ascii=False, separators=(",", ":")) + "\n")
+            self._fh.flush()
+        except Exception as e:
+            print("Warning: could not write fingerprint index:", e)
+
+    def close(self) -> None:
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except Exception:
+                pass
+            self._fh = None
+
+    def compact(self) -> None:
+        """Atomically rewrite the log with the current fingerprint of each code."""
+        self.close()
+        dirname = os.path.dirname(self.path)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            for code, fp in self.fingerprints.items():
+                fh.write(json.dumps({"code": code, "fp": fp}, ensure_ascii=False, separators=(",", ":")) + "\n")
+        os.replace(tmp, self.path)
@@ -0,0 +1,297 @@
+from __future__ import annotations
+import re
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+# elements that never have children in HTML
+_VOID = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+}
+# elements rendered as blocks (a line break before/after their text in `.text`)
+_BLOCK = {
+    "address", "article", "aside", "blockquote", "body", "dd", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4",
+    "h5", "h6", "header", "hr", "html", "label", "li", "main", "nav", "ol", "p",
+    "pre", "section", "table", "tbody", "thead", "tfoot", "tr", "ul",
+}
+# elements whose text is never rendered
+_NON_RENDERED = {"script", "style", "template", "noscript", "head", "title"}
+# optional end tags closed implicitly by a sibling start tag
+_IMPLIED_END = {
+    "p": {"p", "div", "ul", "ol", "table", "form", "h1", "h2", "h3", "h4", "h5", "h6"},
+    "li": {"li"},
+    "dt": {"dt", "dd"},
+    "dd": {"dt", "dd"},
+    "tr": {"tr", "tbody", "thead", "tfoot"},
+    "td": {"td", "th", "tr", "tbody", "thead", "tfoot"},
+    "th": {"td", "th", "tr", "tbody", "thead", "tfoot"},
+    "option": {"option"},
+}
+
+_XML_WS = re.compile(r"[ \t\r\n]+")
+_RENDER_WS = re.compile(r"[ \t\r\n\f\v\xa0]+")
+
+
+def normalize_space(s: str) -> str:
+    """XPath `normalize-space()`: trim and collapse XML whitespace (not &nbsp;)."""
+    return _XML_WS.sub(" ", s or "").strip(" ")
+
+
+def ascii_lower(s: str) -> str:
+    """XPath `translate(., 'A..Z', 'a..z')`: lowercase ASCII letters only."""
+    return (s or "").translate(_ASCII_LOWER)
+
+
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+class Node:
+    """Minimal DOM node: an element (`tag` set) or a text node (`tag` is None)."""
+
+    __slots__ = ("tag", "attrs", "children", "parent", "data", "order")
+
+    def __init__(self, tag: Optional[str], attrs: Optional[Dict[str, str]] = None, data: str = ""):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.children: List["Node"] = []
+        self.parent: Optional["Node"] = None
+        self.data = data
+        self.order = 0
+
+    # -- attributes --------------------------------------------------------
+    def get(self, name: str, default: str = "") -> str:
+        return self.attrs.get(name, default)
+
+    def has_class(self, fragment: str) -> bool:
+        """XPath `contains(@class, fragment)` (substring match on the raw attribute)."""
+        return fragment in (self.attrs.get("class") or "")
+
+    # -- traversal ---------------------------------------------------------
+    @property
+    def elements(self) -> List["Node"]:
+        return [c for c in self.children if c.tag is not None]
+
+    def iter(self) -> Iterator["Node"]:
+        """Descendant elements in document order (excluding self)."""
+        stack = list(reversed(self.elements))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.elements))
+
+    def find_all(self, pred: Callable[["Node"], bool]) -> List["Node"]:
+        return [n for n in self.iter() if pred(n)]
+
+    def find(self, pred: Callable[["Node"], bool]) -> Optional["Node"]:
+        for n in self.iter():
+            if pred(n):
+                return n
+        return None
+
+    def ancestors(self) -> Iterator["Node"]:
+        node = self.parent
+        while node is not None and node.tag is not None:
+            yield node
+            node = node.parent
+
+    def contains(self, other: "Node") -> bool:
+        node = other.parent
+        while node is not None:
+            if node is self:
+                return True
+            node = node.parent
+        return False
+
+    # -- text --------------------------------------------------------------
+    def text_content(self) -> str:
+        """DOM `textContent`: every descendant text node, unmodified."""
+        if self.tag is None:
+            return self.data
+        parts: List[str] = []
+        stack = list(reversed(self.children))
+        while stack:
+            node = stack.pop()
+            if node.tag is None:
+                parts.append(node.data)
+            else:
+                stack.extend(reversed(node.children))
+        return "".join(parts)
+
+    def string_value(self) -> str:
+        """XPath string value of the element (same as `textContent`)."""
+        return self.text_content()
+
+    def is_hidden(self) -> bool:
+        """Best-effort visibility check without CSS: hidden attribute, inline display/visibility, hidden inputs."""
+        for node in [self] + list(self.ancestors()):
+            if node.tag in _NON_RENDERED:
+                return True
+            if "hidden" in node.attrs:
+                return True
+            style = (node.attrs.get("style") or "").replace(" ", "").lower()
+            if "display:none" in style or "visibility:hidden" in style:
+                return True
+            if node.tag == "input" and (node.attrs.get("type") or "").lower() == "hidden":
+                return True
+        return False
+
+    def text(self) -> str:
+        """Approximation of Selenium's `WebElement.text` (rendered text).
+
+        Skips non-rendered/hidden subtrees, inserts line breaks around block
+        elements and `<br>`, collapses whitespace inside lines and drops
+        empty lines.
+        """
+        if self.is_hidden():
+            return ""
+        out: List[str] = []
+
+        def walk(node: "Node") -> None:
+            for c in node.children:
+                if c.tag is None:
+                    # source line breaks are just whitespace when rendered
+                    out.append(_RENDER_WS.sub(" ", c.data))
+                    continue
+                if c.tag in _NON_RENDERED or "hidden" in c.attrs:
+                    continue
+                style = (c.attrs.get("style") or "").replace(" ", "").lower()
+                if "display:none" in style or "visibility:hidden" in style:
+                    continue
+                if c.tag == "br":
+                    out.append("\n")
+                    continue
+                block = c.tag in _BLOCK
+                if block:
+                    out.append("\n")
+                if c.tag in ("td", "th"):
+                    out.append(" ")
+                walk(c)
+                if block:
+                    out.append("\n")
+
+        walk(self)
+        lines = [_RENDER_WS.sub(" ", ln).strip() for ln in "".join(out).split("\n")]
+        return "\n".join(ln for ln in lines if ln)
+
+    def outer_html(self) -> str:
+        if self.tag is None:
+            return _escape(self.data)
+        attrs = "".join(f' {k}="{_escape(v, True)}"' for k, v in self.attrs.items())
+        if self.tag in _VOID:
+            return f"<{self.tag}{attrs}>"
+        inner = "".join(c.outer_html() for c in self.children)
+        return f"<{self.tag}{attrs}>{inner}</{self.tag}>"
+
+
+def _escape(s: str, quote: bool = False) -> str:
+    s = (s or "").replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    if quote:
+        s = s.replace('"', "&quot;")
+    return s
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document")
+        self.stack: List[Node] = [self.root]
+
+    def _close_implied(self, tag: str) -> None:
+        while len(self.stack) > 1:
+            top = self.stack[-1]
+            closers = _IMPLIED_END.get(top.tag or "")
+            if closers and tag in closers:
+                self.stack.pop()
+                continue
+            break
+
+    def handle_starttag(self, tag, attrs):
+        self._close_implied(tag)
+        node = Node(tag, {k: (v if v is not None else "") for k, v in attrs})
+        node.parent = self.stack[-1]
+        self.stack[-1].children.append(node)
+        if tag not in _VOID:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self._close_implied(tag)
+        node = Node(tag, {k: (v if v is not None else "") for k, v in attrs})
+        node.parent = self.stack[-1]
+        self.stack[-1].children.append(node)
+
+    def handle_endtag(self, tag):
+        for idx in range(len(self.stack) - 1, 0, -1):
+            if self.stack[idx].tag == tag:
+                del self.stack[idx:]
+                return
+        # end tag without a matching open element: ignore
+
+    def handle_data(self, data):
+        node = Node(None, data=data)
+        node.parent = self.stack[-1]
+        self.stack[-1].children.append(node)
+
+
+def parse_html(html: str) -> Node:
+    """Parse an HTML string into a `Node` tree (root tag '#document')."""
+    builder = _TreeBuilder()
+    builder.feed(html or "")
+    builder.close()
+    root = builder.root
+    # number elements in document order (used for XPath-like ordering)
+    root.order = 0
+    for i, node in enumerate(root.iter(), start=1):
+        node.order = i
+    return root
+
+
+class DocumentIndex:
+    """Document-order index of a parsed tree for many XPath-like lookups on one page.
+
+    Built once per page: every element gets its position, subtree size and
+    `translate(normalize-space(.), 'A..Z', 'a..z')` text, so `following(node, tag)`
+    (XPath `node/following::tag[1]`) is a table lookup instead of a walk from the root.
+    """
+
+    def __init__(self, root: Node):
+        self.nodes: List[Node] = list(root.iter())
+        n = len(self.nodes)
+        self._pos: Dict[int, int] = {id(node): k for k, node in enumerate(self.nodes)}
+        self._size = [0] * n
+        content = [""] * n
+        # textContent y tamaño de subárbol de abajo arriba: cada nodo se concatena una vez
+        for k in range(n - 1, -1, -1):
+            node = self.nodes[k]
+            parts = []
+            for c in node.children:
+                if c.tag is None:
+                    parts.append(c.data)
+                else:
+                    j = self._pos[id(c)]
+                    parts.append(content[j])
+                    self._size[k] += 1 + self._size[j]
+            content[k] = "".join(parts)
+        self.norm = [ascii_lower(normalize_space(t)) for t in content]
+        self._raw_lower = [ascii_lower(t) for t in content]
+        self._next: Dict[str, List[int]] = {}
+
+    def position(self, node: Node) -> int:
+        return self._pos[id(node)]
+
+    def raw_lower(self, k: int) -> str:
+        """`translate(., 'A..Z', 'a..z')` of element `k` (without normalize-space)."""
+        return self._raw_lower[k]
+
+    def following(self, k: int, tag: str) -> Optional[int]:
+        """Position of the first `tag` element after element `k` and outside its subtree."""
+        nxt = self._next.get(tag)
+        if nxt is None:
+            n = len(self.nodes)
+            nxt = [-1] * (n + 1)
+            for j in range(n - 1, -1, -1):
+                nxt[j] = j if self.nodes[j].tag == tag else nxt[j + 1]
+            self._next[tag] = nxt
+        j = nxt[min(k + self._size[k] + 1, len(self.nodes))]
+        return None if j < 0 else j
@@ -0,0 +1,244 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+
+from helppers.detail_rules import (
+    CLIENT_FIELDS,
+    CLIENT_HIDDEN_INPUTS,
+    amortization_entry,
+    apply_credit_row,
+    apply_formulario_href,
+    apply_hidden_input,
+    empty_client_info,
+    empty_credit_info,
+)
+from helppers.html_dom import DocumentIndex, Node, parse_html, normalize_space
+from helppers.listing_harvester import listing_col_map
+
+
+def _as_root(html_or_root) -> Node:
+    return html_or_root if isinstance(html_or_root, Node) else parse_html(html_or_root or "")
+
+
+def _nearest_ancestor(node: Node, pred) -> Optional[Node]:
+    for anc in node.ancestors():
+        if pred(anc):
+            return anc
+    return None
+
+
+def _first_in_order(nodes: List[Optional[Node]]) -> Optional[Node]:
+    found = [n for n in nodes if n is not None]
+    return min(found, key=lambda n: n.order) if found else None
+
+
+def _locate_card(root: Node, heading: str, ancestor_class: str) -> Optional[Node]:
+    """XPath `//div[contains(normalize-space(.), heading)]/ancestor::div[contains(@class, cls)][1]`."""
+    divs = root.find_all(lambda n: n.tag == "div" and heading in normalize_space(n.string_value()))
+    return _first_in_order([
+        _nearest_ancestor(d, lambda a: a.tag == "div" and a.has_class(ancestor_class)) for d in divs
+    ])
+
+
+# -- listing ---------------------------------------------------------------
+
+def _listing_rows(root: Node) -> List[Node]:
+    return [
+        tr for tr in root.find_all(lambda n: n.tag == "tr")
+        if any(a.tag == "table" for a in tr.ancestors()) and any(c.tag == "td" for c in tr.elements)
+    ]
+
+
+def parse_listing(html_or_root) -> List[Dict[str, Any]]:
+    """Parse a listing page into the same row dicts as `listing_harvester.harvest_listing`."""
+    root = _as_root(html_or_root)
+    out: List[Dict[str, Any]] = []
+    for i, tr in enumerate(_listing_rows(root)):
+        cells = [c for c in tr.elements if c.tag == "td"]
+        last = cells[-1] if cells else None
+
+        code = ""
+        inp = None
+        if last is not None:
+            inp = last.find(lambda n: n.tag == "input" and n.get("name") == "codigo_venta")
+        if inp is None:
+            inp = tr.find(lambda n: n.tag == "input" and n.get("name") == "codigo_venta")
+        if inp is None:
+            inp = tr.find(lambda n: n.tag == "input" and "codigo" in n.get("name").lower())
+        if inp is not None:
+            code = (inp.get("value") or "").strip()
+
+        action = None
+        if last is not None:
+            el = last.find(lambda n: n.tag == "button" and (
+                "ver m" in n.text_content().lower() or "Ver m" in n.text_content()))
+            if el is None:
+                el = last.find(lambda n: n.tag in ("a", "button") or (
+                    n.tag == "input" and n.get("type") in ("button", "submit")))
+            if el is not None:
+                action = {
+                    'tag': el.tag,
+                    'text': (el.text_content() or el.get("value") or "").strip(),
+                    'href': el.get("href"),
+                    'onclick': el.get("onclick"),
+                    'target': el.get("target"),
+                    'data_href': el.get("data-href"),
+                }
+
+        out.append({
+            'index': i,
+            'row': listing_col_map([c.text() for c in cells]),
+            'codigo_venta': code,
+            'action': action,
+            'html': tr.outer_html()[:2000],
+        })
+    return out
+
+
+# -- Información del Crédito -------------------------------------------------
+
+def parse_credit_info(html_or_root) -> Dict[str, str]:
+    """Offline counterpart of `extract_credit.extract_credit_info` (same keys and label rules)."""
+    root = _as_root(html_or_root)
+    blk = _locate_card(root, "Información del Crédito", "form-layout")
+    if blk is None:
+        blk = root.find(lambda n: n.tag == "div" and n.has_class("form-layout") and n.find(
+            lambda d: d.tag == "div" and "Desarrollo" in d.string_value()) is not None)
+    if blk is None:
+        return {}
+
+    info: Dict[str, str] = empty_credit_info()
+    for r in blk.find_all(lambda n: n.tag == "div" and n.has_class("row")):
+        texts = [(c.text() or c.text_content()).strip() for c in r.elements if c.tag == "div"]
+        apply_credit_row(info, texts)
+    return info
+
+
+# -- Tabla de Amortización ---------------------------------------------------
+
+def parse_amortization_table(html_or_root) -> List[Dict[str, str]]:
+    """Offline counterpart of `extract_amortization.extract_amortization_table`."""
+    root = _as_root(html_or_root)
+    card = _locate_card(root, "Tabla de Amortización", "card")
+    if card is None:
+        tables = root.find_all(lambda n: n.tag == "table" and n.find(
+            lambda th: th.tag == "th" and "Monto" in th.string_value()) is not None and n.find(
+            lambda tb: tb.tag == "tbody") is not None)
+        card = _first_in_order([
+            _nearest_ancestor(t, lambda a: a.tag == "div" and a.has_class("card")) for t in tables
+        ])
+    if card is None:
+        return []
+
+    rows = [
+        tr for tr in card.find_all(lambda n: n.tag == "tr")
+        if any(a.tag == "tbody" for a in tr.ancestors() if card.contains(a))
+        and any(a.tag == "table" for a in tr.ancestors() if card.contains(a))
+    ]
+
+    result: List[Dict[str, str]] = []
+    for tr in rows:
+        cols = [c for c in tr.elements if c.tag in ("th", "td")]
+        cells = [(c.text() or c.text_content()).strip() for c in cols]
+        if not cells:
+            continue
+
+        pago_id = ""
+        anchor_text = None
+        third = [c for c in tr.elements if c.tag == "td"][2:3] + [c for c in tr.elements if c.tag == "th"][2:3]
+        a = _first_in_order([c.find(lambda n: n.tag == "a") for c in third])
+        if a is not None:
+            pago_id = a.get("id")
+            anchor_text = a.text()
+        else:
+            a = tr.find(lambda n: n.tag == "a")
+            pago_id = a.get("id") if a is not None else ""
+
+        result.append(amortization_entry(cells, pago_id, anchor_text))
+    return result
+
+
+# -- Cliente -----------------------------------------------------------------
+
+def parse_client_info(html_or_root) -> Dict[str, str]:
+    """Offline counterpart of `extract_client.extract_client_info` (same keys and label rules)."""
+    root = _as_root(html_or_root)
+    result = empty_client_info()
+
+    for hidden_name in CLIENT_HIDDEN_INPUTS:
+        el = root.find(lambda n: n.tag == "input" and n.get("name") == hidden_name)
+        if el is not None:
+            apply_hidden_input(result, hidden_name, el.get("value"))
+
+    if not result.get('id_cliente') or not result.get('codigo_venta'):
+        for a in root.find_all(lambda n: n.tag == "a" and "Formulario_Cliente" in n.get("href")):
+            href = a.get("href") or a.get("data-href")
+            if not href:
+                continue
+            if apply_formulario_href(result, href):
+                break
+
+    # posiciones, subárboles y texto normalizado de todos los elementos, calculados
+    # una sola vez; cada etiqueta se resuelve luego contra este índice
+    index = DocumentIndex(root)
+    nodes = index.nodes
+    labels = [label for label, key in CLIENT_FIELDS.items() if key not in ("id_cliente", "codigo_venta")]
+    wanted = set(labels)
+
+    # XPath candidates in order: label = l, label contains l, dt = l (-> dd), div = l, * = l
+    anchors: Dict[Tuple[int, str], List[int]] = {}
+    label_positions: List[int] = []
+    for k, node in enumerate(nodes):
+        t = index.norm[k]
+        if node.tag == "label":
+            label_positions.append(k)
+        if t not in wanted:
+            continue
+        if node.tag == "label":
+            anchors.setdefault((0, t), []).append(k)
+        if node.tag == "dt":
+            anchors.setdefault((2, t), []).append(k)
+        if node.tag == "div":
+            anchors.setdefault((3, t), []).append(k)
+        anchors.setdefault((4, t), []).append(k)
+    for k in label_positions:
+        t = index.norm[k]
+        for label in labels:
+            if label in t:
+                anchors.setdefault((1, label), []).append(k)
+    targets = ("p", "p", "dd", "p", "p")
+
+    def first_following(positions: List[int], tag: str) -> Optional[Node]:
+        # like find_element: first node of the union `anchors/following::tag[1]`
+        found = [j for j in (index.following(k, tag) for k in positions) if j is not None]
+        return nodes[min(found)] if found else None
+
+    def find_by_label_text(label_text: str) -> str:
+        for cand, target in enumerate(targets):
+            positions = anchors.get((cand, label_text))
+            if not positions:
+                continue
+            el = first_following(positions, target)
+            if el is None:
+                continue
+            txt = el.text().strip()
+            if txt:
+                return txt
+        return ""
+
+    for label, key in CLIENT_FIELDS.items():
+        if key in ("id_cliente", "codigo_venta"):
+            continue
+        result[key] = find_by_label_text(label) or ""
+
+    if not result.get('name'):
+        el = first_following([k for k in label_positions if "nombre" in index.raw_lower(k)], "p")
+        if el is not None:
+            result['name'] = el.text().strip()
+
+    return result
+
+
+def parse_detail_page(html: str) -> Tuple[Dict[str, str], List[Dict[str, str]], Dict[str, str]]:
+    """Parse a detail page once and return `(info_credito, amortizacion, cliente)`."""
+    root = parse_html(html or "")
+    return parse_credit_info(root), parse_amortization_table(root), parse_client_info(root)
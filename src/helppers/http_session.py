@@ -0,0 +1,197 @@
+from __future__ import annotations
+import gzip
+import http.client
+import queue
+import re
+import threading
+import zlib
+from http.cookies import SimpleCookie
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+
+class HttpResponse:
+    """Decoded response of `HttpSession.get`."""
+
+    def __init__(self, status: int, url: str, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.url = url
+        self.headers = headers
+        self.body = body
+
+    @property
+    def text(self) -> str:
+        m = re.search(r"charset=([\w-]+)", self.headers.get("content-type", ""), re.I)
+        encoding = m.group(1) if m else "utf-8"
+        try:
+            return self.body.decode(encoding, errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+    def looks_like_login(self) -> bool:
+        """True if the page is a login form (the session expired or was not exported)."""
+        return bool(re.search(r"<input[^>]+type=['\"]?password", self.text, re.I))
+
+
+class HttpSession:
+    """Small pooled HTTP/1.1 client (stdlib only) that reuses a browser session.
+
+    - Cookies are taken from the logged-in Selenium driver (`from_driver`) and
+      kept up to date with `Set-Cookie` responses.
+    - Keep-alive connections are pooled per (scheme, host, port), up to
+      `pool_size` idle connections each; the session is safe to share between
+      threads (each request checks out its own connection).
+    - gzip/deflate responses are decoded; redirects are followed.
+    """
+
+    def __init__(self, cookies: Optional[List[Dict[str, Any]]] = None, user_agent: str = "", pool_size: int = 4, timeout: float = 30.0):
+        self.pool_size = max(1, int(pool_size))
+        self.timeout = timeout
+        self.headers = {
+            "User-Agent": user_agent or "Mozilla/5.0",
+            "Accept": "text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        }
+        self._cookies: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self._cookie_lock = threading.Lock()
+        self._pools: Dict[Tuple[str, str, int], "queue.LifoQueue[http.client.HTTPConnection]"] = {}
+        self._pool_lock = threading.Lock()
+        for c in cookies or []:
+            self._set_cookie(c.get("name", ""), c.get("value", ""), c.get("domain", ""), c.get("path") or "/")
+
+    @classmethod
+    def from_driver(cls, driver, pool_size: int = 4, timeout: float = 30.0) -> "HttpSession":
+        """Build a session with the cookies and user agent of a logged-in WebDriver."""
+        try:
+            user_agent = driver.execute_script("return navigator.userAgent") or ""
+        except Exception:
+            user_agent = ""
+        return cls(cookies=driver.get_cookies(), user_agent=user_agent, pool_size=pool_size, timeout=timeout)
+
+    # -- cookies -----------------------------------------------------------
+    def _set_cookie(self, name: str, value: str, domain: str, path: str) -> None:
+        if not name:
+            return
+        with self._cookie_lock:
+            self._cookies[((domain or "").lstrip(".").lower(), path or "/", name)] = {"value": value}
+
+    def _cookie_header(self, host: str, path: str) -> str:
+        host = host.lower()
+        pairs = []
+        with self._cookie_lock:
+            for (domain, cpath, name), c in self._cookies.items():
+                if domain and not (host == domain or host.endswith("." + domain)):
+                    continue
+                if not path.startswith(cpath):
+                    continue
+                pairs.append(f"{name}={c['value']}")
+        return "; ".join(pairs)
+
+    def _store_cookies(self, host: str, headers: List[Tuple[str, str]]) -> None:
+        for key, value in headers:
+            if key.lower() != "set-cookie":
+                continue
+            jar = SimpleCookie()
+            try:
+                jar.load(value)
+            except Exception:
+                continue
+            for name, morsel in jar.items():
+                self._set_cookie(name, morsel.value, morsel["domain"] or host, morsel["path"] or "/")
+
+    # -- connection pool ---------------------------------------------------
+    def _pool(self, key: Tuple[str, str, int]) -> "queue.LifoQueue[http.client.HTTPConnection]":
+        with self._pool_lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = queue.LifoQueue(maxsize=self.pool_size)
+                self._pools[key] = pool
+            return pool
+
+    def _acquire(self, key: Tuple[str, str, int]) -> http.client.HTTPConnection:
+        try:
+            return self._pool(key).get_nowait()
+        except queue.Empty:
+            scheme, host, port = key
+            if scheme == "https":
+                return http.client.HTTPSConnection(host, port, timeout=self.timeout)
+            return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _release(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        try:
+            self._pool(key).put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self) -> None:
+        with self._pool_lock:
+            pools = list(self._pools.values())
+            self._pools = {}
+        for pool in pools:
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
+
+    # -- requests ----------------------------------------------------------
+    def _request_once(self, url: str, extra_headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        host = parts.hostname or ""
+        key = (scheme, host, port)
+        path = parts.path or "/"
+        target = path + ("?" + parts.query if parts.query else "")
+
+        headers = dict(self.headers)
+        headers["Host"] = parts.netloc
+        cookie = self._cookie_header(host, path)
+        if cookie:
+            headers["Cookie"] = cookie
+        if extra_headers:
+            headers.update(extra_headers)
+
+        # a pooled keep-alive connection may have been closed by the server: retry once on a new one
+        for attempt in range(2):
+            conn = self._acquire(key)
+            try:
+                conn.request("GET", target, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionError, BrokenPipeError):
+                conn.close()
+                if attempt == 1:
+                    raise
+                continue
+            except Exception:
+                conn.close()
+                raise
+            raw_headers = resp.getheaders()
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            break
+
+        self._store_cookies(host, raw_headers)
+        hdrs = {k.lower(): v for k, v in raw_headers}
+        encoding = hdrs.get("content-encoding", "").lower()
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            try:
+                body = zlib.decompress(body)
+            except zlib.error:
+                body = zlib.decompress(body, -zlib.MAX_WBITS)
+        return HttpResponse(resp.status, url, hdrs, body)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, max_redirects: int = 5) -> HttpResponse:
+        """GET `url` following up to `max_redirects` redirects."""
+        resp = self._request_once(url, headers)
+        for _ in range(max_redirects):
+            if resp.status not in (301, 302, 303, 307, 308) or "location" not in resp.headers:
+                break
+            resp = self._request_once(urljoin(resp.url, resp.headers["location"]), headers)
+        return resp
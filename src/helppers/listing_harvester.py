@@ -0,0 +1,161 @@
+from __future__ import annotations
+import re
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin
+
+
+# Orden canónico de las columnas de la tabla de ventas del ERP origen
+LISTING_COLUMNS = [
+    "Temp.", "Sucursal", "Asesor", "Cliente", "Desarrollo", "Unidad",
+    "Fecha Venta", "Estado", "Plan", "Acciones", "Codigo Venta",
+]
+
+
+def _norm_key(s: str) -> str:
+    return re.sub(r"[^0-9a-z]+", "_", (s or '').strip().lower()).strip('_')
+
+
+LISTING_KEYS = [_norm_key(x) for x in LISTING_COLUMNS]
+
+
+def listing_col_map(cells: List[str]) -> Dict[str, str]:
+    """Map the texts of a row's `td` cells to the canonical column keys (extra cells -> col_N)."""
+    col_map: Dict[str, str] = {}
+    for idx, val in enumerate(cells, start=1):
+        k = LISTING_KEYS[idx - 1] if idx - 1 < len(LISTING_KEYS) else f"col_{idx}"
+        col_map[k] = (val or "").strip()
+    return col_map
+
+
+# Shared JS helpers: same rules as the former per-row XPaths
+# (`//table//tr[td]`, hidden `codigo_venta` input, "Ver más" button in the last cell).
+_JS_HELPERS = r"""
+function migRows() {
+  return Array.from(document.querySelectorAll('table tr')).filter(function (tr) {
+    return Array.prototype.some.call(tr.children, function (c) { return c.tagName === 'TD'; });
+  });
+}
+function migCells(tr) {
+  return Array.prototype.filter.call(tr.children, function (c) { return c.tagName === 'TD'; });
+}
+function migCode(tr) {
+  var cells = migCells(tr);
+  var last = cells[cells.length - 1];
+  var inp = (last && last.querySelector("input[name='codigo_venta']")) || tr.querySelector("input[name='codigo_venta']");
+  if (!inp) {
+    inp = Array.prototype.find.call(tr.querySelectorAll('input[name]'), function (i) {
+      return i.getAttribute('name').toLowerCase().indexOf('codigo') !== -1;
+    }) || null;
+  }
+  return inp ? (inp.getAttribute('value') || inp.value || '').trim() : '';
+}
+function migAction(tr) {
+  var cells = migCells(tr);
+  var last = cells[cells.length - 1];
+  if (!last) return null;
+  var btn = Array.prototype.find.call(last.querySelectorAll('button'), function (b) {
+    var t = b.textContent || '';
+    return t.toLowerCase().indexOf('ver m') !== -1 || t.indexOf('Ver m') !== -1;
+  });
+  return btn || last.querySelector("a, button, input[type='button'], input[type='submit']");
+}
+"""
+
+_JS_HARVEST = _JS_HELPERS + r"""
+return migRows().map(function (tr, i) {
+  var action = migAction(tr);
+  return {
+    index: i,
+    cells: migCells(tr).map(function (td) { return (td.innerText || '').trim(); }),
+    codigo_venta: migCode(tr),
+    action: action ? {
+      tag: action.tagName.toLowerCase(),
+      text: (action.textContent || action.value || '').trim(),
+      href: action.getAttribute('href') || '',
+      onclick: action.getAttribute('onclick') || '',
+      target: action.getAttribute('target') || '',
+      data_href: action.getAttribute('data-href') || ''
+    } : null,
+    html: (tr.outerHTML || '').slice(0, 2000)
+  };
+});
+"""
+
+_JS_CLICK = _JS_HELPERS + r"""
+var index = arguments[0], code = arguments[1];
+var rows = migRows();
+var tr = rows[index];
+// si la tabla se re-renderizó y el índice ya no corresponde al código, buscar por código
+if (code && (!tr || migCode(tr) !== code)) {
+  tr = rows.find(function (r) { return migCode(r) === code; });
+}
+if (!tr) return false;
+var el = migAction(tr);
+if (!el) return false;
+el.scrollIntoView(true);
+el.click();
+return true;
+"""
+
+
+def harvest_listing(driver) -> List[Dict[str, Any]]:
+    """Read every data row of the listing in a single `execute_script` round trip.
+
+    Returns one dict per row (same order as `//table//tr[td]`):
+      - `index`: position of the row in the listing
+      - `row`: canonical column map (see `LISTING_COLUMNS`)
+      - `codigo_venta`: value of the row's hidden `codigo_venta` input (or '')
+      - `action`: dict describing the "Ver más" element (tag, text, href, onclick,
+        target, data_href) or None if the row has nothing clickable
+      - `html`: the row's outerHTML (truncated to 2000 chars) for diagnostics
+    """
+    try:
+        raw = driver.execute_script(_JS_HARVEST) or []
+    except Exception:
+        return []
+    out: List[Dict[str, Any]] = []
+    for item in raw:
+        if not isinstance(item, dict):
+            continue
+        out.append({
+            'index': int(item.get('index') or 0),
+            'row': listing_col_map(item.get('cells') or []),
+            'codigo_venta': (item.get('codigo_venta') or '').strip(),
+            'action': item.get('action') or None,
+            'html': item.get('html') or '',
+        })
+    return out
+
+
+def click_row_action(driver, index: int, codigo_venta: str = "") -> bool:
+    """Click the action element of listing row `index` (re-located by `codigo_venta` if the table moved)."""
+    try:
+        return bool(driver.execute_script(_JS_CLICK, index, codigo_venta or ""))
+    except Exception:
+        return False
+
+
+# onclick="location.href='...'", "window.location = '...'", "window.open('...')", "location.assign('...')"
+_ONCLICK_URL_RE = re.compile(
+    r"""(?:location(?:\.href)?\s*=\s*|location\.(?:assign|replace)\(\s*|window\.open\(\s*)(['"])(?P<url>[^'"]+)\1"""
+)
+
+
+def resolve_detail_url(action: Optional[Dict[str, Any]], base_url: str = "") -> str:
+    """Return the absolute detail URL behind a listing action element, or '' if none.
+
+    Looks at `href`, `data-href` and common `onclick` navigation patterns; anchors
+    pointing to '#' or `javascript:` are not navigable and yield ''.
+    """
+    if not action:
+        return ""
+    candidates = [action.get('href') or '', action.get('data_href') or '']
+    m = _ONCLICK_URL_RE.search(action.get('onclick') or '')
+    if m:
+        candidates.append(m.group('url'))
+    for raw in candidates:
+        raw = raw.strip()
+        if not raw or raw.startswith('#') or raw.lower().startswith('javascript:'):
+            continue
+        return urljoin(base_url, raw) if base_url else raw
+    return ""
@@ -0,0 +1,122 @@
+from __future__ import annotations
+from typing import Optional, Tuple
+
+
+# Salto directo: el ERP sólo pinta ~10 enlaces `a.Pagina[data-valor]` por bloque.
+# Para una página fuera del bloque se clona un enlace existente (con sus handlers
+# si la página usa jQuery), se le pone `data-valor` = destino y se clica: el mismo
+# handler que usa la paginación pide esa página directamente.
+_JS_JUMP = r"""
+var target = String(arguments[0]);
+var links = Array.from(document.querySelectorAll('a.Pagina[data-valor]'));
+var visible = links.find(function (a) { return a.getAttribute('data-valor') === target; });
+if (visible) { visible.scrollIntoView(true); visible.click(); return 'link'; }
+var proto = links.find(function (a) {
+  var c = a.className || '';
+  return c.indexOf('disabled') === -1 && c.indexOf('cursor-cancel') === -1;
+});
+if (!proto) return '';
+var el;
+if (window.jQuery) {
+  el = window.jQuery(proto).clone(true).attr('data-valor', target).data('valor', target).text(target)[0];
+} else {
+  el = proto.cloneNode(true);
+  el.setAttribute('data-valor', target);
+  el.textContent = target;
+}
+el.style.display = 'none';
+var li = proto.closest('li');
+(li ? li.parentNode : proto.parentNode).appendChild(el);
+el.click();
+setTimeout(function () { if (el.parentNode) el.parentNode.removeChild(el); }, 0);
+return 'synthetic';
+"""
+
+_JS_MAX_VISIBLE = r"""
+var vals = Array.from(document.querySelectorAll('a.Pagina[data-valor]')).map(function (a) {
+  return parseInt(a.getAttribute('data-valor'), 10);
+}).filter(function (n) { return !isNaN(n); });
+return vals.length ? Math.max.apply(null, vals) : null;
+"""
+
+# Control "mostrar N registros": un <select> cuyas opciones son todas números
+# (DataTables `*_length`, o selects con nombre de tipo registros/limite/por_pagina).
+_JS_PAGE_SIZE_SELECT = r"""
+function migPageSizeSelect() {
+  var hint = /length|registros|mostrar|limite|limit|cantidad|por_?pagina|per_?page|page_?size/i;
+  var selects = Array.from(document.querySelectorAll('select'));
+  return selects.find(function (s) {
+    var key = (s.name || '') + ' ' + (s.id || '') + ' ' + (s.className || '');
+    if (!hint.test(key)) return false;
+    var opts = Array.from(s.options);
+    return opts.length > 1 && opts.every(function (o) { return /^-?\d+$/.test((o.value || '').trim()); });
+  }) || null;
+}
+"""
+
+_JS_GET_PAGE_SIZE = _JS_PAGE_SIZE_SELECT + r"""
+var s = migPageSizeSelect();
+return s ? parseInt(s.value, 10) : null;
+"""
+
+_JS_SET_MAX_PAGE_SIZE = _JS_PAGE_SIZE_SELECT + r"""
+var s = migPageSizeSelect();
+if (!s) return null;
+// mayor tamaño positivo; '-1' (todos) no se usa para mantener páginas que repartir entre workers
+var best = null;
+Array.from(s.options).forEach(function (o) {
+  var n = parseInt(o.value, 10);
+  if (n > 0 && (best === null || n > best)) best = n;
+});
+if (best === null) return null;
+if (parseInt(s.value, 10) === best) return {size: best, changed: false};
+s.value = String(best);
+if (window.jQuery) { window.jQuery(s).val(String(best)).trigger('change'); }
+else { s.dispatchEvent(new Event('change', {bubbles: true})); }
+return {size: best, changed: true};
+"""
+
+
+def click_page_link(driver, target: int) -> str:
+    """Click the pagination link of page `target`, synthesizing it if it is not rendered.
+
+    Returns 'link' (visible link clicked), 'synthetic' (cloned link clicked) or ''
+    if the pagination has no `a.Pagina` link to work with.
+    """
+    try:
+        return driver.execute_script(_JS_JUMP, int(target)) or ""
+    except Exception:
+        return ""
+
+
+def max_visible_page(driver) -> Optional[int]:
+    """Highest `data-valor` among the rendered pagination links (None if there are none)."""
+    try:
+        val = driver.execute_script(_JS_MAX_VISIBLE)
+        return int(val) if val is not None else None
+    except Exception:
+        return None
+
+
+def current_page_size(driver) -> Optional[int]:
+    """Value of the listing's page-length control, or None if the listing has none."""
+    try:
+        val = driver.execute_script(_JS_GET_PAGE_SIZE)
+        return int(val) if val is not None else None
+    except Exception:
+        return None
+
+
+def select_max_page_size(driver) -> Tuple[Optional[int], bool]:
+    """Select the largest page size offered by the page-length control.
+
+    Returns `(size, changed)`; `size` is None if the listing has no page-length
+    control, `changed` is False if the largest size was already selected.
+    """
+    try:
+        val = driver.execute_script(_JS_SET_MAX_PAGE_SIZE)
+    except Exception:
+        return None, False
+    if not isinstance(val, dict) or val.get('size') is None:
+        return None, False
+    return int(val['size']), bool(val.get('changed'))
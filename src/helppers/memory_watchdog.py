@@ -0,0 +1,144 @@
+from __future__ import annotations
+import os
+from typing import Any, List, Optional
+
+try:  # psutil es opcional: sin él se lee /proc (Linux) o, en su defecto, las métricas CDP
+    import psutil as _psutil
+except ImportError:
+    _psutil = None
+
+
+def _chromedriver_pid(driver) -> Optional[int]:
+    try:
+        return int(driver.service.process.pid)
+    except Exception:
+        return None
+
+
+def _proc_children() -> dict:
+    """ppid -> [pid] de todos los procesos visibles en /proc."""
+    children: dict = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "r") as fh:
+                # el nombre del proceso (campo 2) puede contener espacios: partir tras ')'
+                ppid = int(fh.read().rsplit(")", 1)[1].split()[1])
+        except Exception:
+            continue
+        children.setdefault(ppid, []).append(int(name))
+    return children
+
+
+def _proc_mb(pid: int) -> float:
+    # PSS reparte la memoria compartida entre procesos (no la cuenta N veces); RSS si no hay smaps
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as fh:
+            for line in fh:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024.0
+    except Exception:
+        pass
+    try:
+        with open(f"/proc/{pid}/statm", "r") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0)
+    except Exception:
+        return 0.0
+
+
+def _descendants(root: int, children: dict) -> List[int]:
+    out, stack = [], [root]
+    while stack:
+        for child in children.get(stack.pop(), ()):
+            out.append(child)
+            stack.append(child)
+    return out
+
+
+def _process_tree_mb(root: int) -> Optional[float]:
+    """Memoria de los procesos de Chrome lanzados por chromedriver `root` (sin contar chromedriver)."""
+    if _psutil is not None:
+        try:
+            total = 0.0
+            for proc in _psutil.Process(root).children(recursive=True):
+                try:
+                    info = proc.memory_full_info() if hasattr(proc, "memory_full_info") else proc.memory_info()
+                    total += getattr(info, "pss", None) or info.rss
+                except Exception:
+                    continue
+            return total / (1024.0 * 1024.0)
+        except Exception:
+            return None
+    if not os.path.isdir("/proc"):
+        return None
+    pids = _descendants(root, _proc_children())
+    if not pids:
+        return None
+    return sum(_proc_mb(p) for p in pids)
+
+
+def _js_heap_mb(driver) -> Optional[float]:
+    """Heap JS del renderer de la pestaña actual (CDP `Performance.getMetrics`)."""
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+        metrics = driver.execute_cdp_cmd("Performance.getMetrics", {}).get("metrics") or []
+        values = {m.get("name"): m.get("value") for m in metrics}
+        size = values.get("JSHeapTotalSize")
+        return None if size is None else float(size) / (1024.0 * 1024.0)
+    except Exception:
+        return None
+
+
+def browser_memory_mb(driver) -> Optional[float]:
+    """Memoria que ocupa el navegador de `driver`, en MB (None si no se puede medir).
+
+    Suma la memoria (PSS, o RSS) de todos los procesos de Chrome hijos de chromedriver,
+    con psutil si está instalado o leyendo /proc; si no es posible (p. ej. Windows sin
+    psutil, o un driver remoto) usa el heap JS del renderer actual vía CDP.
+    """
+    pid = _chromedriver_pid(driver)
+    if pid is not None:
+        mb = _process_tree_mb(pid)
+        if mb:
+            return mb
+    return _js_heap_mb(driver)
+
+
+class MemoryWatchdog:
+    """Decide cuándo reiniciar un navegador cuya memoria creció demasiado.
+
+    `check(driver)` se llama entre registros: cada `every` llamadas mide la memoria
+    (`browser_memory_mb`) y devuelve True si supera `limit_mb`. Tras un reinicio,
+    `reset()` reinicia el contador para no medir el navegador nuevo enseguida.
+    """
+
+    def __init__(self, limit_mb: float, every: int = 10):
+        self.limit_mb = float(limit_mb)
+        self.every = max(1, int(every))
+        self.last_mb: Optional[float] = None
+        self.restarts = 0
+        self._calls = 0
+
+    def check(self, driver) -> bool:
+        self._calls += 1
+        if self._calls % self.every:
+            return False
+        self.last_mb = browser_memory_mb(driver)
+        if self.last_mb is None or self.last_mb < self.limit_mb:
+            return False
+        print(f"Browser memory at {self.last_mb:.0f} MB (limit {self.limit_mb:.0f} MB); restarting the browser")
+        return True
+
+    def reset(self) -> None:
+        self._calls = 0
+        self.restarts += 1
+
+
+def restart_driver(driver, start) -> Any:
+    """Cierra `driver` y devuelve `start()` (un navegador nuevo ya autenticado)."""
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    return start()
@@ -0,0 +1,194 @@
+from __future__ import annotations
+import base64
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from helppers.html_parsers import parse_detail_page, parse_listing
+from helppers.listing_harvester import LISTING_KEYS, _norm_key, listing_col_map
+
+
+# tipos de recurso (CDP `Network.ResourceType`) que pueden traer datos del listado o del detalle
+_DATA_TYPES = ("Document", "XHR", "Fetch")
+
+
+def enable_network_log(options) -> None:
+    """Ask chromedriver for the DevTools `performance` log (Network.* events) on `options`."""
+    prefs = dict(options.capabilities.get("goog:loggingPrefs") or {})
+    prefs["performance"] = "ALL"
+    options.set_capability("goog:loggingPrefs", prefs)
+
+
+class CapturedResponse:
+    """One response seen in the performance log (body fetched lazily over CDP)."""
+
+    __slots__ = ("request_id", "url", "status", "mime", "type", "_body")
+
+    def __init__(self, request_id: str, url: str, status: int, mime: str, type_: str):
+        self.request_id = request_id
+        self.url = url
+        self.status = status
+        self.mime = mime
+        self.type = type_
+        self._body: Optional[str] = None
+
+    @property
+    def is_json(self) -> bool:
+        return "json" in self.mime
+
+    @property
+    def is_html(self) -> bool:
+        return "html" in self.mime
+
+
+class NetworkCapture:
+    """Reads the Document/XHR/Fetch responses of a driver started with `enable_network_log`.
+
+    `drain()` returns the responses finished since the previous call (and
+    discards the rest of the log). The log is not drained on creation: the first
+    call also returns what the page already open produced, so the listing page
+    loaded before the capture existed is not lost. `body(resp)` downloads a
+    response body with `Network.getResponseBody`, which only works while the
+    page that made the request is still loaded, so bodies must be read right
+    after the navigation or click that produced them.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._pending: Dict[str, CapturedResponse] = {}
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+        except Exception as e:
+            print("Warning: could not enable the CDP network domain:", e)
+
+    def drain(self) -> List[CapturedResponse]:
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception:
+            return []
+        done: List[CapturedResponse] = []
+        for entry in entries:
+            try:
+                msg = json.loads(entry["message"])["message"]
+            except Exception:
+                continue
+            method = msg.get("method")
+            params = msg.get("params") or {}
+            if method == "Network.responseReceived":
+                if params.get("type") not in _DATA_TYPES:
+                    continue
+                resp = params.get("response") or {}
+                mime = (resp.get("mimeType") or "").lower()
+                if "json" not in mime and "html" not in mime:
+                    continue
+                self._pending[params["requestId"]] = CapturedResponse(
+                    params["requestId"], resp.get("url") or "", int(resp.get("status") or 0), mime, params.get("type") or "")
+            elif method == "Network.loadingFinished":
+                resp = self._pending.pop(params.get("requestId"), None)
+                if resp is not None:
+                    done.append(resp)
+            elif method == "Network.loadingFailed":
+                self._pending.pop(params.get("requestId"), None)
+        return done
+
+    def body(self, resp: CapturedResponse) -> str:
+        if resp._body is None:
+            try:
+                res = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": resp.request_id})
+                raw = res.get("body") or ""
+                if res.get("base64Encoded"):
+                    raw = base64.b64decode(raw).decode("utf-8", errors="replace")
+                resp._body = raw
+            except Exception:
+                resp._body = ""
+        return resp._body
+
+
+# -- payloads -> registros ---------------------------------------------------
+
+def _row_from_mapping(obj: Dict[str, Any]) -> Dict[str, str]:
+    """Canonical column map from a JSON row object (keys matched to `LISTING_COLUMNS`)."""
+    col_map = {k: "" for k in LISTING_KEYS}
+    for key, val in obj.items():
+        nk = _norm_key(str(key))
+        if nk not in col_map:
+            # claves habituales de APIs que no coinciden con el encabezado
+            nk = {"codigo": "codigo_venta", "cod_venta": "codigo_venta", "id_venta": "codigo_venta",
+                  "fecha": "fecha_venta", "status": "estado"}.get(nk, "")
+        if not nk:
+            continue
+        col_map[nk] = "" if val is None else " ".join(str(val).split())
+    return col_map
+
+
+def _json_rows(payload: Any) -> Optional[List[Any]]:
+    """The first list of row-like items (dicts or lists) found in a JSON payload."""
+    if isinstance(payload, list):
+        if payload and all(isinstance(x, (dict, list)) for x in payload):
+            return payload
+        return None
+    if isinstance(payload, dict):
+        # DataTables y similares: {"data": [...]}, {"rows": [...]}, {"aaData": [...]}
+        for key in ("data", "rows", "aaData", "items", "result", "ventas"):
+            if key in payload:
+                found = _json_rows(payload[key])
+                if found is not None:
+                    return found
+        for val in payload.values():
+            found = _json_rows(val)
+            if found is not None:
+                return found
+    return None
+
+
+def listing_from_payload(body: str, is_json: bool) -> List[Dict[str, Any]]:
+    """Listing rows (same dicts as `harvest_listing`) from a captured JSON or HTML fragment."""
+    if not body:
+        return []
+    if not is_json:
+        return parse_listing(body)
+    try:
+        rows = _json_rows(json.loads(body))
+    except ValueError:
+        return []
+    out: List[Dict[str, Any]] = []
+    for i, item in enumerate(rows or []):
+        if isinstance(item, dict):
+            col_map = _row_from_mapping(item)
+        else:
+            col_map = listing_col_map(["" if c is None else str(c) for c in item])
+        if not any(col_map.values()):
+            continue
+        out.append({'index': i, 'row': col_map, 'codigo_venta': col_map.get('codigo_venta', ''), 'action': None, 'html': json.dumps(item, ensure_ascii=False)[:2000]})
+    return out
+
+
+def best_listing(capture: NetworkCapture, responses: Iterable[CapturedResponse]) -> List[Dict[str, Any]]:
+    """Rows of the captured response that looks most like the listing (most rows with a code)."""
+    best: List[Dict[str, Any]] = []
+    for resp in responses:
+        if resp.status >= 400:
+            continue
+        rows = listing_from_payload(capture.body(resp), resp.is_json)
+        score = sum(1 for r in rows if r.get('codigo_venta'))
+        if rows and score > sum(1 for r in best if r.get('codigo_venta')):
+            best = rows
+    return best
+
+
+def detail_from_responses(capture: NetworkCapture, responses: Iterable[CapturedResponse]):
+    """`parse_detail_page` over the HTML document and fragments of one detail view.
+
+    Returns `(info_credito, amortizacion, cliente, html)` or None if the payloads
+    do not contain the client data (content rendered client-side from JSON, or a
+    'Cliente' pane loaded later): the caller then reads the page with the DOM
+    extractors. Credit or amortization alone is not enough, and neither are the
+    hidden `id_cliente`/`codigo_venta` inputs.
+    """
+    parts = [capture.body(r) for r in responses if r.is_html and r.status < 400]
+    html = "\n".join(p for p in parts if p)
+    if not html:
+        return None
+    credit, amort, client = parse_detail_page(html)
+    if not any(v for k, v in client.items() if k not in ('id_cliente', 'codigo_venta')):
+        return None
+    return credit, amort, client, html
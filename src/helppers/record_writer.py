@@ -0,0 +1,121 @@
+from __future__ import annotations
+import json
+import os
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+_STOP = object()
+
+
+class RecordWriter:
+    """Background writer for `extract_all_rows_info`.
+
+    The scraping loop hands over every persistence step (journal append,
+    fingerprint, cursor mark, snapshot compression, skipped-row diagnostics) and
+    goes back to the browser; one thread runs them in submission order, so the
+    cursor never gets ahead of the journal. The queue holds at most `maxsize`
+    pending steps: if the writer falls behind, `submit` blocks (backpressure)
+    instead of buffering records without bound.
+
+    `close()` drains the queue, writes the diagnostics file and joins the thread;
+    the stores are still owned (and closed/compacted) by the caller.
+    """
+
+    def __init__(self, store=None, cursor=None, fingerprints=None, archive=None, debug_path: Optional[str] = None, maxsize: int = 64):
+        self.store = store
+        self.cursor = cursor
+        self.fingerprints = fingerprints
+        self.archive = archive
+        self.debug_path = debug_path
+        self.skipped: List[Dict[str, Any]] = []
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, int(maxsize)))
+        self._thread = threading.Thread(target=self._run, name="record-writer", daemon=True)
+        self._closed = False
+        self._thread.start()
+
+    # -- producer side ---------------------------------------------------
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """Queue `fn(*args, **kwargs)`; blocks while the queue is full."""
+        if self._closed:
+            raise RuntimeError("RecordWriter is closed")
+        self._queue.put((fn, args, kwargs))
+
+    def write_record(self, item: Any, pos: Tuple[int, int], code: str = "", fp: str = "", snapshot: Optional[Tuple[str, Dict[str, Any]]] = None, fp_code: Optional[str] = None, advance_cursor: bool = True) -> None:
+        """Persist one extracted record: journal line, fingerprint, cursor mark and snapshot.
+
+        `fp_code` is the code the fingerprint is stored under (default: `code`);
+        `snapshot` is `(html, put_kwargs)` for `SnapshotArchive.put`. With
+        `advance_cursor=False` (records extracted out of listing order) the cursor
+        only records the code as completed.
+        """
+        self.submit(self._write_record, item, pos, code, fp, snapshot, code if fp_code is None else fp_code, advance_cursor)
+
+    def mark_row(self, page_index: int, row_index: int, code: str = "") -> None:
+        if self.cursor is not None:
+            self.submit(self.cursor.mark_row, page_index, row_index, code)
+
+    def enter_page(self, page_index: int) -> None:
+        if self.cursor is not None:
+            self.submit(self.cursor.enter_page, page_index)
+
+    def skip(self, diagnostic: Dict[str, Any]) -> None:
+        """Record a skipped row for `skip_rows_debug.json`."""
+        self.submit(self.skipped.append, diagnostic)
+
+    def close(self) -> None:
+        """Drain pending steps, write the diagnostics file and stop the thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    # -- writer thread ---------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            task = self._queue.get()
+            if task is _STOP:
+                break
+            fn, args, kwargs = task
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                print(f"Warning: background write failed ({getattr(fn, '__name__', fn)}):", e)
+        self._write_diagnostics()
+
+    def _write_record(self, item: Any, pos: Tuple[int, int], code: str, fp: str, snapshot: Optional[Tuple[str, Dict[str, Any]]], fp_code: str, advance_cursor: bool) -> None:
+        if self.store is not None:
+            try:
+                self.store.append(item, pos=pos)
+            except Exception as e:
+                print('Warning: could not write rows_info file:', e)
+        if self.fingerprints is not None:
+            self.fingerprints.record(fp_code, fp)
+        if self.cursor is not None:
+            if advance_cursor:
+                self.cursor.mark_row(pos[0], pos[1], code)
+            else:
+                self.cursor.mark_code(code)
+        if self.archive is not None and snapshot:
+            html, put_kwargs = snapshot
+            try:
+                self.archive.put(code, html, pos=pos, **put_kwargs)
+            except Exception as e:
+                print(f'Warning: could not archive snapshot of row {pos[1]}:', e)
+
+    def _write_diagnostics(self) -> None:
+        if not self.debug_path:
+            return
+        try:
+            dirname = os.path.dirname(self.debug_path)
+            if dirname and not os.path.exists(dirname):
+                os.makedirs(dirname, exist_ok=True)
+            with open(self.debug_path, 'w', encoding='utf-8') as fh:
+                json.dump(self.skipped, fh, ensure_ascii=False, indent=2)
+            print(f"Wrote {os.path.basename(self.debug_path)} with {len(self.skipped)} records for diagnosis")
+        except Exception as e:
+            print(f'Warning: could not write {os.path.basename(self.debug_path)}:', e)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+import time
+from typing import Dict, Optional
+
+
+class RowBudget:
+    """Time budget for one listing row, shared with every wait through the driver.
+
+    While active, `driver._mig_row_deadline` holds the deadline: `waits.wait_for`
+    clips its timeout to what is left (and returns False at once when nothing is
+    left), so once a row is over budget the retry loops of the extractors fall
+    through immediately instead of stacking their own timeouts. The caller checks
+    `expired()` at its checkpoints to abort the row. `mark(phase)` records how long
+    each phase took for the diagnostics.
+
+    The budget is cooperative: nothing interrupts a command that is already blocked
+    inside the driver (a page load, a script). `clip_driver_timeouts` narrows the
+    gap by capping the driver's page-load and script timeouts at the time left when
+    a phase starts, so such a command fails instead of running on. A row can still
+    overrun its budget by what one command started just before the deadline takes,
+    at most the time left at the last clip.
+    """
+
+    def __init__(self, driver, seconds: Optional[float]):
+        self.driver = driver
+        self.seconds = seconds
+        self.start = time.monotonic()
+        self.deadline = None if not seconds else self.start + seconds
+        self.timings: Dict[str, float] = {}
+        self._last = self.start
+        self._ended: Optional[float] = None
+        self._restore: Optional[float] = None
+
+    def begin(self) -> "RowBudget":
+        """Start (or restart) the clock and publish the deadline on the driver."""
+        self.start = self._last = time.monotonic()
+        self.deadline = None if not self.seconds else self.start + self.seconds
+        self._ended = None
+        _set_deadline(self.driver, self.deadline)
+        return self
+
+    def end(self) -> None:
+        """Stop the clock, stop clipping the driver's waits and restore its timeouts."""
+        if self._ended is None:
+            self._ended = time.monotonic()
+        _set_deadline(self.driver, None)
+        if self._restore is not None:
+            _set_driver_timeouts(self.driver, self._restore)
+            self._restore = None
+
+    def clip_driver_timeouts(self, limit: float) -> None:
+        """Cap the driver's page-load and script timeouts at the time left (and at `limit`).
+
+        Call it before each phase that can block inside the driver; `end()` sets
+        both timeouts back to `limit`. No-op without a budget.
+        """
+        left = self.remaining()
+        if left is None:
+            return
+        _set_driver_timeouts(self.driver, min(limit, left))
+        self._restore = limit
+
+    def __enter__(self) -> "RowBudget":
+        return self.begin()
+
+    def __exit__(self, *exc) -> None:
+        self.end()
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - self._now())
+
+    def _now(self) -> float:
+        return self._ended if self._ended is not None else time.monotonic()
+
+    def expired(self) -> bool:
+        return self.deadline is not None and self._now() >= self.deadline
+
+    def mark(self, phase: str) -> None:
+        """Record the seconds spent since the previous mark under `phase`."""
+        now = time.monotonic()
+        self.timings[phase] = round(now - self._last, 3)
+        self._last = now
+
+    def elapsed(self) -> float:
+        return round(self._now() - self.start, 3)
+
+
+def _set_deadline(driver, deadline: Optional[float]) -> None:
+    try:
+        driver._mig_row_deadline = deadline
+    except Exception:
+        pass
+
+
+def _set_driver_timeouts(driver, seconds: float) -> None:
+    # WebDriver rechaza 0: al menos 1 s (como `_set_page_load_timeout`)
+    seconds = max(1.0, seconds)
+    try:
+        driver.set_page_load_timeout(seconds)
+        driver.set_script_timeout(seconds)
+        # límite actual para `waits._ensure_script_timeout`
+        driver._mig_script_timeout = seconds
+    except Exception as e:
+        print("Warning: could not set driver timeouts:", e)
+
+
+def clip_to_row_budget(driver, timeout: float) -> float:
+    """`timeout` clipped to the time left in the driver's active row budget (0 if exhausted)."""
+    deadline = getattr(driver, "_mig_row_deadline", None)
+    if deadline is None:
+        return timeout
+    return max(0.0, min(timeout, deadline - time.monotonic()))
@@ -0,0 +1,373 @@
+from __future__ import annotations
+import json
+import os
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+
+# journal-only key holding the (page, row) position of a record
+POS_KEY = "_pos"
+
+
+def _journal_path_for(out_path: str) -> str:
+    """Return the JSONL journal path that backs `out_path` (rows_info.json -> rows_info.jsonl)."""
+    root, ext = os.path.splitext(out_path)
+    if ext.lower() == ".json":
+        return root + ".jsonl"
+    return out_path + ".jsonl"
+
+
+def normalize_record(item: Any) -> Any:
+    """Normalize a stored item to the `{'row': {...}, 'cliente': {...}}` schema.
+
+    - Items already in the new schema are returned unchanged.
+    - Dicts that look like a bare client (have `name`, `id_cliente` or
+      `codigo_venta`) are wrapped as `{'row': {}, 'cliente': item, 'info_credito': {}}`.
+    - Anything else is returned as-is.
+    """
+    if isinstance(item, dict):
+        if 'row' in item and 'cliente' in item:
+            return item
+        if 'name' in item or 'id_cliente' in item or 'codigo_venta' in item:
+            return {'row': {}, 'cliente': item, 'info_credito': {}}
+    return item
+
+
+def record_code(item: Any) -> str:
+    """`codigo_venta` of a normalized record ('' if it has none)."""
+    if isinstance(item, dict) and isinstance(item.get('cliente'), dict):
+        return item['cliente'].get('codigo_venta') or item['cliente'].get('codigo') or ''
+    return ''
+
+
+def iter_json_array(fh, chunk_size: int = 65536) -> Iterator[Any]:
+    """Stream the items of a top-level JSON array from an open text file.
+
+    Reads the file in chunks and decodes one item at a time with
+    `JSONDecoder.raw_decode`, so memory stays proportional to the largest item
+    instead of the whole document. Stops silently on malformed/truncated input.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    started = False
+
+    def _fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = fh.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    while True:
+        # skip whitespace and separators
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf) or not _fill():
+                break
+        if pos >= len(buf):
+            return
+        ch = buf[pos]
+        if not started:
+            if ch != "[":
+                return
+            started = True
+            pos += 1
+            continue
+        if ch == "]":
+            return
+        if ch == ",":
+            pos += 1
+            continue
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except ValueError:
+            # item may be split across chunks: read more and retry
+            if _fill():
+                continue
+            return
+        if end >= len(buf) and not eof:
+            # a number at the end of the buffer could continue in the next chunk
+            if _fill():
+                continue
+        pos = end
+        yield item
+
+
+class RowsStore:
+    """Append-only record store for `extract_all_rows_info`.
+
+    Every record is appended as one compact JSON line to a journal next to
+    `out_path` (e.g. `output/rows_info.jsonl`); the journal is fsync'ed every
+    `fsync_every` records and on `close()`. `compact()` rewrites the legacy
+    JSON array (`output/rows_info.json`) atomically from the journal, so
+    consumers such as `extract_clients.py` and `add_special_quote.py` keep
+    reading the same file.
+
+    If only the legacy array exists (runs made before the journal), it is
+    streamed into a new journal the first time the store is opened.
+    """
+
+    def __init__(self, out_path: str, fsync_every: int = 25):
+        self.out_path = out_path
+        self.journal_path = _journal_path_for(out_path)
+        self.fsync_every = max(1, int(fsync_every))
+        self._fh = None
+        self._pending = 0
+
+    # -- reading ---------------------------------------------------------
+    def iter_records(self, with_pos: bool = False) -> Iterator[Any]:
+        """Yield the stored records (normalized) without loading the whole file at once.
+
+        With `with_pos=True` yields `(pos, record)` tuples, where `pos` is the
+        `(page, row)` given to `append` or None.
+        """
+        if os.path.exists(self.journal_path):
+            for pos, item in self._iter_journal():
+                yield (pos, item) if with_pos else item
+            return
+        if os.path.exists(self.out_path):
+            try:
+                with open(self.out_path, "r", encoding="utf-8") as fh:
+                    for item in iter_json_array(fh):
+                        item = normalize_record(item)
+                        yield (None, item) if with_pos else item
+            except Exception:
+                # ignorar errores de carga
+                return
+
+    def _iter_journal(self) -> Iterator[Tuple[Optional[Tuple[int, int]], Any]]:
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        item = json.loads(line)
+                    except ValueError:
+                        # partial line left by an interrupted write
+                        continue
+                    pos = None
+                    if isinstance(item, dict) and POS_KEY in item:
+                        raw = item.pop(POS_KEY)
+                        try:
+                            pos = (int(raw[0]), int(raw[1]))
+                        except Exception:
+                            pos = None
+                    yield pos, normalize_record(item)
+        except Exception:
+            return
+
+    # -- writing ---------------------------------------------------------
+    def open(self) -> "RowsStore":
+        """Open the journal for appending, migrating a legacy array if needed."""
+        if self._fh is not None:
+            return self
+        dirname = os.path.dirname(self.journal_path)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname, exist_ok=True)
+
+        if not os.path.exists(self.journal_path) and os.path.exists(self.out_path):
+            # seed the journal from the legacy array so it holds every record
+            tmp = self.journal_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as out:
+                for item in self.iter_records():
+                    out.write(self._dumps(item) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp, self.journal_path)
+
+        needs_newline = False
+        try:
+            if os.path.getsize(self.journal_path) > 0:
+                with open(self.journal_path, "rb") as fh:
+                    fh.seek(-1, os.SEEK_END)
+                    needs_newline = fh.read(1) != b"\n"
+        except OSError:
+            needs_newline = False
+
+        self._fh = open(self.journal_path, "a", encoding="utf-8")
+        if needs_newline:
+            # terminate a truncated last line so the next record starts clean
+            self._fh.write("\n")
+        return self
+
+    @staticmethod
+    def _dumps(record: Any) -> str:
+        return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+    def append(self, record: Any, pos: Optional[Tuple[int, int]] = None) -> None:
+        """Append one record as a compact JSON line (fsync every `fsync_every` records).
+
+        `pos` is the optional `(page, row)` of the record in the source listing; it
+        is kept in the journal only (used to merge shards in listing order).
+        """
+        if self._fh is None:
+            self.open()
+        line = record
+        if pos is not None and isinstance(record, dict):
+            line = {POS_KEY: [pos[0], pos[1]], **record}
+        self._fh.write(self._dumps(line) + "\n")
+        self._fh.flush()
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            self.sync()
+
+    def sync(self) -> None:
+        """Flush and fsync the journal."""
+        if self._fh is None:
+            return
+        try:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+        except OSError:
+            pass
+        self._pending = 0
+
+    def close(self) -> None:
+        if self._fh is None:
+            return
+        self.sync()
+        try:
+            self._fh.close()
+        finally:
+            self._fh = None
+
+    def rewrite(self, records: Iterable[Any]) -> int:
+        """Atomically replace the journal with `records` and compact it; returns the count."""
+        self.close()
+        dirname = os.path.dirname(self.journal_path)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname, exist_ok=True)
+        tmp = self.journal_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as out:
+            for item in records:
+                out.write(self._dumps(item) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, self.journal_path)
+        return self.compact()
+
+    def collapse(self, codes: Set[str]) -> int:
+        """Keep a single record for each `codigo_venta` in `codes`.
+
+        The newest record of each code replaces the oldest one in place (so the
+        listing order is kept) and the later duplicates are dropped; positions
+        stay in the journal. Returns the number of records dropped.
+        """
+        if not codes or not os.path.exists(self.journal_path):
+            return 0
+        self.close()
+        newest: Dict[str, Tuple[Optional[Tuple[int, int]], Any]] = {}
+        for pos, item in self._iter_journal():
+            code = record_code(item)
+            if code in codes:
+                newest[code] = (pos, item)
+        dropped = 0
+        written: Set[str] = set()
+        tmp = self.journal_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as out:
+            for pos, item in self._iter_journal():
+                code = record_code(item)
+                if code in newest:
+                    if code in written:
+                        dropped += 1
+                        continue
+                    written.add(code)
+                    pos, item = newest[code]
+                line = {POS_KEY: [pos[0], pos[1]], **item} if pos is not None and isinstance(item, dict) else item
+                out.write(self._dumps(line) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, self.journal_path)
+        return dropped
+
+    def merge(self, records: Iterable[Any]) -> int:
+        """Fold `records` (e.g. the partitions of a sharded run) into the store and compact it.
+
+        Records already stored are kept, one per `codigo_venta`: the newest record of a
+        code (a merged one over a stored one, a later one over an earlier one) takes the
+        place of the first; merged records with new codes are appended in the given
+        order. Records without a code are kept unless identical to an earlier one.
+        Returns the number of records in the store.
+        """
+        self.close()
+
+        def _key(item: Any) -> str:
+            return record_code(item) or self._dumps(item)
+
+        existing = list(self.iter_records(with_pos=True))
+        newest: Dict[str, Tuple[Optional[Tuple[int, int]], Any]] = {}
+        for pos, item in existing:
+            newest[_key(item)] = (pos, item)
+        incoming: Dict[str, Any] = {}
+        for item in records:
+            incoming[_key(item)] = item
+        dirname = os.path.dirname(self.journal_path)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname, exist_ok=True)
+        tmp = self.journal_path + ".tmp"
+        written: Set[str] = set()
+        with open(tmp, "w", encoding="utf-8") as out:
+            for _, item in existing:
+                key = _key(item)
+                if key in written:
+                    continue
+                written.add(key)
+                pos, item = (None, incoming[key]) if key in incoming else newest[key]
+                line = {POS_KEY: [pos[0], pos[1]], **item} if pos is not None and isinstance(item, dict) else item
+                out.write(self._dumps(line) + "\n")
+            for key, item in incoming.items():
+                if key not in written:
+                    written.add(key)
+                    out.write(self._dumps(item) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp, self.journal_path)
+        return self.compact()
+
+    def compact(self) -> int:
+        """Atomically rewrite `out_path` as the legacy indented JSON array.
+
+        Returns the number of records written. The output is byte-compatible
+        with the previous `json.dump(rows_info, fh, ensure_ascii=False, indent=2)`.
+        """
+        self.sync()
+        dirname = os.path.dirname(self.out_path) or "."
+        if not os.path.exists(dirname):
+            os.makedirs(dirname, exist_ok=True)
+
+        count = 0
+        fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(self.out_path)}.", suffix=".tmp", dir=dirname)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as out:
+                for item in self.iter_records():
+                    body = json.dumps(item, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+                    out.write(("[\n  " if count == 0 else ",\n  ") + body)
+                    count += 1
+                out.write("\n]" if count else "[]")
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp, self.out_path)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        return count
+
+    def __enter__(self) -> "RowsStore":
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
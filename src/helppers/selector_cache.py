@@ -0,0 +1,143 @@
+from __future__ import annotations
+import atexit
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# estadísticas persistidas entre ejecuciones
+DEFAULT_STATS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "output", "selector_stats.json"))
+
+
+class SelectorCache:
+    """Remembers which candidate of each selector fallback chain matched.
+
+    A chain is an ordered list of candidate selectors for one thing (a label, the
+    'Cliente' tab, the login user field...), identified by a `chain` key. Every
+    successful lookup counts a hit for the candidate that matched and a miss for each
+    candidate tried before it. Candidates are keyed by their text, so editing a chain
+    simply starts the new candidates with no stats.
+
+    By default the declared order is a precedence (a broader candidate, e.g. a
+    `contains()` match, must not win over an exact one), so it is kept: the only
+    change is that candidates known to be dead (`dead_after` misses and never a hit)
+    are tried last instead of first. Dead is not forever: every `reprobe_every`
+    lookups of a chain (counted per process) the plain declared order is tried, so a
+    candidate that matches again (the ERP changed back, a rare page variant) gets
+    its place back with its first hit. Chains whose candidates are interchangeable
+    (any match is equally good, e.g. the buttons that close a modal) are looked up
+    with `interchangeable=True` and tried by hit count (ties keep the original
+    order), so with a steady DOM the first try succeeds.
+
+    Stats (`{chain: {"hits": {candidate: n}, "candidate_misses": {candidate: n},
+    "misses": n}}`) are saved as JSON to `path` by `save()`, every `save_every`
+    updates and at interpreter exit.
+    """
+
+    def __init__(self, path: Optional[str] = None, save_every: int = 200, dead_after: int = 50, reprobe_every: int = 100):
+        self.path = path
+        self.dead_after = max(1, int(dead_after))
+        self.reprobe_every = max(1, int(reprobe_every))
+        self.save_every = max(1, int(save_every))
+        self.stats: Dict[str, Dict[str, object]] = {}
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self._lookups: Dict[str, int] = {}
+
+    def load(self) -> "SelectorCache":
+        if not self.path:
+            return self
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            if isinstance(data, dict):
+                self.stats = {k: v for k, v in data.items() if isinstance(v, dict)}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print("Warning: could not read selector stats:", e)
+        return self
+
+    def ordered(self, chain: str, candidates: Sequence[str], interchangeable: bool = False) -> List[str]:
+        """`candidates` in the order to try them for `chain` (each call counts as a lookup)."""
+        with self._lock:
+            lookups = self._lookups[chain] = self._lookups.get(chain, 0) + 1
+            entry = self.stats.get(chain) or {}
+            hits = dict(entry.get("hits") or {})
+            misses = dict(entry.get("candidate_misses") or {})
+        pos = {c: i for i, c in enumerate(candidates)}
+        if interchangeable:
+            return sorted(candidates, key=lambda c: (-int(hits.get(c, 0)), pos[c]))
+        if lookups % self.reprobe_every == 0:
+            # re-sondeo periódico: orden declarado completo, muertos incluidos
+            return list(candidates)
+        # precedencia declarada; solo los candidatos muertos pasan al final
+        dead = {c for c in candidates if not hits.get(c) and int(misses.get(c, 0)) >= self.dead_after}
+        return [c for c in candidates if c not in dead] + [c for c in candidates if c in dead]
+
+    def first_match(self, chain: str, candidates: Sequence[str], find: Callable[[str], Optional[T]], interchangeable: bool = False) -> Optional[T]:
+        """Return the first truthy `find(candidate)` (exceptions count as no match), learning the winner."""
+        tried: List[str] = []
+        for cand in self.ordered(chain, candidates, interchangeable):
+            try:
+                res = find(cand)
+            except Exception:
+                res = None
+            if res:
+                self._record(chain, cand, tried)
+                return res
+            tried.append(cand)
+        self._record(chain, None, tried)
+        return None
+
+    def _record(self, chain: str, cand: Optional[str], tried: Sequence[str] = ()) -> None:
+        with self._lock:
+            entry = self.stats.setdefault(chain, {})
+            missed = entry.setdefault("candidate_misses", {})
+            for c in tried:
+                missed[c] = int(missed.get(c, 0)) + 1
+            if cand is None:
+                entry["misses"] = int(entry.get("misses") or 0) + 1
+            else:
+                hits = entry.setdefault("hits", {})
+                hits[cand] = int(hits.get(cand, 0)) + 1
+            self._dirty += 1
+            due = self._dirty >= self.save_every
+        if due:
+            self.save()
+
+    def save(self) -> None:
+        """Atomically write the stats to `path` (no-op without a path or changes)."""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self.stats, ensure_ascii=False, indent=1, sort_keys=True)
+            self._dirty = 0
+        try:
+            dirname = os.path.dirname(self.path)
+            if dirname and not os.path.exists(dirname):
+                os.makedirs(dirname, exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                fh.write(data)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print("Warning: could not write selector stats:", e)
+
+
+_default: Optional[SelectorCache] = None
+_default_lock = threading.Lock()
+
+
+def selector_cache() -> SelectorCache:
+    """Process-wide cache backed by `output/selector_stats.json` (saved at exit)."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = SelectorCache(DEFAULT_STATS_PATH).load()
+            atexit.register(_default.save)
+        return _default
@@ -0,0 +1,205 @@
+from __future__ import annotations
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:  # zstd es opcional: si no está instalado se usa gzip
+    import zstandard as _zstd
+except ImportError:
+    _zstd = None
+
+
+CODECS = ("gzip", "zstd")
+_EXT = {"gzip": ".html.gz", "zstd": ".html.zst"}
+
+# subárboles que no usan los extractores (no renderizados o binarios)
+_NOISE_TAGS = ("script", "style", "noscript", "svg", "iframe", "template")
+_NOISE_RE = re.compile(
+    r"<(%s)\b[^>]*>.*?</\1\s*>" % "|".join(_NOISE_TAGS), re.I | re.S
+)
+_NOISE_VOID_RE = re.compile(r"<(?:link|meta)\b[^>]*>", re.I)
+
+# mismo recorte en el navegador, sobre un clon del documento; copia el estado
+# actual de los inputs (propiedad `value`) al atributo para que quede en el HTML
+_JS_SNAPSHOT = r"""
+var src = document.documentElement;
+var clone = src.cloneNode(true);
+var live = src.querySelectorAll('input, textarea, select');
+var copy = clone.querySelectorAll('input, textarea, select');
+for (var i = 0; i < live.length && i < copy.length; i++) {
+  try {
+    if (live[i].tagName === 'SELECT') continue;
+    if (live[i].value != null) copy[i].setAttribute('value', live[i].value);
+  } catch (e) {}
+}
+clone.querySelectorAll('%s, link, meta').forEach(function (n) { n.remove(); });
+return '<!DOCTYPE html>' + clone.outerHTML;
+""" % ", ".join(_NOISE_TAGS)
+
+
+def strip_snapshot_html(html: str) -> str:
+    """Drop scripts, styles and other subtrees the extractors never read."""
+    html = _NOISE_RE.sub("", html or "")
+    return _NOISE_VOID_RE.sub("", html)
+
+
+def page_snapshot(driver) -> str:
+    """Return the relevant DOM of the page open in `driver` (live input values included)."""
+    try:
+        html = driver.execute_script(_JS_SNAPSHOT) or ""
+    except Exception:
+        html = ""
+    if not html:
+        try:
+            html = driver.page_source or ""
+        except Exception:
+            html = ""
+    return strip_snapshot_html(html)
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return _zstd.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if _zstd is None:
+            raise RuntimeError("snapshot is zstd-compressed but the 'zstandard' package is not installed")
+        return _zstd.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class SnapshotArchive:
+    """Content-addressed archive of detail-page snapshots.
+
+    Layout under `root`:
+      - `objects/<sha[:2]>/<sha>.html.gz|.html.zst`: compressed snapshot, keyed by
+        the SHA-256 of its UTF-8 content (identical pages are stored once)
+      - `index.jsonl`: one line per stored snapshot with `codigo_venta`, `sha256`,
+        `codec`, `size`, `url`, `row` (listing columns), `pos` and `ts`; the last
+        line of a `codigo_venta` is its current snapshot
+
+    `put` is thread-safe, so one archive can be shared by the sharded workers.
+    """
+
+    def __init__(self, root: str, codec: str = "gzip"):
+        if codec not in CODECS:
+            raise ValueError(f"unknown snapshot codec {codec!r} (expected one of {CODECS})")
+        if codec == "zstd" and _zstd is None:
+            print("Warning: 'zstandard' is not installed; archiving snapshots with gzip")
+            codec = "gzip"
+        self.root = root
+        self.codec = codec
+        self.index_path = os.path.join(root, "index.jsonl")
+        self._index_fh = None
+        self._latest_sha: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    # -- index -------------------------------------------------------------
+    def iter_index(self) -> Iterator[Dict[str, Any]]:
+        """Yield every index entry in write order (a truncated last line is ignored)."""
+        try:
+            fh = open(self.index_path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def latest(self) -> Dict[str, Dict[str, Any]]:
+        """Return the current entry of each `codigo_venta` (in first-seen order)."""
+        out: Dict[str, Dict[str, Any]] = {}
+        for entry in self.iter_index():
+            code = entry.get("codigo_venta") or ""
+            if code:
+                out[code] = entry
+        return out
+
+    def open(self) -> "SnapshotArchive":
+        os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+        self._latest_sha = {code: e.get("sha256", "") for code, e in self.latest().items()}
+        self._index_fh = open(self.index_path, "a", encoding="utf-8")
+        return self
+
+    def close(self) -> None:
+        if self._index_fh is not None:
+            try:
+                self._index_fh.flush()
+                os.fsync(self._index_fh.fileno())
+            except Exception:
+                pass
+            self._index_fh.close()
+            self._index_fh = None
+
+    def __enter__(self) -> "SnapshotArchive":
+        return self.open()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- objects -----------------------------------------------------------
+    def _object_path(self, sha: str, codec: str) -> str:
+        return os.path.join(self.root, "objects", sha[:2], sha + _EXT[codec])
+
+    def put(self, codigo_venta: str, html: str, url: str = "", row: Optional[Dict[str, Any]] = None, pos: Optional[Tuple[int, int]] = None) -> str:
+        """Store the snapshot of `codigo_venta` and return its content hash.
+
+        The object is written atomically and only once per hash; the index gets a
+        new line only when the content of `codigo_venta` changed.
+        """
+        data = (html or "").encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        path = self._object_path(sha, self.codec)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(_compress(data, self.codec))
+                os.replace(tmp, path)
+            except Exception:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+        entry = {
+            "codigo_venta": codigo_venta or "",
+            "sha256": sha,
+            "codec": self.codec,
+            "size": len(data),
+            "url": url or "",
+            "row": row or {},
+            "pos": list(pos) if pos is not None else None,
+            "ts": int(time.time()),
+        }
+        with self._lock:
+            if codigo_venta and self._latest_sha.get(codigo_venta) == sha:
+                return sha
+            if self._index_fh is None:
+                self.open()
+            self._index_fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._index_fh.flush()
+            if codigo_venta:
+                self._latest_sha[codigo_venta] = sha
+        return sha
+
+    def read(self, entry: Dict[str, Any]) -> str:
+        """Return the decompressed HTML of an index entry."""
+        codec = entry.get("codec") or "gzip"
+        with open(self._object_path(entry["sha256"], codec), "rb") as fh:
+            return _decompress(fh.read(), codec).decode("utf-8")
@@ -0,0 +1,204 @@
+from __future__ import annotations
+import time
+from typing import Any, List, Optional
+
+from helppers.row_budget import clip_to_row_budget
+
+
+# Espera dirigida por eventos: un solo `execute_async_script` que evalúa la
+# condición al instante y luego en cada lote de mutaciones del DOM (MutationObserver)
+# y en cada cambio de `readyState`. Resuelve en cuanto se cumple (tras `settle` ms sin
+# mutaciones si se pide) o con el resultado final al agotar el timeout.
+_JS_WAIT = r"""
+var done = arguments[arguments.length - 1];
+var arg = arguments[0], timeoutMs = arguments[1], settleMs = arguments[2];
+var cond = %s;
+var state = {mutations: 0};
+var obs = null, timer = null, settleTimer = null, finished = false;
+function test() { try { return !!cond(arg, state); } catch (e) { return false; } }
+function finish(ok) {
+  if (finished) return;
+  finished = true;
+  if (obs) obs.disconnect();
+  clearTimeout(timer);
+  clearTimeout(settleTimer);
+  document.removeEventListener('readystatechange', check);
+  done(ok);
+}
+function check() {
+  if (finished) return;
+  if (!test()) { clearTimeout(settleTimer); settleTimer = null; return; }
+  if (settleMs <= 0) { finish(true); return; }
+  clearTimeout(settleTimer);
+  settleTimer = setTimeout(function () { if (test()) finish(true); }, settleMs);
+}
+obs = new MutationObserver(function (records) { state.mutations += records.length; check(); });
+obs.observe(document.documentElement || document, {subtree: true, childList: true, attributes: true, characterData: true});
+document.addEventListener('readystatechange', check);
+timer = setTimeout(function () { finish(test()); }, timeoutMs);
+check();
+"""
+
+# helpers compartidos por las condiciones (mismas reglas que `_get_active_page_number`
+# y `//table//tr[td]`)
+_JS_FUNCS = r"""
+function migActivePage() {
+  var a = document.querySelector("li.page-item.active a.Pagina, li.page-item.active a.page-link");
+  if (!a) return null;
+  var n = parseInt(((a.getAttribute('data-valor') || a.textContent) || '').trim(), 10);
+  return isNaN(n) ? null : n;
+}
+function migListingRows() {
+  return Array.from(document.querySelectorAll('table tr')).filter(function (tr) {
+    return Array.prototype.some.call(tr.children, function (c) { return c.tagName === 'TD'; });
+  });
+}
+function migListingSig() {
+  var rows = migListingRows();
+  if (!rows.length) return '';
+  var first = (rows[0].textContent || '').slice(0, 300);
+  var last = (rows[rows.length - 1].textContent || '').slice(0, 300);
+  return rows.length + '|' + first + '|' + last;
+}
+"""
+
+
+def _cond(body: str) -> str:
+    """Wrap a JS condition body (may use `arg`, `state` and the `mig*` helpers) as a function."""
+    return "(function () {" + _JS_FUNCS + "return function (arg, state) {" + body + "}; })()"
+
+
+DOCUMENT_READY = _cond("return document.readyState === 'complete';")
+LISTING_READY = _cond(
+    "var sig = migListingSig();"
+    "return sig !== '' && (!arg || !arg.sig || sig !== arg.sig);"
+)
+PAGE_CHANGED = _cond(
+    "var p = migActivePage();"
+    "if (p === null || p === arg.prev) return false;"
+    "var sig = migListingSig();"
+    "return sig !== '' && (!arg.sig || sig !== arg.sig);"
+)
+DETAIL_READY = _cond(
+    "if (document.readyState === 'loading' || !document.body) return false;"
+    "var t = document.body.textContent || '';"
+    "return t.indexOf('Información del Crédito') !== -1 || t.indexOf('Tabla de Amortización') !== -1;"
+)
+CLIENT_PANE_READY = _cond(
+    "return Array.prototype.some.call(document.querySelectorAll('label'), function (l) {"
+    "  return l.offsetParent !== null && /nombre/i.test(l.textContent || '');"
+    "});"
+)
+DOM_CHANGED = _cond("return state.mutations > 0;")
+
+
+def wait_for(driver, condition: str, timeout: float, arg: Any = None, settle: float = 0.0) -> bool:
+    """Wait until the JS `condition` holds in the current document, at most `timeout` seconds.
+
+    Returns as soon as the condition becomes true (after `settle` seconds without DOM
+    mutations, if given). If the document is replaced while waiting (navigation), the
+    probe is injected again in the new one. Returns False on timeout. The timeout is
+    clipped to the active row budget, if any (see `RowBudget`).
+    """
+    deadline = time.monotonic() + max(0.0, clip_to_row_budget(driver, timeout))
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        try:
+            _ensure_script_timeout(driver, remaining + settle + 2)
+            return bool(driver.execute_async_script(
+                _JS_WAIT % condition, arg, int(remaining * 1000), int(settle * 1000)
+            ))
+        except Exception:
+            # documento descargado a mitad de la espera (navegación) o alerta: reintentar
+            time.sleep(0.05)
+
+
+def _ensure_script_timeout(driver, seconds: float) -> None:
+    # un solo comando por driver salvo que haga falta un límite mayor; dentro del
+    # presupuesto de una fila solo lo justo, para no deshacer `RowBudget.clip_driver_timeouts`
+    current = getattr(driver, "_mig_script_timeout", 0)
+    if seconds <= current:
+        return
+    target = seconds if getattr(driver, "_mig_row_deadline", None) is not None else max(seconds, 30)
+    driver.set_script_timeout(target)
+    try:
+        driver._mig_script_timeout = target
+    except Exception:
+        pass
+
+
+def wait_document_ready(driver, timeout: float) -> bool:
+    return wait_for(driver, DOCUMENT_READY, timeout)
+
+
+def listing_signature(driver) -> str:
+    """Cheap fingerprint of the listing rows (count + first/last row text)."""
+    try:
+        return driver.execute_script("return (function () {" + _JS_FUNCS + "return migListingSig(); })();") or ""
+    except Exception:
+        return ""
+
+
+def wait_listing_ready(driver, timeout: float, prev_signature: str = "", settle: float = 0.1) -> bool:
+    """Wait until the listing has data rows (different from `prev_signature`, if given)."""
+    return wait_for(driver, LISTING_READY, timeout, arg={"sig": prev_signature}, settle=settle)
+
+
+def wait_page_change(driver, prev_page: Optional[int], timeout: float, prev_signature: str = "", settle: float = 0.1) -> bool:
+    """Wait until the active page number differs from `prev_page` and the rows were re-rendered."""
+    return wait_for(driver, PAGE_CHANGED, timeout, arg={"prev": prev_page, "sig": prev_signature}, settle=settle)
+
+
+def wait_detail_ready(driver, timeout: float, marker_grace: float = 2.0) -> bool:
+    """Wait for a detail page: document loaded, then the credit/amortization card.
+
+    Pages without those cards give up on the card after `marker_grace` seconds.
+    """
+    start = time.monotonic()
+    if wait_for(driver, DETAIL_READY, min(timeout, marker_grace)):
+        return True
+    if not wait_document_ready(driver, timeout - (time.monotonic() - start)):
+        return False
+    return wait_for(driver, DETAIL_READY, min(marker_grace, max(0.0, timeout - (time.monotonic() - start))))
+
+
+def wait_client_pane(driver, timeout: float) -> bool:
+    """Wait until the 'Cliente' tab content (a visible 'Nombre' label) is shown."""
+    return wait_for(driver, CLIENT_PANE_READY, timeout)
+
+
+def wait_dom_change(driver, timeout: float) -> bool:
+    """Wait for the next DOM mutation (e.g. after closing a modal), at most `timeout` seconds."""
+    return wait_for(driver, DOM_CHANGED, timeout)
+
+
+def wait_new_window(driver, prev_handles: List[str], timeout: float, poll: float = 0.05) -> List[str]:
+    """Return the window handles as soon as a new one appears (or when `timeout` expires).
+
+    Window creation is not visible from the page, so this one polls `window_handles`;
+    it also returns early once the current document starts unloading or shows a
+    detail card (same-tab navigation).
+    """
+    deadline = time.monotonic() + clip_to_row_budget(driver, timeout)
+    start_url = ""
+    try:
+        start_url = driver.current_url
+    except Exception:
+        pass
+    while True:
+        try:
+            handles = driver.window_handles
+        except Exception:
+            handles = list(prev_handles)
+        if len(handles) > len(prev_handles) or time.monotonic() >= deadline:
+            return handles
+        try:
+            if driver.current_url != start_url or driver.execute_script(
+                "return document.readyState !== 'complete' || !!document.querySelector('.modal.show, .modal.in');"
+            ):
+                return handles
+        except Exception:
+            return handles
+        time.sleep(poll)
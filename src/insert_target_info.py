@@ -4,46 +4,72 @@ import time
 from dotenv import load_dotenv
 import json
 
+from helppers.memory_watchdog import MemoryWatchdog, restart_driver
 from target_helppers.login import start_and_login
 from target_helppers.insert_client import navigate_to_add_client_page, create_client
 
 
-def insert_target_info(headless: bool = False, timeout: int = 20) -> None:
+def insert_target_info(headless: bool = False, timeout: int = 20, driver=None, linger: float = 0.0, memory_limit_mb: float | None = None, restart=None) -> None:
     """Start a browser, login to the target app, and (placeholder) insert info.
 
     Currently this function performs only the login and leaves a TODO where
     insertion logic should go.
-    """
-    load_dotenv()
-    url = os.getenv('TARGET_PAGE_LOGIN_URL')
-    if not url:
-        print('TARGET_PAGE_LOGIN_URL not set in .env')
-        return
 
-    username = os.getenv('TARGET_USERNAME')
-    password = os.getenv('TARGET_PASSWORD')
-    if not username or not password:
-        print('TARGET_USERNAME or TARGET_PASSWORD not set in .env')
-        return
+    `driver` is an already logged-in session (e.g. leased from
+    `target_helppers.login.login_pool`); it is used as is and left open for the
+    next stage. `linger` keeps a browser started here open that many seconds
+    before quitting, for inspection.
 
-    driver, success, info = start_and_login(url, username, password, headless=headless, timeout=timeout)
+    `memory_limit_mb`: between clients, if the browser uses more memory than this
+    (see `helppers.memory_watchdog`), replace it with a new logged-in one and go on
+    with the next client. `restart(driver)` returns the replacement; by default a
+    browser started here logs in again (a shared `driver` needs its own `restart`,
+    e.g. `DriverPool.restart`).
+    """
+    owned = driver is None
+    if owned:
+        load_dotenv()
+        url = os.getenv('TARGET_PAGE_LOGIN_URL')
+        if not url:
+            print('TARGET_PAGE_LOGIN_URL not set in .env')
+            return
+
+        username = os.getenv('TARGET_USERNAME')
+        password = os.getenv('TARGET_PASSWORD')
+        if not username or not password:
+            print('TARGET_USERNAME or TARGET_PASSWORD not set in .env')
+            return
+
+        driver, success, info = start_and_login(url, username, password, headless=headless, timeout=timeout)
+
+        if driver is None:
+            print('Failed to start driver or navigate:', info)
+            return
+
+        if not success:
+            print('Login may have failed or stayed on page. Current URL/info:', info)
+            # keep the browser open briefly so user can inspect
+            time.sleep(linger)
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            return
 
-    if driver is None:
-        print('Failed to start driver or navigate:', info)
-        return
+        # At this point, login succeeded
+        print('Login successful, current URL:', info)
 
-    if not success:
-        print('Login may have failed or stayed on page. Current URL/info:', info)
-        # keep the browser open briefly so user can inspect
-        time.sleep(2)
-        try:
-            driver.quit()
-        except Exception:
-            pass
-        return
+        if restart is None:
+            def _login_again():
+                new, ok, new_info = start_and_login(url, username, password, headless=headless, timeout=timeout)
+                if new is None or not ok:
+                    if new is not None:
+                        new.quit()
+                    raise RuntimeError(f'login after browser restart failed: {new_info}')
+                return new
 
-    # At this point, login succeeded
-    print('Login successful, current URL:', info)
+            def restart(old):
+                return restart_driver(old, _login_again)
 
     # After successful login, load converted clients and create them one-by-one
     clients_path = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "output", "converted_clients.json"))
@@ -60,7 +86,15 @@ def insert_target_info(headless: bool = False, timeout: int = 20) -> None:
         print('No clients to process. Exiting.')
     else:
         total = len(clients)
+        watchdog = MemoryWatchdog(memory_limit_mb) if memory_limit_mb and restart is not None else None
         for idx, client_data in enumerate(clients, start=1):
+            if watchdog is not None and watchdog.check(driver):
+                try:
+                    driver = restart(driver)
+                except Exception as e:
+                    print('Browser restart failed, stopping:', e)
+                    return
+                watchdog.reset()
             name_disp = client_data.get('name') or client_data.get('full_name') or '(no name)'
             print(f'[{idx}/{total}] Creating client: {name_disp}')
 
@@ -91,8 +125,11 @@ def insert_target_info(headless: bool = False, timeout: int = 20) -> None:
 
     # TODO: Add logic here to insert target info after successful login.
 
+    if not owned:
+        return
+
     # keep the browser open briefly so user can inspect
-    time.sleep(2)
+    time.sleep(linger)
     try:
         driver.quit()
     except Exception:
@@ -100,4 +137,4 @@ def insert_target_info(headless: bool = False, timeout: int = 20) -> None:
 
 
 if __name__ == '__main__':
-    insert_target_info(headless=False)
+    insert_target_info(headless=False, linger=2, memory_limit_mb=float(os.getenv('TARGET_MEMORY_LIMIT_MB') or 0) or None)
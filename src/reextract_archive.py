@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""reextract_archive.py
+
+Vuelve a ejecutar la extracción sobre un archivo de snapshots de detalle
+(`extract_source_info.py --archive-dir ...`) sin navegar por el ERP, p. ej.
+después de añadir etiquetas nuevas en `helppers/detail_rules.py`.
+
+Usage:
+  - Parsers offline (por defecto, en paralelo con procesos):
+      python src/reextract_archive.py output/snapshots
+
+  - Extractores Selenium sobre cada snapshot cargado por file://:
+      python src/reextract_archive.py output/snapshots --mode browser
+
+  - Elegir la salida (por defecto output/rows_info_reextracted.json):
+      python src/reextract_archive.py output/snapshots -o output/rows_info.json
+
+Se usa la última versión de cada `codigo_venta`; los registros se escriben en el
+orden del listado (página, fila) con el mismo esquema que `rows_info.json`.
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from helppers.html_parsers import parse_detail_page
+from helppers.rows_store import RowsStore
+from helppers.snapshot_archive import SnapshotArchive
+
+
+def _record(entry: Dict[str, Any], credit: Dict[str, str], amort: List[Dict[str, str]], client: Dict[str, str]) -> Dict[str, Any]:
+    return {'row': entry.get('row') or {}, 'cliente': client, 'info_credito': credit, 'amortizacion': amort}
+
+
+def _parse_entry(args: Tuple[str, Dict[str, Any]]) -> Dict[str, Any]:
+    root, entry = args
+    credit, amort, client = parse_detail_page(SnapshotArchive(root).read(entry))
+    return _record(entry, credit, amort, client)
+
+
+def reextract_offline(archive: SnapshotArchive, entries: List[Dict[str, Any]], workers: int = 0) -> List[Dict[str, Any]]:
+    """Parse every snapshot with `html_parsers` (`workers` processes, 0 = one per CPU)."""
+    jobs = [(archive.root, e) for e in entries]
+    if workers == 1 or len(jobs) < 2:
+        return [_parse_entry(j) for j in jobs]
+    with ProcessPoolExecutor(max_workers=workers or None) as executor:
+        return list(executor.map(_parse_entry, jobs, chunksize=16))
+
+
+def reextract_browser(archive: SnapshotArchive, entries: List[Dict[str, Any]], headless: bool = True) -> List[Dict[str, Any]]:
+    """Load every snapshot through `file://` in Chrome and run the Selenium extractors."""
+    from selenium import webdriver
+    from extract_source_info import _build_source_options
+    from helppers.extract_credit import extract_credit_info
+    from helppers.extract_amortization import extract_amortization_table
+    from helppers.extract_client import extract_client_info
+
+    out: List[Dict[str, Any]] = []
+    driver = webdriver.Chrome(options=_build_source_options(headless))
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            page = Path(tmp) / "snapshot.html"
+            for entry in entries:
+                page.write_text(archive.read(entry), encoding="utf-8")
+                driver.get(page.as_uri())
+                out.append(_record(entry, extract_credit_info(driver), extract_amortization_table(driver), extract_client_info(driver)))
+    finally:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    return out
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Re-run detail extraction over an archive of detail-page snapshots")
+    parser.add_argument("archive", nargs="?", default="output/snapshots", help="archive directory (default: output/snapshots)")
+    parser.add_argument("-o", "--output", default=None, help="output path (default: output/rows_info_reextracted.json)")
+    parser.add_argument("--mode", choices=("parser", "browser"), default="parser", help="'parser': offline html_parsers; 'browser': Selenium extractors over file://")
+    parser.add_argument("--workers", type=int, default=0, help="parser processes (0 = one per CPU)")
+    parser.add_argument("--show-browser", action="store_true", help="run Chrome with a visible window (browser mode)")
+    args = parser.parse_args(argv)
+
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    root = args.archive if os.path.isabs(args.archive) else os.path.join(repo_root, args.archive)
+    out_path = args.output or os.path.join("output", "rows_info_reextracted.json")
+    if not os.path.isabs(out_path):
+        out_path = os.path.join(repo_root, out_path)
+
+    archive = SnapshotArchive(root)
+    entries = list(archive.latest().values())
+    if not entries:
+        print(f"No snapshots found in {root}", file=sys.stderr)
+        return 2
+    # orden del listado; las entradas sin posición quedan al final en orden de escritura
+    order = {id(e): i for i, e in enumerate(entries)}
+    entries.sort(key=lambda e: (0, e['pos'][0], e['pos'][1]) if e.get('pos') else (1, order[id(e)], 0))
+
+    try:
+        if args.mode == "browser":
+            records = reextract_browser(archive, entries, headless=not args.show_browser)
+        else:
+            records = reextract_offline(archive, entries, workers=args.workers)
+    except Exception as e:
+        print(f"Error re-extracting snapshots: {e}", file=sys.stderr)
+        return 3
+
+    RowsStore(out_path).rewrite(records)
+    print(f"Re-extracted {len(records)} snapshots ({args.mode}) -> {out_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,53 @@
+from __future__ import annotations
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+
+from target_helppers.login import login_pool
+from insert_target_info import insert_target_info
+from add_special_quote import add_special_quote
+
+STAGES = {
+    'clients': insert_target_info,
+    'quotes': add_special_quote,
+}
+
+
+def run_target_stages(stages=('clients', 'quotes'), headless: bool = False, timeout: int = 20, memory_limit_mb: float | None = None) -> int:
+    """Run the target stages back to back on a single logged-in browser.
+
+    `memory_limit_mb` is passed to the clients stage, which then replaces the
+    pooled browser (`DriverPool.restart`) when it grows past the limit.
+    """
+    load_dotenv()
+    url = os.getenv('TARGET_PAGE_LOGIN_URL')
+    username = os.getenv('TARGET_USERNAME')
+    password = os.getenv('TARGET_PASSWORD')
+    if not url or not username or not password:
+        print('TARGET_PAGE_LOGIN_URL, TARGET_USERNAME or TARGET_PASSWORD not set in .env')
+        return 1
+
+    with login_pool(url, username, password, headless=headless, timeout=timeout) as pool:
+        for name in stages:
+            print(f'Stage: {name}')
+            # each lease checks the browser is still alive (and replaces it if not)
+            with pool.lease() as driver:
+                if name == 'clients':
+                    insert_target_info(timeout=timeout, driver=driver, memory_limit_mb=memory_limit_mb, restart=pool.restart)
+                else:
+                    STAGES[name](timeout=timeout, driver=driver)
+    return 0
+
+
+def _main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Run the target stages with one shared browser')
+    parser.add_argument('--stage', action='append', choices=sorted(STAGES), help='stage to run, repeatable, in order (default: clients then quotes)')
+    parser.add_argument('--headless', action='store_true', help='run Chrome without a window')
+    parser.add_argument('--memory-limit', type=float, default=0, help='restart the browser between clients above this many MB (0 = never)')
+    args = parser.parse_args(argv)
+    return run_target_stages(stages=args.stage or ('clients', 'quotes'), headless=args.headless, memory_limit_mb=args.memory_limit or None)
+
+
+if __name__ == '__main__':
+    sys.exit(_main())
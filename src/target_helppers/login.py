@@ -1,11 +1,16 @@
 from __future__ import annotations
+import os
 import time
-from typing import Tuple
+from typing import Iterable, Tuple
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from helppers.browser_profile import resolve_profile_dir, session_authenticated
+from helppers.chrome_launcher import chrome_options, start_chrome
+from helppers.driver_pool import DriverPool
+
 
 def fill_and_submit_login(driver: WebDriver, username: str, password: str, timeout: int = 20) -> Tuple[bool, str]:
     """Fill username/password on the current page (assumed to be the login page) and submit.
@@ -49,25 +54,28 @@ def fill_and_submit_login(driver: WebDriver, username: str, password: str, timeo
         return False, f"Error during login attempt: {e}"
 
 
-def start_and_login(url: str, username: str, password: str, headless: bool = False, timeout: int = 20):
+def start_and_login(url: str, username: str, password: str, headless: bool = False, timeout: int = 20, profile: str | None = None, lean: bool | None = None, allow_assets: Iterable[str] = ()):
     """Start a Chrome WebDriver, navigate to `url`, and perform login.
 
+    `profile` (default: TARGET_CHROME_PROFILE from the environment) keeps a persistent
+    Chrome user-data directory; if its stored session is still authenticated the
+    login form is not filled again.
+
+    `lean` (default: TARGET_CHROME_LEAN=1 in the environment) starts Chrome with the
+    lean profile of `helppers.chrome_launcher`, blocking images, fonts, media and
+    analytics; `allow_assets` lists the categories a flow still needs (e.g. 'images').
+
     Returns a tuple `(driver, success, info)` where `driver` is the WebDriver instance
     (or `None` if it couldn't be created), `success` is the boolean result from the
     login attempt, and `info` contains either the new URL or an error message.
     """
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.support.ui import WebDriverWait
-
-    opts = Options()
-    if headless:
-        opts.add_argument('--headless=new')
-    opts.add_argument('--no-sandbox')
-    opts.add_argument('--disable-dev-shm-usage')
+    if lean is None:
+        lean = os.getenv('TARGET_CHROME_LEAN', '').strip().lower() in ('1', 'true', 'yes')
+    profile_dir = resolve_profile_dir(profile, 'TARGET_CHROME_PROFILE')
+    opts = chrome_options(headless=headless, lean=lean, profile_dir=profile_dir)
 
     try:
-        driver = webdriver.Chrome(options=opts)
+        driver = start_chrome(opts, lean=lean, allow=allow_assets)
     except Exception as e:
         return None, False, f'Could not start Chrome WebDriver: {e}'
 
@@ -78,6 +86,10 @@ def start_and_login(url: str, username: str, password: str, headless: bool = Fal
         except Exception:
             time.sleep(1)
 
+        if profile_dir and session_authenticated(driver):
+            # stored session still valid: the app did not ask for credentials
+            return driver, True, driver.current_url
+
         success, info = fill_and_submit_login(driver, username, password, timeout=timeout)
         return driver, success, info
     except Exception as e:
@@ -86,3 +98,24 @@ def start_and_login(url: str, username: str, password: str, headless: bool = Fal
         except Exception:
             pass
         return None, False, f'Error during navigation/login: {e}'
+
+
+def login_pool(url: str, username: str, password: str, size: int = 1, recycle_after: int | None = None, **kwargs) -> DriverPool:
+    """`DriverPool` of logged-in target sessions (`kwargs` go to `start_and_login`).
+
+    Lease a driver and pass it to `insert_target_info` / `add_special_quote` to run
+    several stages on the same browser instead of starting Chrome for each one.
+    """
+    def _factory(slot: int):
+        driver, success, info = start_and_login(url, username, password, **kwargs)
+        if driver is None:
+            raise RuntimeError(info)
+        if not success:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            raise RuntimeError(f'Login failed: {info}')
+        return driver
+
+    return DriverPool(_factory, size=size, recycle_after=recycle_after)
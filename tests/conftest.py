@@ -0,0 +1,7 @@
+import os
+import sys
+
+# los scripts se ejecutan desde src/ (imports `from helppers.x import y`)
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
@@ -0,0 +1,163 @@
+"""Backend 'http' against saved pages: `HttpSession` + `parse_listing`/`parse_detail_page`.
+
+The pages in `fixtures/http/` are served by a local `ThreadingHTTPServer` that behaves
+like the ERP where it matters: the listing and details need the session cookie
+(otherwise it redirects to the login form), responses are gzip-compressed when asked
+and connections are kept alive.
+"""
+import gzip
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from helppers.detail_rules import empty_client_info, empty_credit_info
+from helppers.html_parsers import parse_detail_page, parse_listing
+from helppers.http_session import HttpSession
+from helppers.listing_harvester import resolve_detail_url
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "http")
+SESSION_COOKIE = "PHPSESSID=test-session"
+
+
+class _ErpHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        if body and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body)
+            headers = dict(headers or {}, **{"Content-Encoding": "gzip"})
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _page(self, name):
+        with open(os.path.join(FIXTURES, name), "rb") as fh:
+            self._send(200, fh.read(), {"Content-Type": "text/html; charset=utf-8"})
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/login.php":
+            return self._page("login.html")
+        if SESSION_COOKIE not in (self.headers.get("Cookie") or ""):
+            return self._send(302, headers={"Location": "/login.php"})
+        if parts.path == "/ventas.php":
+            return self._page("ventas.html")
+        if parts.path == "/detalle.php":
+            code = (parse_qs(parts.query).get("codigo_venta") or [""])[0]
+            if os.path.exists(os.path.join(FIXTURES, f"detalle_{code}.html")):
+                return self._page(f"detalle_{code}.html")
+        self._send(404, b"not found")
+
+
+@pytest.fixture(scope="module")
+def erp_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ErpHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def session(erp_url):
+    # lo que `HttpSession.from_driver` toma del navegador autenticado
+    s = HttpSession(cookies=[{"name": "PHPSESSID", "value": "test-session", "domain": "127.0.0.1", "path": "/"}], pool_size=2, timeout=5)
+    try:
+        yield s
+    finally:
+        s.close()
+
+
+EXPECTED_LISTING = [
+    {
+        "index": 0,
+        "row": {"temp": "T1", "sucursal": "Matriz", "asesor": "Laura Gómez", "cliente": "JUAN PÉREZ LÓPEZ", "desarrollo": "Bosques del Valle", "unidad": "A-12", "fecha_venta": "15/03/2024", "estado": "Activa", "plan": "Contado 12", "acciones": "Ver más"},
+        "codigo_venta": "V100",
+        "action": {"tag": "a", "text": "Ver más", "href": "detalle.php?codigo_venta=V100", "onclick": "", "target": "", "data_href": ""},
+    },
+    {
+        "index": 1,
+        "row": {"temp": "T2", "sucursal": "Norte", "asesor": "Pedro Ruiz", "cliente": "MARÍA SOTO", "desarrollo": "Lomas Altas", "unidad": "B-3", "fecha_venta": "02/04/2024", "estado": "Cancelada", "plan": "Crédito 36", "acciones": "Ver más"},
+        "codigo_venta": "V101",
+        "action": {"tag": "button", "text": "Ver más", "href": "", "onclick": "window.location.href='detalle.php?codigo_venta=V101'", "target": "", "data_href": ""},
+    },
+]
+
+EXPECTED_DETAILS = {
+    "V100": (
+        dict(empty_credit_info(), **{
+            "desarrollo": "Bosques del Valle", "unidad": "A-12", "superficie": "120.50",
+            "precio_lista": "1,250,000.00", "plan_de_pago": "Contado 12", "moneda_del_contrato": "MXN",
+            "enganche_%": "10", "enganche": "125,000.00",
+        }),
+        [
+            {"no": "1", "monto": "125,000.00", "monto_raw": "$ 125,000.00", "fecha": "15/03/2024", "tipo": "Enganche", "pago_id": "pago_901"},
+            {"no": "2", "monto": "93,750.00", "monto_raw": "$ 93,750.00", "fecha": "15/04/2024", "tipo": "Mensualidad", "pago_id": ""},
+        ],
+        dict(empty_client_info(), **{
+            "name": "Juan Pérez López", "rfc": "PELJ800101AB1", "estado_civil": "Casado", "estado": "Jalisco",
+            "codigo_postal": "44100", "email": "juan@example.com", "id_cliente": "5512", "codigo_venta": "V100",
+        }),
+    ),
+    "V101": (
+        dict(empty_credit_info(), **{
+            "desarrollo": "Lomas Altas", "unidad": "B-3", "precio_venta": "980,000.00",
+            "financiamiento_%": "70", "financiamiento": "686,000.00",
+        }),
+        [],
+        dict(empty_client_info(), **{
+            "name": "María Soto", "sexo": "Femenino", "telefono_celular": "33 1234 5678",
+            "id_cliente": "7730", "codigo_venta": "V101",
+        }),
+    ),
+}
+
+
+def test_listing_over_http(erp_url, session):
+    resp = session.get(f"{erp_url}/ventas.php")
+    assert resp.status == 200
+    assert not resp.looks_like_login()
+
+    rows = parse_listing(resp.text)
+    assert [{k: v for k, v in r.items() if k != "html"} for r in rows] == EXPECTED_LISTING
+    assert [resolve_detail_url(r["action"], resp.url) for r in rows] == [
+        f"{erp_url}/detalle.php?codigo_venta=V100",
+        f"{erp_url}/detalle.php?codigo_venta=V101",
+    ]
+
+
+def test_detail_pages_over_http(erp_url, session):
+    listing_url = f"{erp_url}/ventas.php"
+    rows = parse_listing(session.get(listing_url).text)
+    urls = {r["codigo_venta"]: resolve_detail_url(r["action"], listing_url) for r in rows}
+
+    # como en extract_all_rows_info: los detalles de una página se descargan en paralelo
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pages = dict(zip(urls, executor.map(session.get, urls.values())))
+
+    for code, resp in pages.items():
+        assert resp.status == 200, code
+        assert parse_detail_page(resp.text) == EXPECTED_DETAILS[code], code
+
+
+def test_expired_session_gets_login_page(erp_url):
+    anonymous = HttpSession(timeout=5)
+    try:
+        resp = anonymous.get(f"{erp_url}/detalle.php?codigo_venta=V100")
+    finally:
+        anonymous.close()
+    assert resp.url == f"{erp_url}/login.php"
+    assert resp.looks_like_login()
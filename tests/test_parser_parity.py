@@ -0,0 +1,31 @@
+"""`parse_detail_page` against the recorded output of the Selenium extractors.
+
+Each page in `fixtures/parity/` has a `<page>.expected.json` with what
+`extract_credit_info`, `extract_amortization_table` and `extract_client_info`
+return for it in Chrome (re-record with `check_parser_parity.py --record`).
+The offline parsers must reproduce it byte for byte, key order included.
+"""
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from check_parser_parity import SECTIONS, expected_path, parse_offline, section_diffs
+
+PAGES = sorted(Path(os.path.dirname(__file__), "fixtures", "parity").glob("*.html"))
+
+
+def test_every_page_has_recorded_output():
+    assert PAGES
+    assert [p.name for p in PAGES if not expected_path(p).exists()] == []
+
+
+@pytest.mark.parametrize("page", PAGES, ids=[p.stem for p in PAGES])
+def test_parser_matches_selenium(page):
+    expected = json.loads(expected_path(page).read_text(encoding="utf-8"))
+    parsed = parse_offline(page)
+
+    assert section_diffs(expected, parsed) == []
+    for section in SECTIONS:
+        assert json.dumps(parsed[section], ensure_ascii=False) == json.dumps(expected[section], ensure_ascii=False)
@@ -0,0 +1,33 @@
+"""`RowBudget.clip_driver_timeouts`: the driver's own timeouts follow the row budget."""
+from helppers.row_budget import RowBudget
+
+
+class _FakeDriver:
+    def __init__(self):
+        self.page_load = self.script = None
+
+    def set_page_load_timeout(self, seconds):
+        self.page_load = seconds
+
+    def set_script_timeout(self, seconds):
+        self.script = seconds
+
+
+def test_clip_caps_timeouts_at_time_left_and_end_restores():
+    driver = _FakeDriver()
+    budget = RowBudget(driver, 5).begin()
+    budget.clip_driver_timeouts(20)
+    assert 1.0 <= driver.page_load <= 5 and driver.script == driver.page_load
+    assert driver._mig_script_timeout == driver.script
+
+    budget.end()
+    assert driver.page_load == driver.script == 20
+    assert driver._mig_row_deadline is None
+
+
+def test_clip_without_budget_is_a_noop():
+    driver = _FakeDriver()
+    budget = RowBudget(driver, None).begin()
+    budget.clip_driver_timeouts(20)
+    budget.end()
+    assert driver.page_load is None and driver.script is None
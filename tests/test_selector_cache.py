@@ -0,0 +1,19 @@
+"""`SelectorCache`: declared precedence, dead candidates and their periodic re-probe."""
+from helppers.selector_cache import SelectorCache
+
+CHAIN = ["exact", "broad"]
+
+
+def test_dead_candidate_is_reprobed_and_regains_precedence():
+    cache = SelectorCache(dead_after=3, reprobe_every=6)
+    dom = {"broad"}
+    find = lambda c: c if c in dom else None
+    # 'exact' misses three times and is dead from then on: 'broad' is tried first
+    assert [cache.first_match("label", CHAIN, find) for _ in range(3)] == ["broad"] * 3
+    assert cache.stats["label"]["candidate_misses"] == {"exact": 3}
+
+    # the page changes back; 'broad' keeps winning until the re-probe (6th lookup)
+    dom = {"exact", "broad"}
+    assert [cache.first_match("label", CHAIN, find) for _ in range(3)] == ["broad", "broad", "exact"]
+    # with a hit it is no longer dead: declared precedence from now on
+    assert [cache.first_match("label", CHAIN, find) for _ in range(2)] == ["exact", "exact"]